@@ -17,11 +17,11 @@ Python2.7
 	@@add_field: 添加相同类型和长度的多个或者单个字段(如果存在相同名字的字段则不
 								会添加字段)
 	@@setZWMC: 根据LQDK图层中的LQLX字段赋予ZZMC1和ZZMC2
-	@@merger_all: 一键快速合并一个图层的所有要素(添加一个字段，全部赋值为1，然后融合，
-								最后删除该字段)
+	@@merger_all: 一键快速合并一个图层的所有要素(逐级合并几何，不修改输入图层)
 	@@merger_all_layers:在merger_all的基础上，先合并所有图层，然后融合所有要素。
 	@@add_shp2mxd: 加载shp文件到mxd
-	@@field_shower:获取图层中某单个字段的所有值(没多大价值，暂时留着)
+	@@field_value_shower:获取图层中某单个字段的所有值(首次出现的顺序)
+								计数、空值、最大最小值、多字段见 hyvalues.field_values
 	@@get_extent_and_sr
 	
 	
@@ -36,6 +36,10 @@ from __future__ import unicode_literals
 import arcpy
 import random
 import os
+import hymapping
+import hyschema
+import hyunion
+import hyvalues
 # from gpconfig import hyini
 
 
@@ -104,22 +108,14 @@ def add_field(layer, names, f_type, f_length=None, delete=True):
     names: {List} 新增字段名称
     f_type: {String} 字段类型
     f_length: {Long} 字段长度
-    delete: {Boolean} True 如果存在该字段，先删除再创建
+    delete: {Boolean} True 如果存在该字段，先删除再创建(清空该字段)
     return: 返回当前的图层对象
     """
-    the_fields = arcpy.ListFields(layer)
-    for name in names:
-        if not check_field_exit(the_fields, name):
-            arcpy.AddField_management(layer, name, f_type, field_length=f_length)
-            msg = "Created {0} field success".format(name.encode("utf8"))
-            print msg
-        else: # 存在该字段
-            if delete:
-                arcpy.DeleteField_management (layer, name)
-                arcpy.AddField_management(layer, name, f_type, field_length=f_length)
-            else:
-                print "Field exist"
-            
+    # 先比较现有字段，shp 需要多次改动时只重建一次（见 hyschema）
+    # 已经存在的字段只在 delete 时清空，不修改类型和长度
+    specs = [hyschema.FieldSpec(name, f_type, f_length) for name in names]
+    hyschema.migrate_schema(layer, specs, reset=names if delete else None,
+                            retype=False)
     return layer
 
 def check_field_exit(field_obj, check_field):
@@ -159,9 +155,8 @@ def setZWMC(layer, reference_field, target_field1, target_field2):
     :param reference_field: LQLX字段
     :param target_field1: ZZMC1
     :param target_field2: ZZMC2
-    :return:
+    :return: 统计（mapped/unchanged/unmatched），见 hymapping.map_fields
     """
-    in_fields = (reference_field, target_field1, target_field2)
     # LQLX匹配规则，LQLX代码表示的作物名称
     match_list = {
         11: (u"水稻", u""),
@@ -171,92 +166,41 @@ def setZWMC(layer, reference_field, target_field1, target_field2):
         15: (u"小麦", u"玉米"),
         25: (u"水稻", u"油菜")
     }
-    with arcpy.da.UpdateCursor(layer, in_fields) as cursor:
-        for row in cursor:
-            LQLX = row[0]
-            # match_list = match_list.iteritems()
-            for m_key in match_list:
-                if int(LQLX) == m_key:
-                    # print "LQLX:",LQLX
-                    # print "match_list.get:",match_list.get(m_key)[0]
-                    # print "type:",type(match_list.get(m_key)[0])
-                    # print "row[1]:",type(row[1])
-                    row[1] = match_list.get(m_key)[0]
-                    row[2] = match_list.get(m_key)[1]
-                    cursor.updateRow(row)
-                else:
-                    # print "no match"
-                    pass
+    # 字典查找，一个游标完成，值没有变化的行不更新
+    return hymapping.map_fields(
+        layer, [(reference_field, [target_field1, target_field2],
+                 hymapping.lookup_from_dict(match_list))])
 
 
 def merger_all(layer, outputclass= "dissolve_all"):
     """
-    一键快速合并一个图层的所有要素(添加一个字段，全部赋值为1，然后融合，最后删除
-    该字段)
+    一键快速合并一个图层的所有要素(直接读取几何逐级合并，不修改输入图层，
+    见 hyunion.union_all)
         <特别注意新合成的图层名称，是否会覆盖>
     layer(String): shp或者lyr文件地址，或者图层对象
     return: 合并后的新图层 默认返回图层名字为 newlayer_945
     """
     arcpy.env.addOutputsToMap = True
     arcpy.env.overwriteOutput = True
-    # 判断是否有这个字段
-    all_fields = arcpy.ListFields(layer)
-    all_name = [i.name for i in all_fields]
-    # for f in all_fields:
-    # 	print f.name #Todo  neme 和 aliasName 返回的都一样，为什么
-    # print f.aliasName
-    
-    field_name = "test1f2lcc"
-    if field_name not in all_name:
-        arcpy.AddField_management(layer, field_name, "LONG")
-    cursor = arcpy.da.UpdateCursor(layer, field_name)
-    for row in cursor:
-        row[0] = "1"
-        cursor.updateRow(row)
-    del cursor
-    new_ly = outputclass
-    arcpy.Dissolve_management(layer, new_ly ,field_name)
-    arcpy.DeleteField_management(new_ly, field_name)
-    return new_ly
+    return hyunion.union_all([layer], outputclass)
 
 
-def merger_all_layers(layers, result_lyr):
+def merger_all_layers(layers, result_lyr, processes=1):
     """
     将多个图层合并，然后再完全融合，这样可以快速消除重叠
+    (直接读取各个图层，不再先 Merge 一份)
     :param layers: {Str} 多个要素类组成的地址 ; 分隔
     :param result_lyr: {Layer} 最后的输出要素类
+    :param processes: {Int} 进程数
     :return:
     """
     arcpy.env.workspace = arcpy.env.scratchGDB
     arcpy.env.overwriteOutput = True
-    # separate layers each
-    # arcpy.AddMessage(type(layers))
-    # arcpy.AddMessage(layers)
     layers_list = layers.split(";")
-    # layers_list = layers
-    # mergered_lyr = "in_memory/mergered_lyr"
-    mergered_lyr = "mergered_lyr"
-    
     # 当图层名称出现空格时，分割后的单个名称如下 “‘NAME '",
     # 所以需要去除两个单引号
     layers_list = [xxx.strip("'") if " " in xxx and "'" in xxx else xxx for xxx in layers_list]
-
-    # arcpy.AddMessage("oooooooooo")
-    # for aa_layer in layers_list:
-    #     if " " in aa_layer and "'" in aa_layer:
-    #         aa_layer = aa_layer.strip("'")
-    #         arcpy.AddMessage(aa_layer)
-    # #     arcpy.AddMessage(aa_layer)
-    # #     arcpy.AddMessage(type(aa_layer))
-    # # arcpy.AddMessage(layers_list)
-    # arcpy.AddMessage("oooooooooo")
-    # return 1
-    
-    arcpy.Merge_management(layers_list, mergered_lyr)
-    mergered_dissolved_lyr = result_lyr
-    merger_all(mergered_lyr, mergered_dissolved_lyr)
-    arcpy.Delete_management(mergered_lyr)
-    return mergered_dissolved_lyr
+    return hyunion.union_all(layers_list, result_lyr, processes)
 
 
 def add_shp2mxd(mapdocument, shp_path, df_name=None, fresh=True):
@@ -277,17 +221,12 @@ def add_shp2mxd(mapdocument, shp_path, df_name=None, fresh=True):
 
 
 def field_value_shower(layer, field):
-    """获取图层中某单个字段的所有值(没多大价值，暂时留着)
+    """获取图层中某单个字段的所有值(首次出现的顺序)
+    需要计数、空值数量、最大最小值或者多个字段时用 hyvalues.field_values
     layer: mxd layer
     field: 字段,只能选一个字段
     """
-    _list = []
-    cursor = arcpy.da.SearchCursor(layer,field)
-    for row in cursor:
-        if row[0] not in _list:
-            _list.append(row[0])
-    del cursor
-    return _list
+    return hyvalues.field_values(layer, field)[field].values
 
 
 def get_extent_and_sr(input_layer):
@@ -12,11 +12,11 @@ Description: # python2
 +++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
 +++++++++++++++++++++++++++++++++++FUNCTION:++++++++++++++++++++++++++++++++++++
 Python2.7
-	# export: export mxd to jpeg 001
-	# HBgetfile: ȡļ ݹѯ getfile 002.0
+	# export: export mxd to jpeg 001 (multiprocessing, hyexport)
+	# HBgetfile: ȡļ ݹѯ getfile 002.0 (汾 hyfiles)
 	# HBfilter: бɸѡݴСַƥ䣩 002.5
 	# make_chunk: ݷַбdata_listеԪƽб
-	# timewraptimewrap_cpu: װκʱ
+	# timewraptimewrap_cpu: װκʱ䣨hyprofile
 +++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
 +++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
 Usage:
@@ -29,95 +29,62 @@ import arcpy
 import os
 import time
 from datetime import datetime
+import hyexport
+import hyfiles
+import hychunk
+import hyprofile
 
-# arcpy JPEGļлߵmxd
-def export(path, resolution):										 # 001
+# arcpy JPEGļлߵmxd̵ hyexport
+def export(path, resolution, processes=None, timeout=None, force=False): # 001
+    """
+    :param path: mxd ļļ
+    :param resolution: ֱ
+    :param processes: Ĭ CPU 
+    :param timeout: ĵʱʱ䣨룩None 
+    :param force: 嵥ȫµ
+    :return: hyexport.ExportReport
+    """
     arcpy.env.overwriteOutput = True
-    if not os.path.isdir(path) and path[-3:].lower() == 'mxd':
-        print("file")
-        mxd1 = arcpy.mapping.MapDocument(path)
-        print('exporting...')
-        arcpy.mapping.ExportToJPEG(
-            mxd1, os.path.abspath(path[:-3] + 'jpg'), resolution=resolution)
-        a = os.path.split(path)
-        print(a[1]+" finished")
-    else:
-        print("folder")
-        for afile in os.listdir(path):
-            if afile[-3:].lower() == 'mxd':
-                mxd1 = arcpy.mapping.MapDocument(os.path.join(path, afile))
-                print('exporting...')
-                # ExportToJEPGĵڶǵͼƬƺĿ¼
-                arcpy.mapping.ExportToJPEG(
-                    mxd1, os.path.join(path, afile[:-3] + 'jpg'), resolution=resolution
-                )
-                print(afile + ' finished')
-                print("\n----------------")
-                del mxd1
-            else:
-                pass
-
-
-_getall_items = []
-def getfiles(dirs_p, suffix, recur=True, counter=0): 				 # 002.0
+    manifest = hyexport.ExportManifest(hyexport.default_manifest_path(path))
+    report = hyexport.batch_export(
+        hyexport.list_mxd(path), resolution,
+        processes=processes, timeout=timeout,
+        manifest=manifest, force=force)
+    for line in report.summary():
+        print(line)
+    return report
+
+
+def getfiles(dirs_p, suffix, recur=True, max_depth=None, exclude=None,
+             index=None):                                        # 002.0
     """
     import os
     һļУļУеķϺ׺item
-    ss = recur_search(u"G:/߱׼", "", True)
-    ss = recur_search(u"G:/߱׼", "xlsx",True)
-    ss = recur_search(u"G:/߱׼", ["xlsx","xls"],True)
+    ss = getfiles(u"G:/߱׼", "", True)
+    ss = getfiles(u"G:/߱׼", "xlsx",True)
+    ss = getfiles(u"G:/߱׼", ["xlsx","xls"],True)
 
-    recur ʹõݹ飬رע⣬Ҫ̫
-    :param recur: bool Ƿõݹ
+    ÿε÷µбҪ _getall_items
+    ļܶʱֱʹ hyfiles.iter_filesռбڴ
+    :param recur: bool Ƿļ
     :param dirs_p: dir address
-    :param suffix: ׺ strб .
-    :param counter:  \t
+    :param suffix: ׺ strб . ִСд
+    :param max_depth: int ȣNone 
+    :param exclude: strб ųļУͨ "*.gdb"
+    :param index: hyfiles.FileIndex ļвѯļϵͳ
+                  Ҫ index.refresh(dirs_p)֧ max_depthexclude
     :return: list ַб
     """
-    global _getall_items
-    
-    # global __getall_items
-    for file_p in os.listdir(dirs_p):
-        file_path = os.path.join(dirs_p, file_p)
-        if os.path.isdir(file_path):
-            try:
-                # print("\t" * counter + "dir:", file_p
-                print("\t*{0} dir: {1}".format(int(counter),file_p.encode("utf8"))) # ִĵļУencode
-            except Exception:
-                print("<<<{0}>>>".format(__name__),"HBgetfile error occured, skipped")
-            # ݹ
-            if recur:
-                getfiles(file_path, suffix, recur, counter + 1)
-        else:
-            # print("\t"*counter+file_p
-            if suffix:
-                # ׺
-                if not isinstance(suffix, list):
-                    # stage 1 ɸѡ׺
-                    base_name = os.path.basename(file_path)
-                    name_and_suffix = os.path.splitext(base_name)
-                    f_suffix = name_and_suffix[1][1:].lower()
-                    # f_name = name_and_suffix[0]
-                    if f_suffix == suffix:
-                        print("\t" * counter, base_name)
-                        _getall_items.append(file_path)
-                # ׺б
-                else:
-                    base_name = os.path.basename(file_path)
-                    name_and_suffix = os.path.splitext(base_name)
-                    f_suffix = name_and_suffix[1][1:]
-                    # f_name = name_and_suffix[0]
-                    if f_suffix in suffix:
-                        print("\t" * counter, base_name)
-                        _getall_items.append(file_path)
-            # ޺׺Ҫ󣬻ȡļ
-            else:
-                _getall_items.append(file_path)
-    print("$"*80)
-    return _getall_items
+    if index is not None:
+        items = index.files(dirs_p, suffix, recur=recur)
+    else:
+        items = list(
+            hyfiles.iter_files(dirs_p, suffix, recur, max_depth, exclude))
+    print("getfiles:", len(items))
+    return items
 
 
-def filter_file(raw_list,matchword,size_limit=None):					# 002.5
+def filter_file(raw_list,matchword,size_limit=None,index=None):					# 002.5
     """
     ʹַƥļСбԪǵַĻбнɸѡ
     import os
@@ -126,6 +93,7 @@ def filter_file(raw_list,matchword,size_limit=None):					# 002.5
     :param raw_list:
     :param size_limit: int ųڸôСļ λ ֽ
     :param matchword: ƥֶΣɸѡϸԪ
+    :param index: hyfiles.FileIndex ļСжȡ stat
     :return: list
     """
     _bridge_list = []
@@ -136,94 +104,54 @@ def filter_file(raw_list,matchword,size_limit=None):					# 002.5
         raw_list = _bridge_list
     if size_limit:
         _bridge_list = []
-        _bridge_list = [x for x in raw_list if os.path.getsize(x) != size_limit]
+        sizes = index.sizes(raw_list) if index is not None else {}
+        _bridge_list = [
+            x for x in raw_list
+            if (sizes[x] if x in sizes else os.path.getsize(x)) != size_limit]
     print("after filter:", len(_bridge_list))
     return _bridge_list
 
 
-def make_chunk(data_list, chunk_num):
-    """бdata_listеԪƽб
+def make_chunk(data_list, chunk_num, cost=None):
+    """бdata_listеԪƽб޸ data_list
         such as:
             i_list = [1, 34, 3, 67, 8, 98, 39, 98, 34, 3, 67, 8, 98, 39, 98, 34,
                  6, 67, 8, 98, 39, 98, 34, 3, 67, 8 , 34, 3, 67, 8, 98, 39, 98,
                  98, 39, 98, 34, 3, 67, 8, 98, 39, 98, 34, 3, 67, 8, 98, 39, 98,
                  8, 98, 39, 98, 34, 3, 67 ]
-            result_list = data_distribute(i_list,6)
+            result_list = make_chunk(i_list,6)
+            result_list = make_chunk(shp_list,6,os.path.getsize)
 
+    ֿ鷽ʽ䡢ɣ hychunk
     data_list{List}: Ҫб
     chunk_num{Int}:  б
+    cost{Function}:  ԪصĴۣļСƽ䣻None ƽ
     :return{List}:  бһббһϢɵб
     """
-    msg_info = []
-    def sub_list(main_list, l_len):
-        """ѡ
-        :param main_list: {List} бǵҪб
-        :param l_len: {Int} Ƭȣʹpop
-        :return: {List} son һб
-        """
-        # son б
-        son = []
-        for ii7 in xrange(l_len):
-            son.append(main_list.pop())
-        return son
-    
-    # ˳Ϊpop()ȡһλұpop(0)
-    data_list.reverse()
-    # бб
-    result_groups = []
-    lenn = len(data_list)
-    # print("list_lence:", lenn
-    # Ϊcore飬slice_amountΪÿ
-    slice_amount = lenn // chunk_num
-    # print("slice_count:", slice_amount
-    for i in xrange(chunk_num):
-        # coreΪȵһƬ
-        l_slice = sub_list(data_list, slice_amount)
-        # print("one_slice:", l_slice)
-        result_groups.append(l_slice)
-    # remained_item_amount ҪбʣԪصĸ
-    remained_item_amount = lenn - slice_amount * chunk_num
-    msg1 = "remained_item:{0} ; remained_item_amount:{1}".format(
-        data_list, remained_item_amount)
-    # print(msg1)
-    # ҪбеֵȡŽ
-    while data_list:
-        for i in xrange(remained_item_amount):
-            item = data_list.pop()
-            result_groups[i].append(item)
-    # print("result_groups:",result_groups
-    j = 0
-    for i in result_groups:
-        i_len = len(i)
-        info = "Chunk's count: {}".format(i_len)
-        print(info)
-        msg_info.append(info)
-        j += i_len
-    info = "total: {}".format(j)
-    print(info)
-    print("@" * 50)
-    msg_info.append(info)
+    if cost is None:
+        result_groups = list(hychunk.chunk_contiguous(data_list, chunk_num))
+    else:
+        result_groups = [
+            group for group, _ in
+            hychunk.chunk_balanced(data_list, chunk_num, cost)]
+    msg_info = ["Chunk's count: {}".format(len(i)) for i in result_groups]
+    msg_info.append("total: {}".format(sum(len(i) for i in result_groups)))
     return result_groups, msg_info
 
-# װκ ʱ
+# װκ ʱ䣨ֵ֧
+# ͬʱ¼ hyprofile.recorderǶ׼ʱڴֵ json/csv  hyprofile
 def timewrap(func):
-    def inner():
-        start = time.time()
-        func()
-        end = time.time()
-        msg = 'Time consuming: {}'.format(end-start)
+    def log(node, wall, cpu):
+        msg = 'Time consuming: {}'.format(wall)
         print(msg)
-    return inner
+    return hyprofile.timed(log=log)(func)
 
 # װκ CPUִʱ
 def timewrap_cpu(func):
-    def inner():
-        start = time.clock()
-        func()
-        end = time.clock()
-        msg = 'CPU time consuming: {}'.format(end - start)
+    def log(node, wall, cpu):
+        msg = 'CPU time consuming: {}'.format(cpu)
         print(msg)
-    return inner
+    return hyprofile.timed(log=log)(func)
 
 
 class HyTime(object):
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# ---------------------------------------------------------------------------
+# Author: LiaoChenchen
+# Created on: 2026/10/18 17:05
+# Reference:
+"""
+Description: 数据分块，替代 hybasic2.make_chunk，用于给进程池分配任务
+  python2 / python3
+
+  所有函数都不修改输入的列表。chunk_contiguous、chunk_round_robin 为 O(n)
+  并且逐块返回（生成器）；chunk_balanced 按代价（文件大小、要素数量等）
+  分配，使用最长处理时间优先（LPT）的贪心算法，O(n log n)。
+
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+    # chunk_contiguous: 连续分块，按数量或者按累计代价平均
+    # chunk_round_robin: 轮流分配，第 i 个元素分到第 i % n 块
+    # chunk_balanced: 按代价平衡分配，大的元素优先放到当前最轻的块
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+Usage:
+    for part in chunk_contiguous(shp_list, 6):
+        pool.apply_async(work, (part,))
+    groups = chunk_balanced(shp_list, 6, cost=os.path.getsize)
+"""
+# ---------------------------------------------------------------------------
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+import heapq
+
+
+def _check_num(chunk_num):
+    if chunk_num < 1:
+        raise ValueError("chunk_num must be >= 1, got {0}".format(chunk_num))
+
+
+def chunk_contiguous(items, chunk_num, cost=None):
+    """连续分块，始终返回 chunk_num 块（元素不够时后面的块为空）
+    :param items: {List} 需要分块的列表（需要支持 len 和切片）
+    :param chunk_num: {Int} 块数
+    :param cost: {Function} cost(item) 返回数值代价；None 按数量平均，
+        各块数量相差不超过 1；否则按累计代价切分，各块代价尽量接近
+    :return: 生成器，元素为子列表
+    """
+    _check_num(chunk_num)
+    total_len = len(items)
+    if cost is None:
+        size, remained = divmod(total_len, chunk_num)
+        start = 0
+        for i in range(chunk_num):
+            stop = start + size + (1 if i < remained else 0)
+            yield items[start:stop]
+            start = stop
+        return
+
+    costs = [cost(item) for item in items]
+    total = float(sum(costs))
+    start, acc, emitted = 0, 0.0, 0
+    for i, c in enumerate(costs):
+        acc += c
+        # 累计代价达到第 emitted+1 个切分点时切分，保证剩下的块数够用
+        if (emitted < chunk_num - 1 and
+                acc >= total * (emitted + 1) / chunk_num):
+            yield items[start:i + 1]
+            start = i + 1
+            emitted += 1
+    yield items[start:]
+    for _ in range(chunk_num - 1 - emitted):
+        yield items[total_len:]
+
+
+def chunk_round_robin(items, chunk_num):
+    """轮流分配，第 i 个元素分到第 i % chunk_num 块
+    :param items: {List} 需要分块的列表（需要支持步长切片）
+    :param chunk_num: {Int} 块数
+    :return: 生成器，元素为子列表
+    """
+    _check_num(chunk_num)
+    for i in range(chunk_num):
+        yield items[i::chunk_num]
+
+
+def chunk_balanced(items, chunk_num, cost):
+    """按代价平衡分配：按代价从大到小，每个元素放到当前总代价最小的块，
+    块内保持元素原来的顺序
+    :param items: {Iterable} 需要分块的元素
+    :param chunk_num: {Int} 块数
+    :param cost: {Function} cost(item) 返回数值代价，如 os.path.getsize
+    :return: {List} (子列表, 总代价) 组成的列表，长度为 chunk_num
+    """
+    _check_num(chunk_num)
+    items = list(items)
+    costs = [cost(item) for item in items]
+    order = sorted(range(len(items)), key=costs.__getitem__, reverse=True)
+    # 堆中为 (总代价, 块编号)，块编号保证代价相同时按编号分配
+    heap = [(0, n) for n in range(chunk_num)]
+    members = [[] for _ in range(chunk_num)]
+    for i in order:
+        load, n = heapq.heappop(heap)
+        members[n].append(i)
+        heapq.heappush(heap, (load + costs[i], n))
+    loads = dict((n, load) for load, n in heap)
+    return [([items[i] for i in sorted(m)], loads[n])
+            for n, m in enumerate(members)]
@@ -0,0 +1,519 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# ---------------------------------------------------------------------------
+# Author: LiaoChenchen
+# Created on: 2026/10/18 22:40
+# Reference:
+"""
+Description: dbf 属性表的编码识别和转码（不需要 arcpy）
+  python2 / python3
+
+  convrt2utf8 原来只写一个内容为 utf8 的 cpg 文件，GBK 编码的 shp 加上后
+  反而会乱码。这里先识别 dbf 真实的编码，再把字符型字段（C）和字段名转码。
+    - 编码识别（detect_encoding）：收集字段名和字符型字段中的非 ASCII 内容，
+      能按 UTF-8 严格解码的是 UTF-8；否则依次验证 cpg 文件、文件头的
+      LDID 字节（第 29 字节）声明的编码，都不行时再尝试常用编码。
+    - 转码（transcode）：源文件用 mmap 读取，按块处理记录，不把整个文件读入内存。
+      编码变化后字符的字节数会变化（GBK 汉字 2 字节，UTF-8 3 字节），
+      widen=True 时先扫描一遍得到各字段需要的长度，再写出（最大 254）；
+      超出长度的值在字符边界截断。只有 ASCII 的值、非字符型字段直接复制。
+      写出后更新文件头的 LDID，并写 cpg 文件。
+    - transcode_folder 用进程池转换整个文件夹的 dbf。
+
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+    # read_header: 读取 dbf 文件头（字段定义）
+    # iter_records: 逐条读取记录
+    # detect_encoding: 识别 dbf 的编码
+    # transcode: 转码 dbf（原地或输出到另一个文件）
+    # transcode_folder: 多进程转码文件夹中的 dbf
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+Usage:
+    print(detect_encoding(u"D:/LQDK.dbf"))       # ('gbk', 'ldid')
+    transcode(u"D:/LQDK.dbf")                    # 原地转为 UTF-8，写 LQDK.cpg
+    for result in transcode_folder(u"D:/成果", processes=4):
+        print(result)
+
+    python hydbf.py D:/成果 --processes 4
+"""
+# ---------------------------------------------------------------------------
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+import argparse
+import codecs
+import mmap
+import multiprocessing
+import os
+import re
+import struct
+from collections import namedtuple
+
+import hyfiles
+
+# 文件头 LDID（language driver id）-> 编码，0 表示没有声明
+LDID_CODECS = {
+    0x01: "cp437", 0x02: "cp850", 0x03: "cp1252", 0x08: "cp865",
+    0x09: "cp437", 0x0A: "cp850", 0x0B: "cp437", 0x0D: "cp437",
+    0x0E: "cp850", 0x0F: "cp437", 0x10: "cp850", 0x11: "cp437",
+    0x12: "cp850", 0x13: "cp932", 0x14: "cp850", 0x15: "cp437",
+    0x16: "cp850", 0x17: "cp865", 0x18: "cp437", 0x19: "cp437",
+    0x1A: "cp850", 0x1B: "cp437", 0x1C: "cp863", 0x1D: "cp850",
+    0x1F: "cp852", 0x22: "cp852", 0x23: "cp852", 0x24: "cp860",
+    0x25: "cp850", 0x26: "cp866", 0x37: "cp850", 0x40: "cp852",
+    0x4D: "cp936", 0x4E: "cp949", 0x4F: "cp950", 0x50: "cp874",
+    0x57: "cp1252", 0x58: "cp1252", 0x59: "cp1252", 0x64: "cp852",
+    0x65: "cp866", 0x66: "cp865", 0x67: "cp861", 0x6A: "cp737",
+    0x6B: "cp857", 0x78: "cp950", 0x79: "cp949", 0x7A: "cp936",
+    0x7B: "cp932", 0x7C: "cp874", 0x7D: "cp1255", 0x7E: "cp1256",
+    0x86: "cp737", 0x87: "cp852", 0x88: "cp857", 0xC8: "cp1250",
+    0xC9: "cp1251", 0xCA: "cp1254", 0xCB: "cp1253", 0xCC: "cp1257",
+}
+# 写出时使用的 LDID 和 cpg 内容，key 为 codecs.lookup 的标准名称
+_PREFERRED = [("cp936", 0x4D, "936"), ("cp950", 0x4F, "950"),
+              ("cp949", 0x4E, "949"), ("cp932", 0x13, "932"),
+              ("cp1252", 0x57, "1252"), ("cp1250", 0xC8, "1250"),
+              ("cp1251", 0xC9, "1251"), ("utf-8", 0x00, "UTF-8")]
+# 识别不出时依次尝试的编码
+HEURISTIC_CODECS = ("gb18030", "big5", "cp1252")
+MAX_CHAR_LENGTH = 254
+
+_NON_ASCII = re.compile(b"[\x80-\xff]")
+# 这些类型的字段内容都是 ASCII，其他类型（如 VFP 的二进制字段）逐条处理
+_TEXT_TYPES = frozenset("CNFDL")
+
+Field = namedtuple("Field", "name type length decimals offset descriptor")
+Header = namedtuple("Header", "head fields records header_length "
+                              "record_length ldid tail")
+
+
+def _codec(name):
+    """编码的标准名称（cp936、GBK 都是 gbk），无效时返回 None"""
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+_LDIDS = dict((_codec(name), ldid) for name, ldid, _ in _PREFERRED)
+_CPGS = dict((_codec(name), cpg) for name, _, cpg in _PREFERRED)
+
+
+def cpg_path(dbf_path):
+    return os.path.splitext(dbf_path)[0] + ".cpg"
+
+
+def read_cpg(dbf_path):
+    """:return: cpg 文件声明的编码（标准名称），没有 cpg 或者无法识别时为 None"""
+    path = cpg_path(dbf_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        text = f.read().decode("ascii", "ignore").strip().lower()
+    if text.startswith("ansi "):
+        text = text[5:]
+    if text == "65001":
+        return "utf-8"
+    if text.isdigit():
+        # ESRI 的 88591 表示 ISO 8859-1
+        if text.startswith("8859") and len(text) > 4:
+            return _codec("iso8859-" + text[4:])
+        return _codec("cp" + text)
+    return _codec(text)
+
+
+def write_cpg(dbf_path, codec):
+    with open(cpg_path(dbf_path), "wb") as f:
+        f.write(_CPGS.get(_codec(codec), codec.upper()).encode("ascii"))
+
+
+def read_header(f):
+    """读取 dbf 文件头
+    :param f: 以二进制方式打开的文件
+    :return: {Header} head: 前 32 字节；fields: Field 列表；tail: 字段定义
+        结束符之后到记录开始之间的内容（VFP 等）
+    """
+    f.seek(0)
+    head = f.read(32)
+    records, header_length, record_length = struct.unpack("<IHH", head[4:12])
+    ldid = bytearray(head)[29]
+    rest = f.read(header_length - 32)
+    fields = []
+    offset = 1  # 第 0 字节为删除标记
+    pos = 0
+    while pos + 32 <= len(rest) and rest[pos:pos + 1] != b"\r":
+        descriptor = rest[pos:pos + 32]
+        name = descriptor[:11].split(b"\0")[0]
+        f_type = descriptor[11:12].decode("ascii")
+        length, decimals = struct.unpack("<BB", descriptor[16:18])
+        fields.append(Field(name, f_type, length, decimals, offset, descriptor))
+        offset += length
+        pos += 32
+    return Header(head, fields, records, header_length, record_length, ldid,
+                  rest[pos:])
+
+
+def _map(f):
+    if os.fstat(f.fileno()).st_size == 0:
+        return None
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _iter_chunks(mm, header, chunk_records):
+    """按块返回记录的原始字节，每块最多 chunk_records 条"""
+    if mm is None:
+        return
+    size = header.record_length
+    start = header.header_length
+    # 记录数以文件实际大小为准（不完整的最后一条不读）
+    end = min(start + header.records * size,
+              len(mm) - (len(mm) - start) % size)
+    step = size * chunk_records
+    while start < end:
+        stop = min(start + step, end)
+        yield mm[start:stop]
+        start = stop
+
+
+def _parse(field, raw, encoding):
+    value = raw.strip(b" \0")
+    if field.type == "C":
+        return raw.rstrip(b" \0").decode(encoding, "replace")
+    if not value:
+        return None
+    if field.type in "NF":
+        try:
+            return int(value) if field.decimals == 0 and b"." not in value \
+                else float(value)
+        except ValueError:
+            return None
+    if field.type == "L":
+        return value in b"YyTt"
+    return value.decode("ascii", "replace")
+
+
+def iter_records(path, encoding=None, chunk_records=4096):
+    """逐条读取记录（生成器），跳过已删除的记录
+    :param path: {String} dbf 文件
+    :param encoding: {String} 编码，None 时自动识别
+    :return: 生成器，元素为 {字段名: 值} 的字典（字段名已解码）
+    """
+    encoding = encoding or detect_encoding(path)[0] or "ascii"
+    with open(path, "rb") as f:
+        header = read_header(f)
+        names = [field.name.decode(encoding, "replace")
+                 for field in header.fields]
+        mm = _map(f)
+        try:
+            size = header.record_length
+            for chunk in _iter_chunks(mm, header, chunk_records):
+                for pos in range(0, len(chunk), size):
+                    record = chunk[pos:pos + size]
+                    if record[:1] == b"*":
+                        continue
+                    yield dict(
+                        (name, _parse(field, record[field.offset:
+                                                    field.offset + field.length],
+                                      encoding))
+                        for name, field in zip(names, header.fields))
+        finally:
+            if mm is not None:
+                mm.close()
+
+
+def _samples(path, limit=1 << 16):
+    """字段名和字符型字段中的非 ASCII 内容，最多 limit 字节"""
+    with open(path, "rb") as f:
+        header = read_header(f)
+        samples = [field.name for field in header.fields
+                   if _NON_ASCII.search(field.name)]
+        slices = [(field.offset, field.offset + field.length)
+                  for field in header.fields if field.type == "C"]
+        total = 0
+        mm = _map(f)
+        try:
+            size = header.record_length
+            for chunk in _iter_chunks(mm, header, 4096):
+                if not _NON_ASCII.search(chunk):
+                    continue
+                for pos in range(0, len(chunk), size):
+                    for start, stop in slices:
+                        raw = chunk[pos + start:pos + stop].rstrip(b" \0")
+                        if _NON_ASCII.search(raw):
+                            samples.append(raw)
+                            total += len(raw)
+                if total >= limit:
+                    break
+        finally:
+            if mm is not None:
+                mm.close()
+    return header, samples
+
+
+def _decodes(samples, codec):
+    try:
+        for raw in samples:
+            raw.decode(codec)
+    except (UnicodeDecodeError, LookupError):
+        return False
+    return True
+
+
+def detect_encoding(path):
+    """识别 dbf 的编码
+    :param path: {String} dbf 文件
+    :return: {Tuple} (编码, 依据)，依据为 cpg、ldid、heuristic；
+        只有 ASCII 内容时为 (声明的编码或 None, "ascii")；无法识别时为 (None, None)
+    """
+    header, samples = _samples(path)
+    declared = [(read_cpg(path), "cpg"),
+                (_codec(LDID_CODECS.get(header.ldid)), "ldid")]
+    if not samples:
+        for codec, _ in declared:
+            if codec:
+                return codec, "ascii"
+        return None, "ascii"
+    # GBK 等编码的中文几乎不可能恰好是合法的 UTF-8
+    if _decodes(samples, "utf-8"):
+        return "utf-8", "cpg" if declared[0][0] == "utf-8" else "heuristic"
+    for codec, source in declared:
+        if codec and codec != "utf-8" and _decodes(samples, codec):
+            return codec, source
+    for codec in HEURISTIC_CODECS:
+        if _decodes(samples, codec):
+            return _codec(codec), "heuristic"
+    return None, None
+
+
+def _fit(text, codec, length, errors):
+    """编码后不超过 length 字节，超出时在字符边界截断
+    :return: {Tuple} (字节, 是否截断)
+    """
+    data = text.encode(codec, errors)
+    if len(data) <= length:
+        return data, False
+    while len(data) > length:
+        text = text[:-1]
+        data = text.encode(codec, errors)
+    return data, True
+
+
+def _field_names(fields, source, target, errors):
+    """转码字段名（最多 10 字节），截断后重名时加序号"""
+    names, seen = [], set()
+    for field in fields:
+        if not _NON_ASCII.search(field.name):
+            name = field.name
+        else:
+            text = field.name.decode(source, errors)
+            name = _fit(text, target, 10, errors)[0]
+            n = 1
+            while name.lower() in seen:
+                suffix = u"_{0}".format(n)
+                name = _fit(text, target, 10 - len(suffix), errors)[0] + \
+                    suffix.encode("ascii")
+                n += 1
+        seen.add(name.lower())
+        names.append(name)
+    return names
+
+
+def _lengths(mm, header, source, target, errors, chunk_records):
+    """扫描一遍，得到字符型字段转码后需要的长度"""
+    lengths = [field.length for field in header.fields]
+    slices = [(i, field.offset, field.offset + field.length)
+              for i, field in enumerate(header.fields) if field.type == "C"]
+    size = header.record_length
+    for chunk in _iter_chunks(mm, header, chunk_records):
+        if not _NON_ASCII.search(chunk):
+            continue
+        for pos in range(0, len(chunk), size):
+            for i, start, stop in slices:
+                raw = chunk[pos + start:pos + stop].rstrip(b" \0")
+                if _NON_ASCII.search(raw):
+                    n = len(raw.decode(source, errors).encode(target, errors))
+                    if n > lengths[i]:
+                        lengths[i] = min(n, MAX_CHAR_LENGTH)
+    return lengths
+
+
+def _replace(src, dst):
+    """用 src 替换 dst（python2 在 Windows 上 rename 不能覆盖）"""
+    if hasattr(os, "replace"):
+        os.replace(src, dst)
+    else:
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def transcode(path, out_path=None, target="utf-8", source=None, widen=True,
+              errors="replace", chunk_records=4096):
+    """转码 dbf 的字符型字段和字段名，写 cpg 文件
+    :param path: {String} dbf 文件
+    :param out_path: {String} 输出的 dbf，None 时原地替换
+        （只写 dbf 和 cpg，shp 等其他文件需要另外复制）
+    :param target: {String} 目标编码
+    :param source: {String} 源编码，None 时自动识别（detect_encoding）
+    :param widen: {Boolean} 字段长度不够时加宽字段；False 时在字符边界截断
+    :param errors: {String} 无法编码、解码的字符的处理方式，同 str.encode
+    :param chunk_records: {Int} 每块处理的记录数
+    :return: {Dict} path, source, detected_by, target, records, truncated,
+        widened（加宽的字段名）, converted（False 表示编码相同，只更新了 cpg）
+    """
+    target = _codec(target)
+    detected_by = "argument"
+    if source is None:
+        source, detected_by = detect_encoding(path)
+        if source is None:
+            if detected_by == "ascii":
+                source = target
+            else:
+                raise ValueError("can't detect encoding of {0}".format(path))
+    source = _codec(source)
+    result = {"path": path, "source": source, "detected_by": detected_by,
+              "target": target, "records": 0, "truncated": 0, "widened": [],
+              "converted": False}
+    out_path = out_path or path
+    if source == target:
+        if out_path != path:
+            with open(path, "rb") as src, open(out_path, "wb") as dst:
+                for block in iter(lambda: src.read(1 << 20), b""):
+                    dst.write(block)
+        write_cpg(out_path, target)
+        return result
+
+    temp_path = out_path + ".transcoding"
+    with open(path, "rb") as f:
+        header = read_header(f)
+        mm = _map(f)
+        try:
+            lengths = [field.length for field in header.fields]
+            if widen:
+                lengths = _lengths(mm, header, source, target, errors,
+                                   chunk_records)
+            names = _field_names(header.fields, source, target, errors)
+            with open(temp_path, "wb") as out:
+                _write(out, mm, header, names, lengths, source, target,
+                       errors, chunk_records, result)
+        finally:
+            if mm is not None:
+                mm.close()
+    _replace(temp_path, out_path)
+    write_cpg(out_path, target)
+    result["widened"] = [
+        field.name.decode(source, errors)
+        for field, length in zip(header.fields, lengths)
+        if length != field.length]
+    result["converted"] = True
+    return result
+
+
+def _write(out, mm, header, names, lengths, source, target, errors,
+           chunk_records, result):
+    """写出文件头和转码后的记录"""
+    record_length = 1 + sum(lengths)
+    head = bytearray(header.head)
+    head[10:12] = struct.pack("<H", record_length)
+    head[29] = _LDIDS.get(target, 0)
+    out.write(bytes(head))
+    offset = 1
+    for field, name, length in zip(header.fields, names, lengths):
+        descriptor = bytearray(field.descriptor)
+        descriptor[:11] = name.ljust(11, b"\0")[:11]
+        if struct.unpack("<I", bytes(descriptor[12:16]))[0]:
+            descriptor[12:16] = struct.pack("<I", offset)
+        descriptor[16] = length
+        out.write(bytes(descriptor))
+        offset += length
+    out.write(header.tail)
+
+    plan = [(field.type == "C", field.offset, field.offset + field.length,
+             length) for field, length in zip(header.fields, lengths)]
+    same_layout = lengths == [field.length for field in header.fields]
+    plain = all(field.type in _TEXT_TYPES for field in header.fields)
+    size = header.record_length
+    records = truncated = 0
+    for chunk in _iter_chunks(mm, header, chunk_records):
+        count = len(chunk) // size
+        records += count
+        if same_layout and plain and not _NON_ASCII.search(chunk):
+            # 整块都是 ASCII，不需要转码
+            out.write(chunk)
+            continue
+        parts = []
+        for pos in range(0, len(chunk), size):
+            parts.append(chunk[pos:pos + 1])
+            for is_char, start, stop, length in plan:
+                raw = chunk[pos + start:pos + stop]
+                if is_char and _NON_ASCII.search(raw):
+                    text = raw.rstrip(b" \0").decode(source, errors)
+                    data, cut = _fit(text, target, length, errors)
+                    truncated += cut
+                    parts.append(data.ljust(length, b" "))
+                elif stop - start == length:
+                    parts.append(raw)
+                else:
+                    parts.append(raw.ljust(length, b" "))
+        out.write(b"".join(parts))
+    out.write(b"\x1a")
+    result["records"] = records
+    result["truncated"] = truncated
+
+
+def _transcode_task(args):
+    path, kwargs = args
+    try:
+        return transcode(path, **kwargs)
+    except Exception as e:
+        return {"path": path, "error": u"{0}".format(e)}
+
+
+def transcode_folder(folder, processes=None, recur=True, **kwargs):
+    """多进程转码文件夹中的所有 dbf（原地）
+    :param folder: {String} 文件夹
+    :param processes: {Int} 进程数，默认 CPU 数量
+    :param recur: {Boolean} 是否包括子文件夹
+    :param kwargs: transcode 的其他参数（out_path 除外）
+    :return: 生成器，每个 dbf 一个 transcode 的结果字典，出错时为 {path, error}
+    """
+    tasks = [(path, kwargs) for path in hyfiles.iter_files(folder, "dbf", recur)]
+    if processes == 1:
+        for task in tasks:
+            yield _transcode_task(task)
+        return
+    pool = multiprocessing.Pool(processes)
+    try:
+        for result in pool.imap_unordered(_transcode_task, tasks):
+            yield result
+    finally:
+        pool.close()
+        pool.join()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="detect and transcode dbf attribute tables")
+    parser.add_argument("path", help="dbf file or folder")
+    parser.add_argument("--to", default="utf-8", help="target encoding")
+    parser.add_argument("--source", default=None,
+                        help="source encoding, detected by default")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--detect", action="store_true",
+                        help="only print the detected encoding")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.path):
+        paths = list(hyfiles.iter_files(args.path, "dbf"))
+    else:
+        paths = [args.path]
+    if args.detect:
+        for dbf in paths:
+            print(dbf, *detect_encoding(dbf))
+    elif os.path.isdir(args.path):
+        for info in transcode_folder(args.path, args.processes,
+                                     target=args.to, source=args.source):
+            print(info)
+    else:
+        print(transcode(args.path, target=args.to, source=args.source))
@@ -0,0 +1,415 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# ---------------------------------------------------------------------------
+# Author: LiaoChenchen
+# Created on: 2026/10/18 15:02
+# Reference:
+"""
+Description: 批量导出 MXD 为 JPEG 的多进程引擎
+  python2
+
+  每个工作进程通过自己的 Pipe 接收一个文档、回传一个结果，主进程负责派发、
+  计时和超时终止。某个文档卡死时只终止对应的工作进程并重新拉起一个，
+  不会影响其它进程。渲染函数可替换（renderer），默认使用 arcpy_renderer，
+  在没有 arcpy 的环境下可以传入任意可 pickle 的函数进行测试。
+
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+    # arcpy_renderer: 使用 arcpy.mapping.ExportToJPEG 导出一个 mxd
+    # list_mxd: 获取单个 mxd 或文件夹下的所有 mxd
+    # batch_export: 多进程批量导出，支持超时、失败重试，返回 ExportReport
+    # ExportReport: 导出结果汇总（成功、失败、跳过、每个文档耗时）
+    # ExportManifest: 增量导出清单，跳过 mxd 和输出图片都没有变化的文档
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+Usage:
+    manifest = ExportManifest(default_manifest_path(u"G:/出图"))
+    report = batch_export(list_mxd(u"G:/出图"), 300, processes=4, timeout=600,
+                          manifest=manifest)
+    for line in report.summary():
+        print(line)
+
+    命令行（计划任务）:
+    python hyexport.py G:/出图 300 --processes 4 --timeout 600 [--force] [--prune]
+"""
+# ---------------------------------------------------------------------------
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+MANIFEST_NAME = ".hyexport_manifest.json"
+
+
+def arcpy_renderer(mxd_path, out_path, resolution):
+    """使用 arcpy 导出一个 mxd 为 JPEG（在工作进程中导入 arcpy）
+    :param mxd_path: {String} mxd 文件地址
+    :param out_path: {String} 输出图片地址
+    :param resolution: {Int} 分辨率
+    """
+    import arcpy
+    mxd = arcpy.mapping.MapDocument(mxd_path)
+    try:
+        arcpy.mapping.ExportToJPEG(mxd, out_path, resolution=resolution)
+    finally:
+        del mxd
+
+
+def jpeg_path(mxd_path):
+    """mxd 文件对应的输出图片地址（同目录同名 .jpg）"""
+    return os.path.splitext(mxd_path)[0] + ".jpg"
+
+
+def list_mxd(path):
+    """获取单个 mxd 文件，或者文件夹下（不递归）的所有 mxd 文件
+    :param path: {String} mxd 文件或者文件夹地址
+    :return: {List} mxd 文件地址列表
+    """
+    if not os.path.isdir(path):
+        if path[-3:].lower() == "mxd":
+            return [path]
+        return []
+    return [os.path.join(path, afile) for afile in sorted(os.listdir(path))
+            if afile[-3:].lower() == "mxd"]
+
+
+def _file_key(path):
+    """清单中的键：绝对路径，python2 下的 str 先转为 unicode"""
+    if isinstance(path, bytes):
+        path = path.decode(sys.getfilesystemencoding() or "utf-8")
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _file_md5(path, block_size=1024 * 1024):
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+def _file_stat(path):
+    """:return: (mtime, size)，文件不存在返回 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime, st.st_size
+
+
+def default_manifest_path(path):
+    """mxd 文件夹（或单个 mxd 所在文件夹）下的清单文件地址"""
+    folder = path if os.path.isdir(path) else os.path.dirname(path)
+    return os.path.join(folder, MANIFEST_NAME)
+
+
+class ExportManifest(object):
+    """增量导出清单（json 文件）
+    以 mxd 绝对路径为键，记录 mxd 的 mtime、size、md5，导出设置（分辨率等）
+    以及输出图片的 mtime、size。mxd 的 mtime 和 size 都没变时不计算 md5；
+    只改了 mtime（例如复制、另存）时再用 md5 判断内容是否变化。
+        <注意：mxd 引用的数据变化不会反映在清单里，这时需要 force 重新导出>
+    """
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f).get("entries", {})
+            except (IOError, ValueError):
+                # 清单损坏时当作空清单，全部重新导出
+                self.entries = {}
+
+    def is_current(self, mxd_path, out_path, settings):
+        """判断 mxd 是否需要重新导出
+        :param settings: {Dict} 导出设置，如 {"resolution": 300}
+        :return: {Boolean} True 表示输出图片是最新的，可以跳过
+        """
+        entry = self.entries.get(_file_key(mxd_path))
+        if entry is None or entry["settings"] != settings:
+            return False
+        out_stat = _file_stat(out_path)
+        if out_stat is None or list(out_stat) != entry["output"]:
+            return False
+        mxd_stat = _file_stat(mxd_path)
+        if mxd_stat is None:
+            return False
+        if list(mxd_stat) == [entry["mtime"], entry["size"]]:
+            return True
+        if mxd_stat[1] != entry["size"] or _file_md5(mxd_path) != entry["md5"]:
+            return False
+        # 内容没变，只更新 mtime，下次不用再算 md5
+        entry["mtime"] = mxd_stat[0]
+        return True
+
+    def record(self, mxd_path, out_path, settings):
+        """导出成功后记录 mxd 和输出图片的状态"""
+        mtime, size = _file_stat(mxd_path)
+        self.entries[_file_key(mxd_path)] = {
+            "mtime": mtime, "size": size, "md5": _file_md5(mxd_path),
+            "settings": settings, "output": list(_file_stat(out_path) or ())}
+
+    def prune(self, keep=None):
+        """删除过期的记录：mxd 已经不存在，或者不在 keep 中
+        :param keep: {List} 需要保留的 mxd 地址，None 只删除不存在的 mxd
+        :return: {List} 被删除的键
+        """
+        keep = None if keep is None else set(_file_key(p) for p in keep)
+        stale = [k for k in self.entries
+                 if (keep is not None and k not in keep)
+                 or not os.path.exists(k)]
+        for k in stale:
+            del self.entries[k]
+        return stale
+
+    def save(self):
+        """先写临时文件再替换，避免中断时留下半个清单"""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": 1, "entries": self.entries}, f, indent=1)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(tmp, self.path)
+
+
+class ExportReport(object):
+    """导出结果汇总
+    records 中每个元素为 dict:
+        mxd, output, ok, skipped, seconds（最后一次尝试耗时）, attempts, error
+    """
+    def __init__(self):
+        self.records = []
+        self.elapsed = 0.0
+
+    @property
+    def successes(self):
+        return [r for r in self.records if r["ok"] and not r["skipped"]]
+
+    @property
+    def skipped(self):
+        return [r for r in self.records if r["skipped"]]
+
+    @property
+    def failures(self):
+        return [r for r in self.records if not r["ok"]]
+
+    def summary(self):
+        """:return: {List} 汇总信息，每个元素是一行文本"""
+        lines = []
+        for r in self.records:
+            name = os.path.basename(r["mxd"])
+            if r["skipped"]:
+                lines.append("SKIP  {0} (up to date)".format(name))
+            elif r["ok"]:
+                lines.append("OK    {0} ({1:.1f}s, attempts: {2})".format(
+                    name, r["seconds"], r["attempts"]))
+            else:
+                lines.append("FAIL  {0} ({1:.1f}s, attempts: {2}): {3}".format(
+                    name, r["seconds"], r["attempts"], r["error"]))
+        lines.append("total: {0}, success: {1}, skipped: {2}, failure: {3}, "
+                     "elapsed: {4:.1f}s".format(
+            len(self.records), len(self.successes), len(self.skipped),
+            len(self.failures), self.elapsed))
+        return lines
+
+
+def _worker_loop(renderer, conn):
+    """工作进程：循环接收 (mxd, out, resolution)，收到 None 时退出"""
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        mxd_path, out_path, resolution = task
+        start = time.time()
+        try:
+            renderer(mxd_path, out_path, resolution)
+        except Exception:
+            conn.send((False, traceback.format_exc().strip().splitlines()[-1],
+                       time.time() - start))
+        else:
+            conn.send((True, None, time.time() - start))
+
+
+class _Worker(object):
+    """一个工作进程以及和它通信的 Pipe"""
+    def __init__(self, renderer):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.proc = multiprocessing.Process(
+            target=_worker_loop, args=(renderer, child_conn))
+        self.proc.daemon = True
+        self.proc.start()
+        child_conn.close()
+        self.task = None
+        self.started = None
+
+    def submit(self, task, args):
+        self.task = task
+        self.started = time.time()
+        self.conn.send(args)
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (IOError, OSError, EOFError):
+            pass
+        self.proc.join(5)
+        if self.proc.is_alive():
+            self.proc.terminate()
+        self.conn.close()
+
+    def kill(self):
+        self.proc.terminate()
+        self.proc.join()
+        self.conn.close()
+
+
+def batch_export(mxd_list, resolution, renderer=arcpy_renderer,
+                 processes=None, timeout=None, retries=1, logger=print,
+                 manifest=None, force=False):
+    """多进程批量导出 mxd
+    :param mxd_list: {List} mxd 文件地址，可用 list_mxd 获取
+    :param resolution: {Int} 分辨率
+    :param renderer: {Function} renderer(mxd_path, out_path, resolution)，
+        必须是模块级函数（Windows 下子进程需要 pickle）
+    :param processes: {Int} 工作进程数，默认 CPU 核数，不超过文档数
+    :param timeout: {Number} 单个文档超时时间（秒），超时终止该进程；None 不限制
+    :param retries: {Int} 失败（含超时）后的重试次数
+    :param logger: {Function} 日志输出函数，默认 print
+    :param manifest: {ExportManifest} 增量导出清单，None 不使用
+    :param force: {Boolean} 忽略清单，全部重新导出（仍会更新清单）
+    :return: {ExportReport}
+    """
+    report = ExportReport()
+    start_all = time.time()
+    settings = {"resolution": resolution}
+
+    # pending 为待处理的 records 下标，pop() 从末尾取，所以倒序存放
+    pending = []
+    for mxd_path in mxd_list:
+        record = {"mxd": mxd_path, "output": jpeg_path(mxd_path), "ok": False,
+                  "skipped": False, "seconds": 0.0, "attempts": 0,
+                  "error": None}
+        if (manifest is not None and not force and
+                manifest.is_current(mxd_path, record["output"], settings)):
+            record["ok"] = record["skipped"] = True
+        else:
+            pending.append(len(report.records))
+        report.records.append(record)
+    pending.reverse()
+    if report.skipped:
+        logger("{0} mxd up to date, skipped".format(len(report.skipped)))
+    if not pending:
+        if manifest is not None:
+            manifest.save()
+        report.elapsed = time.time() - start_all
+        return report
+
+    if not processes:
+        processes = multiprocessing.cpu_count()
+    processes = max(1, min(processes, len(pending)))
+
+    workers = [_Worker(renderer) for _ in range(processes)]
+
+    def finish(worker, ok, error, seconds):
+        record = report.records[worker.task]
+        record["ok"] = ok
+        record["error"] = error
+        record["seconds"] = seconds
+        name = os.path.basename(record["mxd"])
+        if ok:
+            logger("{0}: OK! ({1:.1f}s)".format(name, seconds))
+            if manifest is not None:
+                manifest.record(record["mxd"], record["output"], settings)
+        elif record["attempts"] <= retries:
+            logger("{0}: {1}, retry".format(name, error))
+            pending.append(worker.task)
+        else:
+            logger("{0}: FAILED, {1}".format(name, error))
+        worker.task = None
+
+    try:
+        while True:
+            for i, worker in enumerate(workers):
+                if worker.task is None:
+                    if not pending:
+                        continue
+                    index = pending.pop()
+                    record = report.records[index]
+                    record["attempts"] += 1
+                    worker.submit(index, (record["mxd"], record["output"],
+                                          resolution))
+                    continue
+
+                seconds = time.time() - worker.started
+                error = None
+                if worker.conn.poll():
+                    try:
+                        ok, error, seconds = worker.conn.recv()
+                    except EOFError:
+                        error = "worker exited"
+                    else:
+                        finish(worker, ok, error, seconds)
+                        continue
+                elif timeout and seconds > timeout:
+                    error = "timeout after {0}s".format(timeout)
+                elif not worker.proc.is_alive():
+                    error = "worker exited"
+                if error:
+                    # 终止卡死或者异常退出的进程，换一个新的进程
+                    worker.kill()
+                    workers[i] = _Worker(renderer)
+                    finish(worker, False, error, seconds)
+
+            if not pending and all(w.task is None for w in workers):
+                break
+            time.sleep(0.05)
+    finally:
+        for worker in workers:
+            if worker.task is None:
+                worker.stop()
+            else:
+                worker.kill()
+        if manifest is not None:
+            manifest.save()
+
+    report.elapsed = time.time() - start_all
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="batch export mxd to jpeg")
+    parser.add_argument("path", help="mxd file or folder")
+    parser.add_argument("resolution", type=int)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--retries", type=int, default=1)
+    parser.add_argument("--manifest", default=None,
+                        help="manifest file, default <folder>/" + MANIFEST_NAME)
+    parser.add_argument("--force", action="store_true",
+                        help="export every mxd even if it is up to date")
+    parser.add_argument("--prune", action="store_true",
+                        help="drop manifest entries of mxd no longer in path")
+    args = parser.parse_args()
+
+    mxd_files = list_mxd(args.path)
+    export_manifest = ExportManifest(
+        args.manifest or default_manifest_path(args.path))
+    if args.prune:
+        for key in export_manifest.prune(keep=mxd_files):
+            print("pruned:", key)
+    export_report = batch_export(
+        mxd_files, args.resolution, processes=args.processes,
+        timeout=args.timeout, retries=args.retries,
+        manifest=export_manifest, force=args.force)
+    for line in export_report.summary():
+        print(line)
+    sys.exit(1 if export_report.failures else 0)
@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# ---------------------------------------------------------------------------
+# Author: LiaoChenchen
+# Created on: 2026/10/18 16:10
+# Reference:
+"""
+Description: 文件查找（生成器），替代 hybasic2.getfiles 的递归 + 全局列表
+  python2 / python3
+
+  基于 os.scandir（python2 使用 scandir 包，没有安装时退回 os.listdir），
+  目录项自带的类型信息不需要再调用 os.path.isdir，stat 结果缓存在目录项上。
+  使用显式栈代替递归，不使用模块级变量，可以同时在多个线程中使用；
+  内存只和待访问的目录数量有关，与文件总数无关。
+
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+    # iter_entries: 遍历文件夹，逐个返回文件的目录项（DirEntry）
+    # iter_files: 遍历文件夹，逐个返回文件地址
+    # normalize_suffix: 后缀（字符串或列表）转为小写的 frozenset
+    # FileIndex: 文件索引（sqlite），多线程建立，按文件夹 mtime 增量更新
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+Usage:
+    for shp in iter_files(u"G:/高标准", "shp", exclude=["*.gdb", "备份*"]):
+        print(shp)
+    shps = list(iter_files(u"G:/高标准", ["shp", "dbf"], max_depth=2))
+
+    index = FileIndex(u"D:/cache/share_index.sqlite")
+    index.refresh(u"//server/project")          # 第一次全量，之后只扫描变化的文件夹
+    shps = index.files(u"//server/project", "shp", matchword=u"村", max_size=10**8)
+"""
+# ---------------------------------------------------------------------------
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+import fnmatch
+import os
+import re
+import sqlite3
+import sys
+from multiprocessing.pool import ThreadPool
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+
+class _ListdirEntry(object):
+    """没有 scandir 时使用的目录项，接口和 os.DirEntry 一致，stat 结果缓存"""
+    __slots__ = ("name", "path", "_stat")
+
+    def __init__(self, folder, name):
+        self.name = name
+        self.path = os.path.join(folder, name)
+        self._stat = None
+
+    def stat(self):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    def is_dir(self):
+        return os.path.isdir(self.path)
+
+    def is_file(self):
+        return os.path.isfile(self.path)
+
+
+def _scan(folder):
+    if scandir is not None:
+        return scandir(folder)
+    return [_ListdirEntry(folder, name) for name in os.listdir(folder)]
+
+
+def normalize_suffix(suffix):
+    """后缀（"shp"、".SHP"、["shp", "dbf"]）转为小写、不含 . 的 frozenset
+    :return: {frozenset} 空后缀返回 None（不筛选）
+    """
+    if not suffix:
+        return None
+    if isinstance(suffix, (list, tuple, set, frozenset)):
+        return frozenset(s.lstrip(".").lower() for s in suffix)
+    return frozenset([suffix.lstrip(".").lower()])
+
+
+def _compile_exclude(exclude):
+    """排除规则（通配符）合并为一个正则，没有规则返回 None"""
+    if not exclude:
+        return None
+    if not isinstance(exclude, (list, tuple, set, frozenset)):
+        exclude = [exclude]
+    return re.compile("|".join(fnmatch.translate(p) for p in exclude),
+                      re.IGNORECASE)
+
+
+def iter_entries(root, suffix=None, recur=True, max_depth=None, exclude=None,
+                 onerror=None):
+    """遍历文件夹（包含子文件夹），逐个返回符合后缀的文件目录项
+    :param root: {String} 文件夹地址
+    :param suffix: {String|List} 后缀，不含 .，不区分大小写；None 返回所有文件
+    :param recur: {Boolean} 是否查找子文件夹
+    :param max_depth: {Int} 最大深度，root 下的文件深度为 0；None 不限制
+    :param exclude: {String|List} 排除的通配符，匹配文件名/文件夹名，
+        或者相对 root 的路径（使用 / 分隔），如 "*.gdb"、"备份/*"
+    :param onerror: {Function} onerror(OSError)，文件夹无法访问时调用；
+        None 忽略该文件夹
+    :return: 生成器，元素为 DirEntry（有 name、path、stat()）
+    """
+    suffixes = normalize_suffix(suffix)
+    excluded = _compile_exclude(exclude)
+    if not recur:
+        max_depth = 0
+    # 栈中为 (文件夹地址, 相对路径, 深度)
+    stack = [(root, "", 0)]
+    while stack:
+        folder, rel_folder, depth = stack.pop()
+        try:
+            entries = _scan(folder)
+        except OSError as e:
+            if onerror is not None:
+                onerror(e)
+            continue
+        sub_dirs = []
+        try:
+            for entry in entries:
+                name = entry.name
+                rel = rel_folder + "/" + name if rel_folder else name
+                if excluded is not None and (excluded.match(name) or
+                                             excluded.match(rel)):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if max_depth is None or depth < max_depth:
+                        sub_dirs.append((entry.path, rel, depth + 1))
+                    continue
+                if suffixes is not None:
+                    ext = os.path.splitext(name)[1][1:].lower()
+                    if ext not in suffixes:
+                        continue
+                yield entry
+        finally:
+            close = getattr(entries, "close", None)
+            if close is not None:
+                close()
+        # 倒序入栈，出栈顺序与目录中的顺序一致
+        sub_dirs.reverse()
+        stack.extend(sub_dirs)
+
+
+def iter_files(root, suffix=None, recur=True, max_depth=None, exclude=None,
+               onerror=None):
+    """同 iter_entries，返回文件地址
+    :return: 生成器，元素为文件完整地址
+    """
+    for entry in iter_entries(root, suffix, recur, max_depth, exclude, onerror):
+        yield entry.path
+
+
+def _to_text(path):
+    """python2 下的 str 地址转为 unicode，索引中统一保存 unicode 绝对路径"""
+    if isinstance(path, bytes):
+        path = path.decode(sys.getfilesystemencoding() or "utf-8")
+    return os.path.abspath(path)
+
+
+def _prefix_range(folder):
+    """文件夹下所有地址的范围 [low, high)，用于 sqlite 按前缀查询"""
+    low = folder.rstrip("\\/") + os.sep
+    return low, low[:-1] + chr(ord(os.sep) + 1)
+
+
+def _scan_dir(args):
+    """线程池中执行：检查一个文件夹
+    :param args: (文件夹地址, 索引中记录的 mtime, 索引中记录的子文件夹)
+    :return: (文件夹地址, mtime, 是否变化, 文件列表, 子文件夹列表)
+        mtime 为 None 表示文件夹已经不存在或无法访问；
+        没有变化时文件列表为 None，子文件夹使用索引中的记录
+    """
+    folder, known_mtime, known_dirs = args
+    try:
+        mtime = os.stat(folder).st_mtime
+    except OSError:
+        return folder, None, True, [], []
+    if mtime == known_mtime:
+        return folder, mtime, False, None, known_dirs
+    files, dirs = [], []
+    try:
+        entries = _scan(folder)
+    except OSError:
+        return folder, None, True, [], []
+    try:
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    dirs.append(entry.path)
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            files.append((entry.name, st.st_size, st.st_mtime))
+    finally:
+        close = getattr(entries, "close", None)
+        if close is not None:
+            close()
+    return folder, mtime, True, files, dirs
+
+
+class FileIndex(object):
+    """文件索引：地址、大小、mtime、后缀保存在 sqlite 中
+    refresh 使用线程池并行检查文件夹：文件夹 mtime 没变（没有增删、重命名文件）
+    时不再列出和 stat 其中的文件，只检查它的子文件夹。
+        <注意：文件被原地修改时所在文件夹的 mtime 不会变，索引中的 size、mtime
+        会过期；需要准确大小时使用 refresh(root, full=True)>
+    查询（files、sizes）只读索引，不访问文件系统。
+    """
+    def __init__(self, db_path, threads=8):
+        self.db_path = db_path
+        self.threads = threads
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY, parent TEXT, mtime REAL);
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, dir TEXT, name TEXT, suffix TEXT,
+                size INTEGER, mtime REAL);
+            CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+            CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+            CREATE INDEX IF NOT EXISTS files_suffix ON files (suffix);
+        """)
+
+    def close(self):
+        self.conn.close()
+
+    def _known(self, folder):
+        row = self.conn.execute(
+            "SELECT mtime FROM dirs WHERE path = ?", (folder,)).fetchone()
+        children = [r[0] for r in self.conn.execute(
+            "SELECT path FROM dirs WHERE parent = ?", (folder,))]
+        return (row[0] if row else None), children
+
+    def _drop_tree(self, folder):
+        low, high = _prefix_range(folder)
+        for table, column in (("dirs", "path"), ("files", "dir")):
+            self.conn.execute(
+                "DELETE FROM {0} WHERE {1} = ? OR ({1} >= ? AND {1} < ?)".format(
+                    table, column), (folder, low, high))
+
+    def refresh(self, root, full=False):
+        """扫描 root，更新索引
+        :param root: {String} 文件夹地址
+        :param full: {Boolean} 忽略文件夹 mtime，重新 stat 所有文件
+        :return: {Dict} 统计：scanned（检查的文件夹数）、changed（重新列出的文件夹数）
+        """
+        root = _to_text(root)
+        stats = {"scanned": 0, "changed": 0}
+        pool = ThreadPool(self.threads)
+        try:
+            frontier = [root]
+            while frontier:
+                jobs = []
+                for folder in frontier:
+                    mtime, children = self._known(folder)
+                    jobs.append((folder, None if full else mtime, children))
+                frontier = []
+                for folder, mtime, changed, files, dirs in pool.imap_unordered(
+                        _scan_dir, jobs):
+                    stats["scanned"] += 1
+                    if mtime is None:
+                        self._drop_tree(folder)
+                        continue
+                    frontier.extend(dirs)
+                    if not changed:
+                        continue
+                    stats["changed"] += 1
+                    self._replace_dir(folder, mtime, files, dirs)
+                self.conn.commit()
+        finally:
+            pool.close()
+            pool.join()
+        return stats
+
+    def _replace_dir(self, folder, mtime, files, dirs):
+        parent = os.path.dirname(folder)
+        self.conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)",
+                          (folder, parent, mtime))
+        # 删除已经不存在的子文件夹（及其下的所有记录）
+        _, known_children = self._known(folder)
+        for child in set(known_children) - set(dirs):
+            self._drop_tree(child)
+        self.conn.execute("DELETE FROM files WHERE dir = ?", (folder,))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+            ((os.path.join(folder, name), folder, name,
+              os.path.splitext(name)[1][1:].lower(), size, f_mtime)
+             for name, size, f_mtime in files))
+
+    def files(self, root=None, suffix=None, matchword=None, min_size=None,
+              max_size=None, exclude_size=None, recur=True):
+        """查询索引中的文件
+        :param root: {String} 只返回该文件夹下的文件，None 返回全部
+        :param recur: {Boolean} 是否包含 root 子文件夹中的文件
+        :param suffix: {String|List} 后缀，不含 .，不区分大小写
+        :param matchword: {String} 文件名包含的字符（区分大小写），同 filter_file
+        :param min_size: {Int} 最小文件大小（字节）
+        :param max_size: {Int} 最大文件大小（字节）
+        :param exclude_size: {Int} 排除等于该大小的文件，同 filter_file 的 size_limit
+        :return: {List} 文件地址
+        """
+        where, params = [], []
+        if root is not None:
+            root = _to_text(root)
+            if recur:
+                low, high = _prefix_range(root)
+                where.append("(dir = ? OR (dir >= ? AND dir < ?))")
+                params.extend([root, low, high])
+            else:
+                where.append("dir = ?")
+                params.append(root)
+        suffixes = normalize_suffix(suffix)
+        if suffixes is not None:
+            where.append("suffix IN ({0})".format(",".join("?" * len(suffixes))))
+            params.extend(suffixes)
+        if matchword:
+            where.append("instr(name, ?) > 0")
+            params.append(matchword)
+        for clause, value in (("size >= ?", min_size), ("size <= ?", max_size),
+                              ("size != ?", exclude_size)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        sql = "SELECT path FROM files"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return [r[0] for r in self.conn.execute(sql + " ORDER BY path", params)]
+
+    def sizes(self, paths):
+        """:return: {Dict} 地址 -> 文件大小，索引中没有的地址不返回"""
+        result = {}
+        for path in paths:
+            row = self.conn.execute("SELECT size FROM files WHERE path = ?",
+                                    (_to_text(path),)).fetchone()
+            if row is not None:
+                result[path] = row[0]
+        return result
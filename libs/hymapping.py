@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# ---------------------------------------------------------------------------
+# Author: LiaoChenchen
+# Created on: 2026/10/18 20:10
+# Reference:
+"""
+Description: 代码 -> 名称批量赋值（查找表），替代 ezarcpy2.setZWMC 的嵌套循环
+  python2
+
+  查找表（代码中的字典、CSV、dbf 等表格）读入字典，一个 UpdateCursor 中
+  可以同时做多组 源字段 -> 目标字段 的赋值，每行每组只查一次字典。
+  值没有变化的行不调用 updateRow。返回每组赋值的统计：
+    mapped: 赋了新值的行数
+    unchanged: 查到了，但是目标字段已经是查找表中的值
+    unmatched: 查找表中没有该代码（unmatched_values 为没查到的代码及其数量）
+
+  代码统一用 code_key 转换后再查找，字段中的 11、11.0、u"11 " 都能查到 11。
+
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+    # code_key: 代码转换为查找用的 key
+    # lookup_from_dict: 由字典创建查找表
+    # lookup_from_csv: 由 CSV 文件创建查找表
+    # lookup_from_table: 由 dbf、gdb 表等创建查找表（arcpy）
+    # apply_lookups: 对游标逐行赋值，不依赖 arcpy
+    # map_fields: apply_lookups 的 arcpy 适配
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+Usage:
+    crops = lookup_from_csv(u"D:/LQLX.csv", "LQLX", ["ZWMC1", "ZWMC2"])
+    stats = map_fields(u"D:/LQDK.shp", [("LQLX", ["ZWMC1", "ZWMC2"], crops)])
+"""
+# ---------------------------------------------------------------------------
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+import csv
+import io
+from collections import OrderedDict
+
+
+def code_key(value):
+    """代码转换为查找用的 key：
+    整数值的浮点数转为整数，字符串去掉首尾空格，全是数字的字符串转为整数
+    （与原来 int(LQLX) 的比较方式一致）
+    """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, basestring):
+        value = value.strip()
+        if value.isdigit():
+            return int(value)
+    return value
+
+
+def _as_tuple(value):
+    return tuple(value) if isinstance(value, (tuple, list)) else (value,)
+
+
+def lookup_from_dict(mapping, key=code_key):
+    """由字典创建查找表
+    :param mapping: {Dict} 代码 -> 目标值（多个目标字段时为元组）
+    :param key: {Function} 代码转换函数
+    :return: {Dict} key -> 目标值元组
+    """
+    return dict((key(k), _as_tuple(v)) for k, v in mapping.items())
+
+
+def lookup_from_csv(path, key_field, value_fields, encoding="utf-8",
+                    key=code_key):
+    """由 CSV 文件（第一行为表头）创建查找表
+    :param path: {String} CSV 文件
+    :param key_field: {String} 代码列
+    :param value_fields: {String/List} 目标值列
+    :param encoding: {String} 文件编码，Excel 另存的 CSV 一般为 gbk
+    :param key: {Function} 代码转换函数
+    :return: {Dict} key -> 目标值元组
+    """
+    value_fields = _as_tuple(value_fields)
+    with io.open(path, "rb") as f:
+        lines = f.read().decode(encoding).lstrip(u"\ufeff").splitlines()
+    # python2 的 csv 模块只能读 utf-8 的 str
+    reader = csv.reader(line.encode("utf-8") for line in lines)
+    header = [h.decode("utf-8").strip() for h in next(reader)]
+    key_i = header.index(key_field)
+    value_is = [header.index(f) for f in value_fields]
+    lookup = {}
+    for row in reader:
+        if not row:
+            continue
+        row = [v.decode("utf-8") for v in row]
+        lookup[key(row[key_i])] = tuple(row[i] for i in value_is)
+    return lookup
+
+
+def lookup_from_table(table, key_field, value_fields, key=code_key):
+    """由 dbf、gdb 表、要素类等创建查找表
+    :param table: {String} 表
+    :param key_field: {String} 代码字段
+    :param value_fields: {String/List} 目标值字段
+    :param key: {Function} 代码转换函数
+    :return: {Dict} key -> 目标值元组
+    """
+    import arcpy
+    value_fields = list(_as_tuple(value_fields))
+    with arcpy.da.SearchCursor(table, [key_field] + value_fields) as cursor:
+        return dict((key(row[0]), tuple(row[1:])) for row in cursor)
+
+
+def apply_lookups(cursor, plans, key=code_key):
+    """对游标逐行按查找表赋值（只遍历一次），值没有变化的行不更新
+    :param cursor: 可迭代，行为列表，有 updateRow(row) 方法，如 arcpy.da.UpdateCursor
+    :param plans: {List} 每组为 (源字段下标, 目标字段下标列表, 查找表)
+    :param key: {Function} 代码转换函数
+    :return: {Tuple} (每组一个统计字典的列表, 更新的行数)，统计字典的 key 为
+        mapped、unchanged、unmatched、unmatched_values
+    """
+    stats = [{"mapped": 0, "unchanged": 0, "unmatched": 0,
+              "unmatched_values": OrderedDict()} for _ in plans]
+    plans = [(src, tuple(targets), lookup, stat)
+             for (src, targets, lookup), stat in zip(plans, stats)]
+    missing = object()
+    updated = 0
+    for row in cursor:
+        changed = False
+        for src, targets, lookup, stat in plans:
+            code = key(row[src])
+            values = lookup.get(code, missing)
+            if values is missing:
+                stat["unmatched"] += 1
+                unmatched = stat["unmatched_values"]
+                unmatched[code] = unmatched.get(code, 0) + 1
+                continue
+            row_changed = False
+            for i, value in zip(targets, values):
+                if row[i] != value:
+                    row[i] = value
+                    row_changed = True
+            if row_changed:
+                stat["mapped"] += 1
+                changed = True
+            else:
+                stat["unchanged"] += 1
+        if changed:
+            cursor.updateRow(row)
+            updated += 1
+    return stats, updated
+
+
+def map_fields(layer, mappings, where_clause=None, key=code_key,
+               logger=print):
+    """按查找表给字段赋值（一个 UpdateCursor）
+    :param layer: {String} 图层或者要素类
+    :param mappings: {List} 每组为 (源字段, 目标字段或目标字段列表, 查找表)，
+        查找表由 lookup_from_* 创建
+    :param where_clause: {String} 只处理满足条件的要素
+    :param key: {Function} 代码转换函数，需要与创建查找表时一致
+    :param logger: {Function} 日志输出函数
+    :return: {List} 每组一个统计字典，见 apply_lookups
+    """
+    import arcpy
+    fields = []
+
+    def index(name):
+        if name not in fields:
+            fields.append(name)
+        return fields.index(name)
+    plans = [(index(src), [index(t) for t in _as_tuple(targets)], lookup)
+             for src, targets, lookup in mappings]
+    with arcpy.da.UpdateCursor(layer, fields, where_clause) as cursor:
+        stats, updated = apply_lookups(cursor, plans, key)
+    for (src, targets, _), stat in zip(mappings, stats):
+        logger(u"{0} -> {1}: mapped {2}, unchanged {3}, unmatched {4}".format(
+            src, u",".join(_as_tuple(targets)), stat["mapped"],
+            stat["unchanged"], stat["unmatched"]))
+        if stat["unmatched_values"]:
+            logger(u"  unmatched values: {0}".format(u", ".join(
+                u"{0}({1})".format(v, n)
+                for v, n in stat["unmatched_values"].items())))
+    logger(u"updated {0} rows".format(updated))
+    return stats
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# ---------------------------------------------------------------------------
+# Author: LiaoChenchen
+# Created on: 2026/10/18 22:00
+# Reference:
+"""
+Description: 按属性编号（相同的值使用同一个号码），替代 assignnumber3 的两遍读取
+  python2
+
+  号码由模板生成，如 "第{n}组"、"（{n}）"，width 为补零的位数；
+  兼容原来的写法，"（1）"、"001" 等直接写号码的起始值也能识别（parse_template）。
+  编号顺序：
+    first: 按值首次出现的顺序，一个 UpdateCursor 完成
+    value: 按排序字段（默认为编号字段本身）的值，读一遍、写一遍
+    spatial: 按位置从上到下、从左到右（值的第一个要素的中心点），读一遍、写一遍
+  指定 group_field 时每组（如每个村）的号码从头开始。
+
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+    # parse_template: 起始号码或模板 -> (模板, 起始号码, 补零位数)
+    # label_maker: 号码 -> 文本
+    # spatial_key: 中心点的排序 key，从上到下、从左到右
+    # assign_numbers: 按顺序给 (组, 值) 编号，不依赖 arcpy
+    # number_features: 给图层编号
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+Usage:
+    number_features(u"D:/LQDK.shp", "CBFMC", "BH", u"第{n}组", width=3,
+                    order="spatial", group_field="CJQYMC")
+"""
+# ---------------------------------------------------------------------------
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+import math
+import re
+from collections import OrderedDict
+
+ORDERS = ("first", "value", "spatial")
+
+
+def parse_template(text):
+    """起始号码或模板 -> (模板, 起始号码, 补零位数)
+      u"第{n}组" -> (u"第{n}组", 1, 0)
+      u"（1）" -> (u"（{n}）", 1, 0)
+      u"005" -> (u"{n}", 5, 3)
+      u"A" -> (u"A{n}", 1, 0)
+    """
+    if "{n" in text:
+        return text, 1, 0
+    match = re.search(r"\d+", text)
+    escaped = lambda s: s.replace("{", "{{").replace("}", "}}")
+    if match is None:
+        return escaped(text) + "{n}", 1, 0
+    digits = match.group()
+    width = len(digits) if digits.startswith("0") and len(digits) > 1 else 0
+    template = (escaped(text[:match.start()]) + "{n}" +
+                escaped(text[match.end():]))
+    return template, int(digits), width
+
+
+def label_maker(template, width=0):
+    """:return: {Function} 号码 -> 文本，width 大于 0 时补零"""
+    if width:
+        return lambda n: template.format(n=u"{0}".format(n).zfill(width))
+    return lambda n: template.format(n=n)
+
+
+def spatial_key(point, band=None):
+    """从上到下、从左到右的排序 key
+    :param point: (x, y)
+    :param band: {Float} 行高，y 相差不到一行的点按 x 排序；None 严格按 y
+    """
+    x, y = point
+    if band:
+        return -math.floor(y / band), x
+    return -y, x
+
+
+def assign_numbers(entries, start=1, order_key=None):
+    """按顺序给 (组, 值) 编号，每组从 start 开始
+    :param entries: {OrderedDict} (组, 值) -> 排序信息，按首次出现的顺序
+    :param start: {Int} 起始号码
+    :param order_key: {Function} order_key(排序信息) 返回排序 key；
+        None 按首次出现的顺序
+    :return: {Dict} (组, 值) -> 号码
+    """
+    groups = OrderedDict()
+    for key, info in entries.items():
+        groups.setdefault(key[0], []).append((key, info))
+    numbers = {}
+    for items in groups.values():
+        if order_key is not None:
+            items.sort(key=lambda item: order_key(item[1]))
+        for i, (key, _) in enumerate(items):
+            numbers[key] = start + i
+    return numbers
+
+
+def _is_blank(value):
+    return value is None or (isinstance(value, basestring) and
+                             not value.strip())
+
+
+def number_features(layer, field, new_field, template=u"{n}", start=None,
+                    width=None, order="first", sort_field=None,
+                    group_field=None, band=None, logger=print):
+    """按字段值给要素编号，相同的值使用同一个号码，跳过空值
+    :param layer: {String} 图层或者要素类
+    :param field: {String} 编号依据的字段
+    :param new_field: {String} 写入号码的字段（TEXT），不存在时新建
+    :param template: {String} 号码模板或起始号码，见 parse_template
+    :param start: {Int} 起始号码，None 使用模板中的
+    :param width: {Int} 补零位数，None 使用模板中的
+    :param order: {String} first、value、spatial
+    :param sort_field: {String} order 为 value 时的排序字段，默认为 field
+    :param group_field: {String} 分组字段，每组的号码从头开始
+    :param band: {Float} order 为 spatial 时的行高，见 spatial_key
+    :param logger: {Function} 日志输出函数
+    :return: {Dict} (组, 值) -> 号码，没有分组时组为 None
+    """
+    import arcpy
+    if order not in ORDERS:
+        raise ValueError("order must be one of {0}".format(ORDERS))
+    template, t_start, t_width = parse_template(template)
+    start = t_start if start is None else start
+    label = label_maker(template, t_width if width is None else width)
+    if new_field.lower() not in [f.name.lower()
+                                 for f in arcpy.ListFields(layer)]:
+        arcpy.AddField_management(layer, new_field, "TEXT")
+
+    fields = [field, new_field] + ([group_field] if group_field else [])
+    group_of = (lambda row: row[2]) if group_field else (lambda row: None)
+
+    if order == "first":
+        # 首次出现的顺序：读到新值时直接编号，一个游标完成
+        labels = {}
+        counters = {}
+        numbers = {}
+        with arcpy.da.UpdateCursor(layer, fields) as cursor:
+            for row in cursor:
+                if _is_blank(row[0]):
+                    continue
+                key = (group_of(row), row[0])
+                text = labels.get(key)
+                if text is None:
+                    group = key[0]
+                    n = counters[group] = counters.get(group, start - 1) + 1
+                    numbers[key] = n
+                    text = labels[key] = label(n)
+                if row[1] != text:
+                    row[1] = text
+                    cursor.updateRow(row)
+        logger(u"numbered {0} values".format(len(numbers)))
+        return numbers
+
+    if order == "value":
+        extra = [sort_field or field]
+        order_key = lambda value: value
+    else:
+        extra = ["SHAPE@XY"]
+        order_key = lambda point: spatial_key(point, band)
+    entries = OrderedDict()
+    with arcpy.da.SearchCursor(layer, fields + extra) as cursor:
+        for row in cursor:
+            if _is_blank(row[0]):
+                continue
+            key = (group_of(row), row[0])
+            if key not in entries:
+                entries[key] = row[-1]
+    numbers = assign_numbers(entries, start, order_key)
+    labels = dict((key, label(n)) for key, n in numbers.items())
+    with arcpy.da.UpdateCursor(layer, fields) as cursor:
+        for row in cursor:
+            if _is_blank(row[0]):
+                continue
+            text = labels[(group_of(row), row[0])]
+            if row[1] != text:
+                row[1] = text
+                cursor.updateRow(row)
+    logger(u"numbered {0} values".format(len(numbers)))
+    return numbers
@@ -0,0 +1,386 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# ---------------------------------------------------------------------------
+# Author: LiaoChenchen
+# Created on: 2026/10/18 18:30
+# Reference:
+"""
+Description: 按字段值拆分要素类（一次读取）
+  python2
+
+  原来的 export_by_filed 先读一遍图层获取所有字段值，然后对每个值
+  SelectLayerByAttribute + CopyFeatures，N 个值需要读 N+1 遍数据。
+  这里只用一个 SearchCursor 读一遍，每一行按字段值分发给对应的 InsertCursor。
+  同时打开的 InsertCursor 数量有限（max_open），超出后新出现的字段值的行
+  按哈希写入临时文件（分桶），读完后再逐桶写出，每个输出只打开一次。
+
+  partition_rows 不依赖 arcpy，读取（rows）和写出（open_writer）都可以替换，
+  export_by_field 是 arcpy 的适配。
+
+  export_hierarchy 按多个字段逐级拆分（乡镇 -> 村），一行同时写入每一级的
+  输出，派生字段（如地块编码）在写出前计算，同样只读一遍数据。
+
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+    # partition_rows: 按 key 把行分发给各自的 writer，超出打开数量时溢写临时文件
+    # export_by_field: 按字段值把要素类拆分为多个 shp
+    # export_hierarchy: 按多个字段逐级拆分，输出嵌套的文件夹或要素类
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+Usage:
+    counts = export_by_field(u"D:/LQDK.shp", "XJQYMC", u"D:/成果", folder=True)
+    counts = export_hierarchy(u"D:/LQDK.shp", ["XJQYMC", "CJQYMC"], u"D:/成果")
+"""
+# ---------------------------------------------------------------------------
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+def _close(writer):
+    close = getattr(writer, "close", None)
+    if close is not None:
+        close()
+
+
+class _SpillBuckets(object):
+    """溢写的行按 hash(key) 分到 bucket_num 个临时文件中"""
+    def __init__(self, spill_dir, bucket_num, encode):
+        self.folder = tempfile.mkdtemp(prefix="hypartition_", dir=spill_dir)
+        self.bucket_num = bucket_num
+        self.encode = encode
+        self.files = {}
+        self.rows = 0
+
+    def add(self, value, row):
+        n = hash(value) % self.bucket_num
+        f = self.files.get(n)
+        if f is None:
+            f = self.files[n] = open(
+                os.path.join(self.folder, "{0}.pkl".format(n)), "wb")
+        pickle.dump((value, self.encode(row)), f, pickle.HIGHEST_PROTOCOL)
+        self.rows += 1
+
+    def groups(self, decode):
+        """逐桶读取，按 key 分组（保持原来的顺序）
+        :return: 生成器，(key, 行列表)
+        """
+        for n in sorted(self.files):
+            self.files[n].close()
+            grouped = OrderedDict()
+            with open(os.path.join(self.folder, "{0}.pkl".format(n)),
+                      "rb") as f:
+                while True:
+                    try:
+                        value, row = pickle.load(f)
+                    except EOFError:
+                        break
+                    grouped.setdefault(value, []).append(decode(row))
+            for value, rows in grouped.items():
+                yield value, rows
+
+    def cleanup(self):
+        for f in self.files.values():
+            f.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+def partition_rows(rows, key, open_writer, max_open=32, spill_dir=None,
+                   spill_buckets=64, encode=None, decode=None, multi=False):
+    """按 key 把行分发给各自的 writer（只遍历一次 rows）
+    前 max_open 个出现的 key 直接写入各自的 writer；之后出现的 key 的所有行
+    写入临时文件，rows 读完、已打开的 writer 关闭后再逐个打开写出。
+    每个 key 的 writer 只打开一次，行的顺序不变。
+    :param rows: {Iterable} 行（元组或列表），如 arcpy.da.SearchCursor
+    :param key: {Function} key(row) 返回分组值，返回 None 的行跳过
+    :param open_writer: {Function} open_writer(value) 返回有 insertRow(row)
+        方法的对象（有 close 方法时写完后调用）
+    :param max_open: {Int} 同时打开的 writer 数量
+    :param spill_dir: {String} 临时文件的上级目录，默认系统临时目录
+    :param spill_buckets: {Int} 临时文件（桶）数量，读回时每次只占用一个桶的内存
+    :param encode: {Function} 行写入临时文件前的转换（例如几何转为 WKB），默认不转换
+    :param decode: {Function} 从临时文件读回后的转换，默认不转换
+    :param multi: {Boolean} key(row) 返回 key 的列表，一行写入多个 writer
+        （空列表表示跳过该行）
+    :return: {Tuple} (各 key 的行数 OrderedDict（按首次出现顺序）, 跳过的行数,
+        溢写的行数)
+    """
+    encode = encode or (lambda r: r)
+    decode = decode or (lambda r: r)
+    counts = OrderedDict()
+    writers = {}
+    spill = None
+    skipped = 0
+    try:
+        for row in rows:
+            if multi:
+                values = key(row)
+            else:
+                value = key(row)
+                values = () if value is None else (value,)
+            if not values:
+                skipped += 1
+                continue
+            for value in values:
+                writer = writers.get(value)
+                if writer is None and value not in counts:
+                    if len(writers) < max_open:
+                        writer = writers[value] = open_writer(value)
+                counts[value] = counts.get(value, 0) + 1
+                if writer is not None:
+                    writer.insertRow(row)
+                else:
+                    if spill is None:
+                        spill = _SpillBuckets(spill_dir, spill_buckets, encode)
+                    spill.add(value, row)
+        for writer in writers.values():
+            _close(writer)
+        writers = {}
+
+        spilled = 0
+        if spill is not None:
+            spilled = spill.rows
+            for value, value_rows in spill.groups(decode):
+                writer = open_writer(value)
+                try:
+                    for row in value_rows:
+                        writer.insertRow(row)
+                finally:
+                    _close(writer)
+    finally:
+        for writer in writers.values():
+            _close(writer)
+        if spill is not None:
+            spill.cleanup()
+    return counts, skipped, spilled
+
+
+class _InsertWriter(object):
+    """arcpy.da.InsertCursor 的包装，close 时释放游标（解除锁定）"""
+    def __init__(self, dataset, fields):
+        import arcpy
+        self.cursor = arcpy.da.InsertCursor(dataset, fields)
+
+    def insertRow(self, row):
+        self.cursor.insertRow(row)
+
+    def close(self):
+        if self.cursor is not None:
+            del self.cursor
+            self.cursor = None
+
+
+def _editable_fields(dataset):
+    """可编辑的属性字段（不包括 OID、几何、Shape_Length 等）"""
+    import arcpy
+    return [f.name for f in arcpy.ListFields(dataset)
+            if f.type not in ("OID", "Geometry") and f.editable]
+
+
+def _field_mapping(src_names, out_names):
+    """输出要素类中与源字段对应的字段
+    字段数量相同时按位置对应（shp 会截断长字段名），否则按名称（不区分大小写）
+    :return: {Tuple} (源字段下标, 输出字段名)
+    """
+    if len(src_names) == len(out_names):
+        return list(range(len(src_names))), out_names
+    lower = dict((n.lower(), n) for n in out_names)
+    pairs = [(i, lower[n.lower()]) for i, n in enumerate(src_names)
+             if n.lower() in lower]
+    return [i for i, _ in pairs], [n for _, n in pairs]
+
+
+class _Subset(object):
+    """只写入源字段中的一部分（输出要素类字段较少时）"""
+    def __init__(self, writer, indexes):
+        self.writer = writer
+        self.indexes = indexes
+
+    def insertRow(self, row):
+        self.writer.insertRow([row[i] for i in self.indexes] + [row[-1]])
+
+    def close(self):
+        self.writer.close()
+
+
+def _text_key(value):
+    """字段值转为分组用的文本，空值和空字符串返回 None"""
+    if value is None:
+        return None
+    value = value if isinstance(value, basestring) else unicode(value)
+    return value if value.strip() else None
+
+
+def _open_output(layer, desc, src_names, out_dir, name, drop_fields=None):
+    """以 layer 为模板新建要素类，返回写入 src_names + SHAPE@ 行的 writer
+    :param drop_fields: {List} 输出中删除的字段（新建后立即删除，此时还没有数据）
+    """
+    import arcpy
+    if not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+    out_fc = os.path.join(out_dir, name)
+    if arcpy.Exists(out_fc):
+        arcpy.Delete_management(out_fc)
+    arcpy.CreateFeatureclass_management(
+        out_dir, name, desc.shapeType.upper(), layer,
+        "SAME_AS_TEMPLATE", "SAME_AS_TEMPLATE", desc.spatialReference)
+    # 先对应字段再删除，shp 截断的字段名仍然能按位置对应
+    indexes, out_names = _field_mapping(src_names, _editable_fields(out_fc))
+    if drop_fields:
+        drop = set(f.lower() for f in drop_fields)
+        pairs = list(zip(indexes, out_names))
+        dropped = [n for i, n in pairs if src_names[i].lower() in drop]
+        if dropped:
+            arcpy.DeleteField_management(out_fc, dropped)
+            pairs = [(i, n) for i, n in pairs
+                     if src_names[i].lower() not in drop]
+            indexes = [i for i, _ in pairs]
+            out_names = [n for _, n in pairs]
+    writer = _InsertWriter(out_fc, out_names + ["SHAPE@"])
+    if len(indexes) == len(src_names):
+        return writer
+    return _Subset(writer, indexes)
+
+
+def _geometry_codec(spatial_reference):
+    """溢写临时文件时几何转为 WKB，读回时再转为几何"""
+    import arcpy
+
+    def encode(row):
+        row = list(row)
+        if row[-1] is not None:
+            row[-1] = bytes(row[-1].WKB)
+        return row
+
+    def decode(row):
+        if row[-1] is not None:
+            row[-1] = arcpy.FromWKB(bytearray(row[-1]), spatial_reference)
+        return row
+    return encode, decode
+
+
+def export_by_field(layer, field, out_folder, folder=False, max_open=32,
+                    where_clause=None, logger=print):
+    """按字段值把要素类拆分为多个 shp（一次读取）
+    <空值和空字符串的要素不会导出>
+    :param layer: {String} 图层或者要素类
+    :param field: {String} 字段
+    :param out_folder: {String} 输出文件夹
+    :param folder: {Boolean} 是否为每个值单独创建文件夹 out_folder/值/值.shp
+    :param max_open: {Int} 同时打开的 InsertCursor 数量
+    :param where_clause: {String} 只导出满足条件的要素
+    :param logger: {Function} 日志输出函数
+    :return: {OrderedDict} 字段值 -> 要素数量
+    """
+    import arcpy
+    desc = arcpy.Describe(layer)
+    src_names = _editable_fields(layer)
+    lower_names = [n.lower() for n in src_names]
+    if field.lower() not in lower_names:
+        raise RuntimeError("{0} field doesn't exist".format(field))
+    key_index = lower_names.index(field.lower())
+
+    def key(row):
+        return _text_key(row[key_index])
+
+    def open_writer(value):
+        out_dir = os.path.join(out_folder, value) if folder else out_folder
+        return _open_output(layer, desc, src_names, out_dir, value + ".shp")
+
+    encode, decode = _geometry_codec(desc.spatialReference)
+    with arcpy.da.SearchCursor(layer, src_names + ["SHAPE@"],
+                               where_clause) as cursor:
+        counts, skipped, spilled = partition_rows(
+            cursor, key, open_writer, max_open=max_open,
+            encode=encode, decode=decode)
+    logger("exported {0} values, {1} features; skipped {2} empty values, "
+           "{3} features spilled to temporary files".format(
+        len(counts), sum(counts.values()), skipped, spilled))
+    return counts
+
+
+def export_hierarchy(layer, fields, out_folder, derive=None, drop_fields=None,
+                     max_open=32, where_clause=None, logger=print):
+    """按多个字段逐级拆分要素类（一次读取），每一级都输出
+    输出为 shp 时（out_folder 为文件夹），以 ["XJQYMC", "CJQYMC"] 为例：
+        out_folder/乡镇/乡镇.shp
+        out_folder/乡镇/乡镇/村.shp
+    即非最后一级的值 v 输出为 <上级文件夹>/v/v.shp，下一级输出到 <上级文件夹>/v/v；
+    最后一级输出为 <上级文件夹>/v.shp。
+    out_folder 为 .gdb 时输出为 gdb 中的要素类，名称为各级的值用 _ 连接。
+    <某一级为空值或空字符串时，该要素只输出到上面的各级>
+    :param layer: {String} 图层或者要素类
+    :param fields: {List} 各级的字段，从上到下
+    :param out_folder: {String} 输出文件夹或者 gdb
+    :param derive: {Function} derive(row, seq) 计算派生字段，写出前调用；
+        row 为 {字段名: 值}，seq 为该要素在各级输出中的序号（从 0 开始）组成的元组，
+        返回 {字段名: 新值}，该要素写入所有级的输出都使用新值
+    :param drop_fields: {List} 输出中删除的字段（可以在 derive 中使用）
+    :param max_open: {Int} 同时打开的 InsertCursor 数量
+    :param where_clause: {String} 只导出满足条件的要素
+    :param logger: {Function} 日志输出函数
+    :return: {OrderedDict} 各级值组成的元组 -> 要素数量
+    """
+    import arcpy
+    desc = arcpy.Describe(layer)
+    src_names = _editable_fields(layer)
+    lower_names = [n.lower() for n in src_names]
+    for field in fields:
+        if field.lower() not in lower_names:
+            raise RuntimeError("{0} field doesn't exist".format(field))
+    key_indexes = [lower_names.index(f.lower()) for f in fields]
+    positions = dict((n, i) for i, n in enumerate(lower_names))
+    depth = len(fields)
+    gdb = out_folder.lower().rstrip("\\/").endswith(".gdb")
+    seen = {}
+
+    def key(row):
+        # 每行只调用一次，在这里计算派生字段（row 为列表，直接修改）
+        prefixes = []
+        for i in key_indexes:
+            value = _text_key(row[i])
+            if value is None:
+                break
+            prefixes.append((prefixes[-1] if prefixes else ()) + (value,))
+        if derive is not None and prefixes:
+            seq = tuple(seen.get(p, 0) for p in prefixes)
+            updates = derive(dict(zip(src_names, row)), seq)
+            for name, value in (updates or {}).items():
+                row[positions[name.lower()]] = value
+        for p in prefixes:
+            seen[p] = seen.get(p, 0) + 1
+        return prefixes
+
+    def open_writer(prefix):
+        if gdb:
+            name = arcpy.ValidateTableName("_".join(prefix), out_folder)
+            return _open_output(layer, desc, src_names, out_folder, name,
+                                drop_fields)
+        out_dir = out_folder
+        for value in prefix[:-1]:
+            out_dir = os.path.join(out_dir, value, value)
+        if len(prefix) < depth:
+            out_dir = os.path.join(out_dir, prefix[-1])
+        return _open_output(layer, desc, src_names, out_dir,
+                            prefix[-1] + ".shp", drop_fields)
+
+    encode, decode = _geometry_codec(desc.spatialReference)
+    with arcpy.da.SearchCursor(layer, src_names + ["SHAPE@"],
+                               where_clause) as cursor:
+        counts, skipped, spilled = partition_rows(
+            (list(row) for row in cursor), key, open_writer,
+            max_open=max_open, encode=encode, decode=decode, multi=True)
+    for level, field in enumerate(fields):
+        values = [k for k in counts if len(k) == level + 1]
+        logger("{0}: exported {1} values, {2} features".format(
+            field, len(values), sum(counts[k] for k in values)))
+    logger("skipped {0} features with empty {1}; {2} rows spilled to "
+           "temporary files".format(skipped, fields[0], spilled))
+    return counts
@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# ---------------------------------------------------------------------------
+# Author: LiaoChenchen
+# Created on: 2026/10/18 17:40
+# Reference:
+"""
+Description: 计时和性能记录，替代 hybasic2.timewrap / timewrap_cpu
+  python2 / python3
+
+  记录墙上时间、CPU 时间和进程内存峰值。计时段（span）可以嵌套，同一父节点下
+  同名的计时段会合并（累计次数和时间），所以循环中调用也不会无限占用内存。
+  每个线程有自己的计时栈，多个线程可以同时记录到同一个 Recorder。
+
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+    # span: 上下文管理器，记录一段代码
+    # timed: 装饰器，支持任意参数，保留返回值
+    # profile_calls: 上下文管理器，自动记录指定文件夹中所有函数的调用
+    # hook_tools: 环境变量 HY_PROFILE 存在时，自动记录 toolscript 中的所有函数，
+                  程序退出时输出到 HY_PROFILE 指定的 json 或 csv 文件
+    # Recorder: 记录器，to_json、to_csv、report 输出结果
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+Usage:
+    with span("dissolve"):
+        arcpy.Dissolve_management(...)
+
+    @timed()
+    def export_by_filed(layer, field, output, folder): ...
+
+    recorder.to_json(u"D:/profile.json")
+
+    命令行，记录一个工具脚本中所有函数的耗时:
+    python hyprofile.py D:/profile.json toolscript/export_by_field.py 参数...
+"""
+# ---------------------------------------------------------------------------
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+import atexit
+import csv
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# 墙上时间
+_wall = getattr(time, "perf_counter", time.time)
+
+
+def _cpu():
+    """进程 CPU 时间（用户 + 系统）。python2 在 Windows 下 time.clock 是墙上时间，
+    所以使用 os.times"""
+    process_time = getattr(time, "process_time", None)
+    if process_time is not None:
+        return process_time()
+    t = os.times()
+    return t[0] + t[1]
+
+
+def _peak_rss_windows():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    get_info = ctypes.windll.psapi.GetProcessMemoryInfo
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+
+    def peak():
+        get_info(handle, ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize
+    return peak
+
+
+def _peak_rss_posix():
+    import resource
+    # Linux 单位为 KB，macOS 为字节
+    scale = 1 if sys.platform == "darwin" else 1024
+
+    def peak():
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    return peak
+
+
+def _make_peak_rss():
+    """:return: {Function} 返回进程内存峰值（字节）的函数，不支持时返回 None"""
+    try:
+        if sys.platform == "win32":
+            return _peak_rss_windows()
+        return _peak_rss_posix()
+    except (ImportError, AttributeError, OSError):
+        return None
+
+
+peak_rss = _make_peak_rss()
+
+
+class Span(object):
+    """计时段（同名合并后的节点）
+    calls: 次数; wall: 墙上时间合计（秒）; cpu: CPU 时间合计（秒）;
+    peak_rss: 结束时进程内存峰值的最大值（字节，不支持时为 None）
+    """
+    __slots__ = ("name", "calls", "wall", "cpu", "peak_rss", "children")
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_rss = None
+        self.children = OrderedDict()
+
+    def to_dict(self):
+        return OrderedDict([
+            ("name", self.name), ("calls", self.calls),
+            ("wall", round(self.wall, 6)), ("cpu", round(self.cpu, 6)),
+            ("peak_rss", self.peak_rss),
+            ("children", [c.to_dict() for c in self.children.values()])])
+
+
+class Recorder(object):
+    """记录器：根节点下保存所有计时段"""
+    def __init__(self, memory=True):
+        """:param memory: {Boolean} 是否记录内存峰值"""
+        self.root = Span("root")
+        self.memory = memory and peak_rss is not None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self, name):
+        """开始一个计时段，嵌套在当前线程最近一个未结束的计时段下"""
+        stack = self._stack()
+        parent = stack[-1][0] if stack else self.root
+        with self._lock:
+            node = parent.children.get(name)
+            if node is None:
+                node = parent.children[name] = Span(name)
+        stack.append((node, _wall(), _cpu()))
+
+    def stop(self):
+        """结束当前线程最近一个计时段
+        :return: {Tuple} (节点, 本次墙上时间, 本次 CPU 时间)
+        """
+        node, wall0, cpu0 = self._stack().pop()
+        wall = _wall() - wall0
+        cpu = _cpu() - cpu0
+        peak = peak_rss() if self.memory else None
+        with self._lock:
+            node.calls += 1
+            node.wall += wall
+            node.cpu += cpu
+            if peak is not None and (node.peak_rss is None or
+                                     peak > node.peak_rss):
+                node.peak_rss = peak
+        return node, wall, cpu
+
+    def reset(self):
+        with self._lock:
+            self.root = Span("root")
+
+    def to_dict(self):
+        return [c.to_dict() for c in self.root.children.values()]
+
+    def rows(self):
+        """:return: 生成器，(路径, 深度, 节点)，路径用 / 连接"""
+        stack = [(c, c.name, 0) for c in
+                 reversed(list(self.root.children.values()))]
+        while stack:
+            node, path, depth = stack.pop()
+            yield path, depth, node
+            stack.extend((c, path + "/" + c.name, depth + 1) for c in
+                         reversed(list(node.children.values())))
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    def to_csv(self, path):
+        # python2 的 csv 模块需要二进制模式
+        mode = "wb" if sys.version_info[0] == 2 else "w"
+        kwargs = {} if sys.version_info[0] == 2 else {"newline": ""}
+        with open(path, mode, **kwargs) as f:
+            writer = csv.writer(f)
+            writer.writerow(["path", "depth", "calls", "wall", "cpu",
+                             "peak_rss"])
+            for span_path, depth, node in self.rows():
+                if sys.version_info[0] == 2 and isinstance(span_path, unicode):
+                    span_path = span_path.encode("utf-8")
+                writer.writerow([span_path, depth, node.calls,
+                                 round(node.wall, 6), round(node.cpu, 6),
+                                 node.peak_rss])
+
+    def save(self, path):
+        """按扩展名输出为 csv 或者 json"""
+        if path.lower().endswith(".csv"):
+            self.to_csv(path)
+        else:
+            self.to_json(path)
+
+    def report(self):
+        """:return: {List} 缩进的文本，每个元素为一行"""
+        lines = []
+        for _, depth, node in self.rows():
+            mem = ("" if node.peak_rss is None else
+                   ", peak {0:.1f}MB".format(node.peak_rss / 1024.0 / 1024.0))
+            lines.append("{0}{1}: {2} calls, wall {3:.3f}s, cpu {4:.3f}s{5}"
+                         .format("    " * depth, node.name, node.calls,
+                                 node.wall, node.cpu, mem))
+        return lines
+
+
+# 默认记录器
+recorder = Recorder()
+
+
+class span(object):
+    """上下文管理器，记录一段代码
+    :param name: {String} 名称
+    :param log: {Function} log(节点, 本次墙上时间, 本次 CPU 时间)，结束时调用
+    :param rec: {Recorder} 记录器，默认使用模块的 recorder
+    """
+    def __init__(self, name, log=None, rec=None):
+        self.name = name
+        self.log = log
+        self.rec = rec
+
+    def __enter__(self):
+        (self.rec or recorder).start(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        result = (self.rec or recorder).stop()
+        if self.log is not None:
+            self.log(*result)
+        return False
+
+
+def timed(name=None, log=None, rec=None):
+    """装饰器，支持任意参数，保留返回值
+    :param name: {String} 名称，默认为 模块.函数名
+    :param log: 同 span
+    :param rec: 同 span
+    """
+    def decorator(func):
+        span_name = name or "{0}.{1}".format(func.__module__, func.__name__)
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            with span(span_name, log, rec):
+                return func(*args, **kwargs)
+        return inner
+    return decorator
+
+
+_THIS_MODULE = os.path.splitext(os.path.normcase(os.path.abspath(__file__)))[0]
+
+
+class profile_calls(object):
+    """上下文管理器：自动记录 folders 中的 .py 文件里定义的所有函数的调用
+    （使用 sys.setprofile，只在需要的时候开启，会减慢程序运行）
+    :param folders: {List} 文件夹地址
+    :param rec: {Recorder} 记录器
+    """
+    def __init__(self, folders, rec=None):
+        self.folders = tuple(os.path.normcase(os.path.abspath(f)) + os.sep
+                             for f in folders)
+        self.rec = rec or recorder
+        # code 对象 -> 计时段名称（None 表示不记录）
+        self._names = {}
+        self._local = threading.local()
+
+    def _name(self, code):
+        try:
+            return self._names[code]
+        except KeyError:
+            filename = code.co_filename
+            name = None
+            # "<string>"、"<frozen ...>" 等不是文件；不记录本模块自己的函数
+            if not filename.startswith("<"):
+                filename = os.path.normcase(os.path.abspath(filename))
+                if (filename.startswith(self.folders) and
+                        os.path.splitext(filename)[0] != _THIS_MODULE):
+                    module = os.path.splitext(os.path.basename(filename))[0]
+                    name = "{0}.{1}".format(module, code.co_name)
+            self._names[code] = name
+            return name
+
+    def _profile(self, frame, event, arg):
+        if event == "call":
+            name = self._name(frame.f_code)
+            if name is not None:
+                self.rec.start(name)
+                frames = getattr(self._local, "frames", None)
+                if frames is None:
+                    frames = self._local.frames = []
+                frames.append(frame)
+        elif event == "return":
+            frames = getattr(self._local, "frames", None)
+            if frames and frames[-1] is frame:
+                frames.pop()
+                self.rec.stop()
+
+    def __enter__(self):
+        threading.setprofile(self._profile)
+        sys.setprofile(self._profile)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.setprofile(None)
+        threading.setprofile(None)
+        # 没有返回的函数（例如 sys.exit）也要结束计时
+        frames = getattr(self._local, "frames", None) or []
+        while frames:
+            frames.pop()
+            self.rec.stop()
+        return False
+
+
+TOOLSCRIPT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "toolscript")
+
+
+def hook_tools(env="HY_PROFILE"):
+    """环境变量 env 存在时，记录 toolscript 和 libs 中所有函数的调用，
+    输出到环境变量指定的文件（.csv 或者 .json）
+    :return: {Function} 停止记录并输出文件的函数（只执行一次），
+        没有开启时返回 None。程序退出时也会自动执行；
+        在 ArcMap 进程内运行的工具需要在结束时主动调用
+    """
+    output = os.environ.get(env)
+    if not output:
+        return None
+    profiler = profile_calls([TOOLSCRIPT_DIR, os.path.dirname(
+        os.path.abspath(__file__))])
+    profiler.__enter__()
+    done = []
+
+    def dump():
+        if done:
+            return
+        done.append(True)
+        profiler.__exit__(None, None, None)
+        recorder.save(output)
+    atexit.register(dump)
+    return dump
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print("usage: python hyprofile.py <output.json|csv> <script.py> [args]")
+        sys.exit(2)
+    import runpy
+    out_path, script = sys.argv[1], sys.argv[2]
+    sys.argv = sys.argv[2:]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    try:
+        with profile_calls([os.path.dirname(os.path.abspath(script)),
+                            os.path.dirname(os.path.abspath(__file__))]):
+            runpy.run_path(script, run_name="__main__")
+    finally:
+        recorder.save(out_path)
+        for line in recorder.report():
+            print(line)
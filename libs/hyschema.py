@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# ---------------------------------------------------------------------------
+# Author: LiaoChenchen
+# Created on: 2026/10/18 20:45
+# Reference:
+"""
+Description: 字段结构迁移（添加、删除、修改类型），替代 ezarcpy2.add_field 的逐个添加
+  python2
+
+  shp 每调用一次 AddField_management / DeleteField_management 都会重写整个
+  dbf，add_field 添加 6 个已经存在的字段（delete=True）要重写 12 次。
+  这里先用 ListFields 和目标字段比较（diff_schema），再决定做法：
+    - 只需要一次改动（添加一个字段，或者一次删除多个字段）时直接在原表上改；
+      （删除字段时多个字段放在一次 DeleteField_management 中）
+    - gdb 中的要素类添加、删除字段不重写数据，也直接在原表上改；
+    - 其他情况重建一次：按原表新建空的临时要素类，在空表上调整字段（很快），
+      用游标复制一遍数据（修改类型的字段在复制时转换），再替换原表。
+
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+    # FieldSpec: 字段定义（名称、类型、长度、别名）
+    # diff_schema: 比较现有字段和目标字段，不依赖 arcpy
+    # convert_value: 修改字段类型时转换值
+    # migrate_schema: 按目标字段修改表结构，重写次数最少
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+Usage:
+    migrate_schema(u"D:/LQDK.shp",
+                   [FieldSpec("ZWMC1", "TEXT", 50), FieldSpec("MJ", "DOUBLE")],
+                   drop=["TEMP"])
+"""
+# ---------------------------------------------------------------------------
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+import datetime
+import os
+from collections import namedtuple
+
+# ListFields 的字段类型 -> AddField_management 的字段类型
+FIELD_TYPES = {
+    "String": "TEXT",
+    "Integer": "LONG",
+    "SmallInteger": "SHORT",
+    "Double": "DOUBLE",
+    "Single": "FLOAT",
+    "Date": "DATE",
+    "Blob": "BLOB",
+    "Raster": "RASTER",
+    "Guid": "GUID",
+}
+
+
+class FieldSpec(namedtuple("FieldSpec", "name type length alias")):
+    """字段定义，type 为 AddField_management 的类型（TEXT、LONG、DOUBLE ...），
+    length 只对 TEXT 有效，None 表示不限定（比较时不比较长度）
+    """
+    __slots__ = ()
+
+    def __new__(cls, name, type, length=None, alias=None):
+        return super(FieldSpec, cls).__new__(
+            cls, name, type.upper(), length, alias)
+
+    @classmethod
+    def from_field(cls, field):
+        """由 arcpy.ListFields 返回的 Field 对象创建，OID、几何字段返回 None"""
+        f_type = FIELD_TYPES.get(field.type)
+        if f_type is None:
+            return None
+        return cls(field.name, f_type, field.length, field.aliasName)
+
+
+SchemaDiff = namedtuple("SchemaDiff", "adds drops retypes resets unchanged")
+
+
+def _differs(current, desired):
+    if current.type != desired.type:
+        return True
+    return (desired.type == "TEXT" and desired.length is not None
+            and desired.length != current.length)
+
+
+def diff_schema(current, desired, drop=None, reset=None, retype=True):
+    """比较现有字段和目标字段（字段名不区分大小写）
+    :param current: {List} 现有字段 FieldSpec（可以由 FieldSpec.from_field 创建）
+    :param desired: {List} 目标字段 FieldSpec，只列出需要添加或修改的字段，
+        没有列出的字段保持不变
+    :param drop: {List} 需要删除的字段名
+    :param reset: {List} 需要清空（删除后重新添加）的字段名，须在 desired 中
+    :param retype: {Boolean} False 类型或长度不同的现有字段保持不变（计入 unchanged）
+    :return: {SchemaDiff} adds: 新增的 FieldSpec；drops: 删除的现有字段名；
+        retypes: 修改类型或长度的 (现有, 目标) FieldSpec；
+        resets: 清空的 FieldSpec；unchanged: 目标字段中已经符合的字段名
+    """
+    existing = dict((f.name.lower(), f) for f in current)
+    drop = set(n.lower() for n in drop or ())
+    reset = set(n.lower() for n in reset or ())
+    adds, retypes, resets, unchanged = [], [], [], []
+    for spec in desired:
+        old = existing.get(spec.name.lower())
+        if old is None:
+            adds.append(spec)
+        elif spec.name.lower() in reset:
+            resets.append(spec._replace(name=old.name))
+        elif retype and _differs(old, spec):
+            retypes.append((old, spec._replace(name=old.name)))
+        else:
+            unchanged.append(old.name)
+    desired_names = set(s.name.lower() for s in desired)
+    drops = [f.name for f in current
+             if f.name.lower() in drop and f.name.lower() not in desired_names]
+    return SchemaDiff(adds, drops, retypes, resets, unchanged)
+
+
+def convert_value(value, spec):
+    """修改字段类型时转换值，无法转换时返回 None
+    :param value: 原来的值
+    :param spec: {FieldSpec} 目标字段
+    """
+    if value is None:
+        return None
+    try:
+        if spec.type == "TEXT":
+            if not isinstance(value, basestring):
+                value = unicode(value)
+            return value[:spec.length] if spec.length else value
+        if spec.type in ("LONG", "SHORT"):
+            return int(float(value))
+        if spec.type in ("DOUBLE", "FLOAT"):
+            return float(value)
+        if spec.type == "DATE":
+            return value if isinstance(value, datetime.datetime) else None
+    except (TypeError, ValueError):
+        return None
+    return value
+
+
+def _add_field(table, spec):
+    import arcpy
+    arcpy.AddField_management(table, spec.name, spec.type,
+                              field_length=spec.length,
+                              field_alias=spec.alias)
+
+
+def _in_geodatabase(path):
+    while True:
+        parent = os.path.dirname(path)
+        if parent == path:
+            return False
+        if os.path.splitext(parent)[1].lower() in (".gdb", ".mdb", ".sde"):
+            return True
+        path = parent
+
+
+def _in_place(table, diff, logger):
+    import arcpy
+    deletes = diff.drops + [spec.name for spec in diff.resets]
+    if deletes:
+        # 一次删除多个字段
+        arcpy.DeleteField_management(table, deletes)
+        logger(u"Deleted fields: {0}".format(u",".join(deletes)))
+    for spec in diff.adds + diff.resets:
+        _add_field(table, spec)
+        logger(u"Created {0} field success".format(spec.name))
+
+
+def _rebuild(table, diff, logger):
+    """按原表新建临时表，在空表上调整字段，复制一遍数据后替换原表"""
+    import arcpy
+    desc = arcpy.Describe(table)
+    path = desc.catalogPath
+    workspace, name = os.path.split(path)
+    base, ext = os.path.splitext(name)
+    temp_name = arcpy.CreateUniqueName(base + "_schema" + ext, workspace)
+    temp_name = os.path.basename(temp_name)
+    temp = os.path.join(workspace, temp_name)
+    spatial = hasattr(desc, "shapeType")
+    if spatial:
+        arcpy.CreateFeatureclass_management(
+            workspace, temp_name, desc.shapeType.upper(), path,
+            "SAME_AS_TEMPLATE", "SAME_AS_TEMPLATE", desc.spatialReference)
+    else:
+        arcpy.CreateTable_management(workspace, temp_name, path)
+
+    try:
+        # 空表上修改字段不需要重写数据
+        changed = ([old.name for old, _ in diff.retypes] +
+                   [spec.name for spec in diff.resets])
+        if diff.drops or changed:
+            arcpy.DeleteField_management(temp, diff.drops + changed)
+        for spec in diff.adds + [new for _, new in diff.retypes] + diff.resets:
+            _add_field(temp, spec)
+
+        skip = set(n.lower() for n in
+                   diff.drops + [spec.name for spec in diff.resets])
+        copy = [f.name for f in arcpy.ListFields(path)
+                if f.type not in ("OID", "Geometry") and f.editable
+                and f.name.lower() not in skip]
+        if spatial:
+            copy.append("SHAPE@")
+        retyped = dict((old.name.lower(), new) for old, new in diff.retypes)
+        converters = [(i, retyped[n.lower()]) for i, n in enumerate(copy)
+                      if n.lower() in retyped]
+        failed = 0
+        with arcpy.da.SearchCursor(path, copy) as s_cursor, \
+                arcpy.da.InsertCursor(temp, copy) as i_cursor:
+            for row in s_cursor:
+                if converters:
+                    row = list(row)
+                    for i, spec in converters:
+                        value = convert_value(row[i], spec)
+                        if value is None and row[i] is not None:
+                            failed += 1
+                        row[i] = value
+                i_cursor.insertRow(row)
+        if failed:
+            logger(u"{0} values could not be converted, set to null".format(
+                failed))
+    except Exception:
+        arcpy.Delete_management(temp)
+        raise
+    try:
+        arcpy.Delete_management(path)
+    except Exception:
+        # 原表没有删除（例如被锁定），丢弃临时表
+        arcpy.Delete_management(temp)
+        raise
+    try:
+        arcpy.Rename_management(temp, path)
+    except Exception:
+        # 原表已经删除，数据只在临时表中，不能删除
+        logger(u"Rebuilt data kept in {0}".format(temp))
+        raise
+    logger(u"Rebuilt {0}: added {1}, deleted {2}, retyped {3}, reset {4}".format(
+        name, len(diff.adds), len(diff.drops), len(diff.retypes),
+        len(diff.resets)))
+
+
+def migrate_schema(table, fields, drop=None, reset=None, rebuild=None,
+                   retype=True, logger=print):
+    """按目标字段修改表结构（添加、删除、修改类型、清空），重写数据的次数最少
+    <重建时修改类型、清空的字段会移到最后；图层的定义查询、选择集不影响复制>
+    :param table: {String} 要素类、表或者图层
+    :param fields: {List} 目标字段 FieldSpec，没有列出的字段保持不变
+    :param drop: {List} 需要删除的字段名
+    :param reset: {List} 需要清空（删除后重新添加）的字段名
+    :param rebuild: {Boolean} None 自动选择；True 总是重建；False 不重建
+        （有修改类型的字段时不能为 False）。原表被锁定（例如在 ArcMap 中打开）
+        时不重建，在原表上修改。重建会丢失索引、关系类和元数据
+    :param retype: {Boolean} False 不修改现有字段的类型和长度，也就不会因此重建
+    :param logger: {Function} 日志输出函数
+    :return: {SchemaDiff} 比较的结果，没有需要修改的字段时不做任何操作
+    """
+    import arcpy
+    current = [s for s in map(FieldSpec.from_field, arcpy.ListFields(table))
+               if s is not None]
+    diff = diff_schema(current, fields, drop, reset, retype)
+    if diff.unchanged:
+        logger(u"Field exist: {0}".format(u",".join(diff.unchanged)))
+    if not (diff.adds or diff.drops or diff.retypes or diff.resets):
+        return diff
+    if rebuild is None:
+        if diff.retypes:
+            rebuild = True
+        elif _in_geodatabase(arcpy.Describe(table).catalogPath):
+            rebuild = False
+        else:
+            # shp 上每添加一个字段、每次删除都重写一次数据
+            rewrites = (len(diff.adds) + len(diff.resets) +
+                        (1 if diff.drops or diff.resets else 0))
+            rebuild = rewrites > 1
+    if rebuild and not arcpy.TestSchemaLock(arcpy.Describe(table).catalogPath):
+        # 重建需要删除原表，被锁定时只能在原表上修改
+        if diff.retypes:
+            raise ValueError("retyped fields need rebuild, table is locked")
+        logger(u"Table is locked, fields are changed in place")
+        rebuild = False
+    if rebuild:
+        _rebuild(table, diff, logger)
+    elif diff.retypes:
+        raise ValueError("retyped fields need rebuild")
+    else:
+        _in_place(table, diff, logger)
+    return diff
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# ---------------------------------------------------------------------------
+# Author: LiaoChenchen
+# Created on: 2026/10/18 21:20
+# Reference:
+"""
+Description: 完全融合（union all），替代 merger_all 的临时字段 + Dissolve
+  python2
+
+  原来的 merger_all 给输入图层添加字段 test1f2lcc、逐行赋值 1、按该字段融合，
+  最后删除字段，输入数据被改写两次；merger_all_layers 还要先 Merge 一份。
+  这里直接用游标读取各个输入图层的几何，逐级两两合并（cascade），不修改输入。
+
+  cascade 与几何库无关，只需要一个二元的 union 函数：
+    读入的几何像二进制计数一样在同级之间合并，参与合并的几何大小相近，
+    内存中最多保留 log2(n) 个中间结果。
+  arcpy 的 Geometry.union 是默认的实现；多进程时先从图层读取 OID
+  （定义查询和选择集都有效），分段后每个进程按 OID 列表读取一段数据并合并，
+  返回 WKB，主进程再 cascade 各进程的结果。
+
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+    # cascade: 逐级两两合并，不依赖 arcpy
+    # union_all: 合并一个或多个图层的所有要素，输出一个要素
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+Usage:
+    union_all([u"D:/LQDK.shp", u"D:/JBNT.shp"], u"D:/result.gdb/all",
+              processes=4)
+"""
+# ---------------------------------------------------------------------------
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+import multiprocessing
+
+import hychunk
+
+# 每个 OID IN (...) 条件中的 OID 个数上限
+IN_CLAUSE_SIZE = 1000
+
+
+def cascade(items, union):
+    """逐级两两合并（只遍历一次 items）
+    :param items: {Iterable} 需要合并的对象，None 跳过
+    :param union: {Function} union(a, b) 返回 a、b 合并后的对象
+    :return: 合并的结果，没有对象时返回 None
+    """
+    stack = []  # (级别, 对象)，从栈底到栈顶级别递减
+    for item in items:
+        if item is None:
+            continue
+        level = 0
+        while stack and stack[-1][0] == level:
+            item = union(stack.pop()[1], item)
+            level += 1
+        stack.append((level, item))
+    if not stack:
+        return None
+    result = stack.pop()[1]
+    while stack:
+        result = union(stack.pop()[1], result)
+    return result
+
+
+def _geometry_union(a, b):
+    return a.union(b)
+
+
+def _read_geometries(dataset, where_clause=None, spatial_reference=None):
+    import arcpy
+    with arcpy.da.SearchCursor(dataset, ["SHAPE@"], where_clause,
+                               spatial_reference) as cursor:
+        for row in cursor:
+            yield row[0]
+
+
+def _union_part(args):
+    """进程池中执行：读取一段数据并合并
+    :return: 合并结果的 WKB，没有要素时返回 None
+    """
+    import arcpy
+    dataset, where_clauses, sr_string = args
+    # SpatialReference 不能传给子进程，用字符串重建
+    spatial_reference = arcpy.SpatialReference()
+    spatial_reference.loadFromString(sr_string)
+    geometries = (g for where_clause in where_clauses
+                  for g in _read_geometries(dataset, where_clause,
+                                            spatial_reference))
+    result = cascade(geometries, _geometry_union)
+    return None if result is None else bytes(result.WKB)
+
+
+def _part_tasks(layer, parts, spatial_reference):
+    """按 OID 把一个图层分为 parts 段，每段为 (数据源, [where], 参考系)
+    OID 从图层读取，图层的定义查询和选择集都有效；子进程按数据源读取，
+    where 是明确的 OID IN (...) 列表（OID 范围会包含未选择的要素）
+    """
+    import arcpy
+    desc = arcpy.Describe(layer)
+    with arcpy.da.SearchCursor(layer, ["OID@"]) as cursor:
+        oids = sorted(row[0] for row in cursor)
+    oid_field = arcpy.AddFieldDelimiters(desc.catalogPath, desc.OIDFieldName)
+    tasks = []
+    for part in hychunk.chunk_contiguous(oids, parts):
+        if not part:
+            continue
+        clauses = ["{0} IN ({1})".format(
+            oid_field, ",".join(str(oid) for oid in part[i:i + IN_CLAUSE_SIZE]))
+            for i in range(0, len(part), IN_CLAUSE_SIZE)]
+        tasks.append((desc.catalogPath, clauses,
+                      spatial_reference.exportToString()))
+    return tasks
+
+
+def union_all(layers, output, processes=1, logger=print):
+    """合并一个或多个图层的所有要素（完全融合，消除重叠），不修改输入图层
+    :param layers: {List} 图层或者要素类，几何类型需要相同
+    :param output: {String} 输出要素类，只有一个要素，没有属性字段
+    :param processes: {Int} 进程数，默认 1 在当前进程中读取；
+        不论进程数，图层的定义查询和选择集都有效
+    :param logger: {Function} 日志输出函数
+    :return: {String} output
+    """
+    import arcpy
+    if not isinstance(layers, (list, tuple)):
+        layers = [layers]
+    # 所有图层的几何都投影到第一个图层的参考系
+    spatial_reference = arcpy.Describe(layers[0]).spatialReference
+    if processes <= 1:
+        geometries = (g for layer in layers
+                      for g in _read_geometries(layer, None, spatial_reference))
+        result = cascade(geometries, _geometry_union)
+    else:
+        tasks = []
+        for layer in layers:
+            tasks.extend(_part_tasks(layer, processes, spatial_reference))
+        pool = multiprocessing.Pool(processes)
+        try:
+            parts = pool.imap(_union_part, tasks)
+            result = cascade(
+                (arcpy.FromWKB(bytearray(wkb), spatial_reference)
+                 for wkb in parts if wkb is not None),
+                _geometry_union)
+        finally:
+            pool.close()
+            pool.join()
+        logger("unioned {0} parts in {1} processes".format(
+            len(tasks), processes))
+    if result is None:
+        raise RuntimeError("no features to union")
+    arcpy.CopyFeatures_management([result], output)
+    return output
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+# ---------------------------------------------------------------------------
+# Author: LiaoChenchen
+# Created on: 2026/10/18 19:40
+# Reference:
+"""
+Description: 字段值统计（唯一值、计数、空值、最大最小值），只读一遍数据
+  python2 / python3
+
+  原来的 field_value_shower 用 `if row[0] not in _list` 去重，唯一值多时是
+  O(n*m)。这里用字典计数，每行 O(1)；唯一值保持首次出现的顺序。
+  空值、空字符串、最大最小值都在读完后从唯一值中计算，不影响逐行的速度。
+  多个字段、组合字段（多个字段的值组成的元组）在同一遍读取中统计。
+
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+    # ValueCounts: 一个字段（或组合字段）的唯一值及计数
+    # count_values: 统计行（元组）中各字段的值，不依赖 arcpy
+    # field_values: count_values 的 arcpy 适配，读取图层或者要素类
++++++++++++++++++++++++++++++++++++FUNCTION+++++++++++++++++++++++++++++++++++++
+Usage:
+    stats = field_values(u"D:/LQDK.shp", ["XJQYMC", "CJQYMC"],
+                         composite=[("XJQYMC", "CJQYMC")])
+    xj = stats["XJQYMC"]
+    print(xj.distinct, xj.nulls, xj.blanks, xj.min, xj.max)
+    for value, n in stats[("XJQYMC", "CJQYMC")].items():
+        print(value, n)
+"""
+# ---------------------------------------------------------------------------
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import division
+from collections import OrderedDict
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+
+def _is_blank(value):
+    return isinstance(value, string_types) and not value.strip()
+
+
+class ValueCounts(object):
+    """一个字段（或组合字段）的唯一值及计数
+    组合字段的值为元组，任意一个分量为空值（None）算作空值，
+    任意一个分量为空字符串算作空字符串
+    """
+    __slots__ = ("counts", "order", "composite")
+
+    def __init__(self, composite=False):
+        self.counts = {}
+        self.order = []  # 唯一值，首次出现的顺序
+        self.composite = composite
+
+    def add(self, value):
+        counts = self.counts
+        if value in counts:
+            counts[value] += 1
+        else:
+            counts[value] = 1
+            self.order.append(value)
+
+    def _null(self, value):
+        if self.composite:
+            return any(v is None for v in value)
+        return value is None
+
+    def _blank(self, value):
+        if self.composite:
+            return (not self._null(value)) and any(_is_blank(v) for v in value)
+        return _is_blank(value)
+
+    @property
+    def values(self):
+        """唯一值列表（首次出现的顺序，包括空值和空字符串）"""
+        return list(self.order)
+
+    @property
+    def distinct(self):
+        return len(self.order)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def nulls(self):
+        return sum(self.counts[v] for v in self.order if self._null(v))
+
+    @property
+    def blanks(self):
+        return sum(self.counts[v] for v in self.order if self._blank(v))
+
+    def _valued(self):
+        return [v for v in self.order
+                if not (self._null(v) or self._blank(v))]
+
+    @property
+    def min(self):
+        """最小值（不包括空值和空字符串），没有值时为 None"""
+        valued = self._valued()
+        return min(valued) if valued else None
+
+    @property
+    def max(self):
+        valued = self._valued()
+        return max(valued) if valued else None
+
+    def items(self):
+        """:return: {List} (值, 数量)，首次出现的顺序"""
+        counts = self.counts
+        return [(v, counts[v]) for v in self.order]
+
+    def most_common(self, n=None):
+        """:return: {List} (值, 数量)，按数量从大到小，数量相同时按首次出现的顺序"""
+        ranked = sorted(self.items(), key=lambda item: -item[1])
+        return ranked if n is None else ranked[:n]
+
+    def __len__(self):
+        return len(self.order)
+
+    def __repr__(self):
+        return "<ValueCounts distinct={0} total={1}>".format(
+            self.distinct, self.total)
+
+
+def count_values(rows, names, composite=None):
+    """统计行中各字段的值（只遍历一次 rows）
+    :param rows: {Iterable} 行（元组或列表），如 arcpy.da.SearchCursor
+    :param names: {List} 行中各位置对应的字段名
+    :param composite: {List} 组合字段，每个元素为字段名组成的元组
+    :return: {OrderedDict} 字段名（组合字段为元组）-> ValueCounts，
+        先是 names 中的字段，然后是组合字段
+    """
+    names = list(names)
+    result = OrderedDict((name, ValueCounts()) for name in names)
+    singles = [(i, result[name].counts, result[name].order)
+               for i, name in enumerate(names)]
+    composites = []
+    for key in composite or ():
+        key = tuple(key)
+        indexes = tuple(names.index(name) for name in key)
+        result[key] = ValueCounts(composite=True)
+        composites.append((indexes, result[key].counts, result[key].order))
+
+    # 逐行只做字典计数，不调用方法
+    for row in rows:
+        for i, counts, order in singles:
+            value = row[i]
+            if value in counts:
+                counts[value] += 1
+            else:
+                counts[value] = 1
+                order.append(value)
+        for indexes, counts, order in composites:
+            value = tuple([row[i] for i in indexes])
+            if value in counts:
+                counts[value] += 1
+            else:
+                counts[value] = 1
+                order.append(value)
+    return result
+
+
+def field_values(layer, fields, composite=None, where_clause=None):
+    """统计图层中一个或多个字段的值（一次读取）
+    :param layer: {String} 图层或者要素类
+    :param fields: {String/List} 字段
+    :param composite: {List} 组合字段，如 [("XJQYMC", "CJQYMC")]，
+        组合字段中的字段可以不在 fields 中
+    :param where_clause: {String} 只统计满足条件的要素
+    :return: {OrderedDict} 字段名（组合字段为元组）-> ValueCounts
+    """
+    import arcpy
+    if isinstance(fields, string_types):
+        fields = [fields]
+    read = list(fields)
+    for key in composite or ():
+        read.extend(name for name in key if name not in read)
+    with arcpy.da.SearchCursor(layer, read, where_clause) as cursor:
+        result = count_values(cursor, read, composite)
+    # 只为组合字段读取的字段不返回
+    for name in read[len(fields):]:
+        del result[name]
+    return result
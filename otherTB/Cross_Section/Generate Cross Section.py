@@ -1,8 +1,27 @@
 # ArcGis Toolbox: Generate Cross Section
 # Converts the 2D image of a cross section into a 3D oject that can be displayed in ArcScene
 # Autor: Riccardo Rocca - riccardo.rocca@hotmail.com - 2014
+#
+# The COLLADA model is streamed to its file portion by portion, and the image
+# slices (one per baseline segment) and the model are written to a unique
+# scratch directory that is removed at the end, so several sections can be
+# generated at the same time.
+#
+# Batch mode (up to 4 arguments): baselines, section table, output multipatch
+# feature class and optional number of processes, e.g. from the command line
+#   python "Generate Cross Section.py" D:/geo.gdb/baselines D:/sections.csv D:/geo.gdb/sections 4
+# The table (csv or any table) has one row per section with the fields of
+# BATCH_FIELDS; relative image paths are relative to the table folder.
+# Baselines are read with one cursor, sections are built in a worker pool and
+# all models are imported at once into one multipatch feature class.
 
-import arcpy, os, Image, sys
+import arcpy, os, Image, sys, math, shutil, tempfile, multiprocessing
+
+BATCH_FIELDS = ["BASELINE", "IMAGE", "ORIENTATION", "CROP",
+                "MARGIN_L", "MARGIN_R", "MARGIN_T", "MARGIN_B", "Z_TOP", "Z_BOTTOM"]
+
+class SectionError(Exception):
+  pass
 
 # Generates the "geometry" portion of the COLLADA model
 def geometry_model(I, X1, X2, Y1, Y2, Z_top, Z_bottom):
@@ -114,40 +133,82 @@ def instance_model(I):
           ) % (I, I, I)
   return model
 
-try:
-  # Get the input parameters
-  input_line = arcpy.GetParameterAsText(0)
-  line_ID = arcpy.GetParameterAsText(1)
-  image_file = arcpy.GetParameterAsText(2)
-  orientation = arcpy.GetParameterAsText(3)
-  crop = arcpy.GetParameterAsText(4)
-  margin_left = int(arcpy.GetParameterAsText(5))
-  margin_right = int(arcpy.GetParameterAsText(6))
-  margin_top = int(arcpy.GetParameterAsText(7))
-  margin_bottom = int(arcpy.GetParameterAsText(8))
-  Z_top = float(arcpy.GetParameterAsText(9))
-  Z_bottom = float(arcpy.GetParameterAsText(10))
-  output_section = arcpy.GetParameterAsText(11)
+# Streams the complete COLLADA model (one set of portions per baseline segment) to f
+def write_collada(f, X, Y, Z_top, Z_bottom, images):
+  n = len(X) - 1
+  f.write(
+          '<?xml version="1.0" encoding="UTF-8"?>\n'
+          '<COLLADA xmlns="http://www.collada.org/2005/11/COLLADASchema" version="1.4.1">\n'
+          '	<asset>\n'
+          '		<up_axis>Z_UP</up_axis>\n'
+          '	</asset>\n'
+          '\n'
+          '	<library_geometries>\n')
+  for i in xrange(n):
+    f.write(geometry_model(str(i), X[i], X[i+1], Y[i], Y[i+1], Z_top, Z_bottom))
+  f.write(
+          '	</library_geometries>\n'
+          '\n'
+          '	<library_images>\n')
+  for i in xrange(n):
+    f.write(image_model(str(i), images[i]))
+  f.write(
+          '	</library_images>\n'
+          '\n'
+          '	<library_effects>\n')
+  for i in xrange(n):
+    f.write(effect_model(str(i)))
+  f.write(
+          '	</library_effects>\n'
+          '\n'
+          '	<library_materials>\n')
+  for i in xrange(n):
+    f.write(material_model(str(i)))
+  f.write(
+          '	</library_materials>\n'
+          '\n'
+          '	<library_visual_scenes>\n'
+          '		<visual_scene id="Multipatch-Converted-Scene">\n'
+          '			<node id="ID_1.dae">\n'
+          '				<translate>0 0 0</translate>\n')
+  for i in xrange(n):
+    f.write(instance_model(str(i)))
+  f.write(
+          '			</node>\n'
+          '		</visual_scene>\n'
+          '	</library_visual_scenes>\n'
+          '\n'
+          '	<scene>\n'
+          '		<instance_visual_scene url="#Multipatch-Converted-Scene"/>\n'
+          '	</scene>\n'
+          '</COLLADA>\n')
+
+# Extracts the X,Y coordinates of the first part of a baseline geometry
+def baseline_vertices(shape):
+  X = []
+  Y = []
+  for part in shape:
+    for pnt in part:
+      if pnt:
+        X.append(pnt.X)
+        Y.append(pnt.Y)
+    break
+  return X, Y
+
+# Builds the COLLADA model of a section and its image slices in the scratch directory
+# Returns the path of the model (name.dae)
+def build_section(X, Y, image_file, orientation, crop, margins, Z_top, Z_bottom, scratch, name="section"):
+  margin_left, margin_right, margin_top, margin_bottom = margins
+  X = list(X)
+  Y = list(Y)
 
   if (Z_bottom - Z_top) == 0:
-    arcpy.AddError("Cannot proceed. Z range = 0")
-    exit()
+    raise SectionError("Cannot proceed. Z range = 0")
+  if len(X) < 2:
+    raise SectionError("Cannot proceed. Baseline not found or without segments")
 
   fileExtension = os.path.splitext(image_file)[1]
 
-  # Extracts the X,Y coordinates of the baseline with the selected FID
-  X = []
-  Y = [] 
-  for row in arcpy.da.SearchCursor(input_line, ["OID@", "SHAPE@"]):
-    if row[0] == int(line_ID):
-      for part in row[1]:
-        for pnt in part:
-          if pnt:
-            X.append(pnt.X)
-            Y.append(pnt.Y)
-        break
-      break
-
   # Calculates:
   # - the total length of the baseline
   # - the distance of the start and end of each baseline segment from the beginning of the baseline
@@ -160,24 +221,19 @@ try:
     baseline_length += segment_length
     segment_end.append(baseline_length)
   if baseline_length == 0:
-    arcpy.AddError("Cannot proceed. Baseline length = 0")
-    exit()
+    raise SectionError("Cannot proceed. Baseline length = 0")
   if (segment_end[0] - segment_start[0]) == 0:
-    arcpy.AddError("Cannot proceed. Baseline first segment = 0")
-    exit()
+    raise SectionError("Cannot proceed. Baseline first segment = 0")
   if (segment_end[-1] - segment_start[-1]) == 0:
-    arcpy.AddError("Cannot proceed. Baseline last segment = 0")
-    exit()
+    raise SectionError("Cannot proceed. Baseline last segment = 0")
 
   # Opens the image and calculates hight and width
   image = Image.open(image_file)
   image_w, image_h = image.size
   if (image_w - margin_left - margin_right) == 0:
-    arcpy.AddError("Cannot proceed. Image width within margins = 0")
-    exit()
+    raise SectionError("Cannot proceed. Image width within margins = 0")
   if (image_h - margin_top - margin_bottom) == 0:
-    arcpy.AddError("Cannot proceed. Image height within margins = 0")
-    exit()
+    raise SectionError("Cannot proceed. Image height within margins = 0")
   ratio_w = baseline_length / (image_w - margin_left - margin_right)
   ratio_h = (Z_bottom - Z_top) / (image_h - margin_top - margin_bottom)
 
@@ -190,7 +246,6 @@ try:
     margin_top = 0
     margin_bottom = 0
 
-
   # Flips the image depending on its orientation
   Xmid = (X[0] + X[-1]) / 2
   Ymid = (Y[0] + Y[-1]) / 2
@@ -220,6 +275,8 @@ try:
   elif orientation == "NE-SW":
     Xorientation = Xmid + RadiusProjected
     Yorientation = Ymid + RadiusProjected
+  else:
+    raise SectionError("Cannot proceed. Unknown orientation " + str(orientation))
   if (math.hypot((Xorientation - X[0]), (Yorientation - Y[0])) > math.hypot((Xorientation - X[-1]), (Yorientation - Y[-1]))):
     margin_left, margin_right = margin_right, margin_left
     image = image.transpose(Image.FLIP_LEFT_RIGHT)
@@ -234,7 +291,10 @@ try:
   Z_top = Z_top - margin_top * ratio_h
   Z_bottom = Z_bottom + margin_bottom * ratio_h
 
-  # Generates a series of temporary images corresponding to the series of segments in the baseline
+  # Saves the image slices corresponding to the series of segments in the baseline
+  # (crop is a view of the loaded image, only the slice is encoded)
+  image.load()
+  images = []
   for i in xrange(len(X)-1):
     if i == 0:
       image_start = 0
@@ -244,80 +304,173 @@ try:
       image_end = image_w
     else:
       image_end = margin_left + int(round(segment_end[i] / ratio_w))
-    image.crop((image_start, 0, image_end, image_h)).save("./tmp.dae"+str(i)+fileExtension)
-
-  # Generates the various portions of the COLLADA model, one for each baseline segment
-  geometry_library = ""
-  image_library = ""
-  effect_library = ""
-  material_library = ""
-  instance_library = ""
-  for i in xrange(len(X)-1):
-    geometry_library += geometry_model(str(i), X[i], X[i+1], Y[i], Y[i+1], Z_top, Z_bottom)
-    image_library += image_model(str(i), "./tmp.dae"+str(i)+fileExtension)
-    effect_library += effect_model(str(i))
-    material_library += material_model(str(i))
-    instance_library += instance_model(str(i))
+    slice_name = "slice" + str(i) + fileExtension
+    image.crop((image_start, 0, image_end, image_h)).save(os.path.join(scratch, slice_name))
+    images.append("./" + slice_name)
 
-  # Merges the various portions and generate the complete COLLADA model
-  model = (
-          '<?xml version="1.0" encoding="UTF-8"?>\n'
-          '<COLLADA xmlns="http://www.collada.org/2005/11/COLLADASchema" version="1.4.1">\n'
-          '	<asset>\n'
-          '		<up_axis>Z_UP</up_axis>\n'
-          '	</asset>\n'
-          '\n'
-          '	<library_geometries>\n'
-          '             %s\n'
-          '	</library_geometries>\n'
-          '\n'
-          '	<library_images>\n'
-          '             %s\n'
-          '	</library_images>\n'
-          '\n'
-          '	<library_effects>\n'
-          '             %s\n'
-          '	</library_effects>\n'
-          '\n'
-          '	<library_materials>\n'
-          '             %s\n'
-          '	</library_materials>\n'
-          '\n'
-          '	<library_visual_scenes>\n'
-          '		<visual_scene id="Multipatch-Converted-Scene">\n'
-          '			<node id="ID_1.dae">\n'
-          '				<translate>0 0 0</translate>\n'
-          '                             %s\n'
-          '			</node>\n'
-          '		</visual_scene>\n'
-          '	</library_visual_scenes>\n'
-          '\n'
-          '	<scene>\n'
-          '		<instance_visual_scene url="#Multipatch-Converted-Scene"/>\n'
-          '	</scene>\n'
-          '</COLLADA>\n'
-          ) % (geometry_library, image_library, effect_library, material_library, instance_library)
+  # Streams the COLLADA model next to the slices
+  model = os.path.join(scratch, name + ".dae")
+  f = open(model, "w")
+  try:
+    write_collada(f, X, Y, Z_top, Z_bottom, images)
+  finally:
+    f.close()
+  return model
 
-  # Saves the COLLADA model in a temporary file "tmp.dae"
-  f = open("./tmp.dae","w")
-  f.write(model)
-  f.close()
+# Unique scratch directory for the temporary files of one section
+def make_scratch():
+  base = arcpy.env.scratchFolder
+  if not base or not os.path.isdir(base):
+    base = None
+  return tempfile.mkdtemp(prefix="cross_section_", dir=base)
 
-  # Load the COLLADA model, including the coordinate system of the baseline 
-  spatial_ref = arcpy.Describe(input_line).spatialReference
-  arcpy.Import3DFiles_3d("./tmp.dae", output_section, "", spatial_ref)
+# Reads the vertices of the baselines with the given OIDs in one cursor pass
+# Returns a dict OID -> (X, Y)
+def read_baselines(input_line, ids):
+  baselines = {}
+  ids = sorted(set(int(i) for i in ids))
+  if not ids:
+    return baselines
+  desc = arcpy.Describe(input_line)
+  oid_field = arcpy.AddFieldDelimiters(input_line, desc.OIDFieldName)
+  where = "%s IN (%s)" % (oid_field, ",".join(str(i) for i in ids))
+  with arcpy.da.SearchCursor(input_line, ["OID@", "SHAPE@"], where) as rows:
+    for oid, shape in rows:
+      if shape is not None:
+        baselines[oid] = baseline_vertices(shape)
+  return baselines
 
-  # Deletes all the temporary files
-  os.remove("./tmp.dae")
-  for i in xrange(len(X)-1):
-    os.remove("./tmp.dae"+str(i)+fileExtension)
+# Worker: builds one section of the batch in its own directory
+# Returns (baseline ID, model path or None, error message)
+def build_task(args):
+  line_ID, X, Y, image_file, orientation, crop, margins, Z_top, Z_bottom, scratch = args
+  try:
+    os.mkdir(scratch)
+    model = build_section(X, Y, image_file, orientation, crop, margins, Z_top, Z_bottom,
+                          scratch, "section_" + str(line_ID))
+    return line_ID, model, None
+  except SectionError as e:
+    return line_ID, None, str(e)
+  except Exception as e:
+    return line_ID, None, "Could not build the section: " + repr(e)
+
+# Reads the section table: list of (baseline ID, image, orientation, crop, margins, Z top, Z bottom)
+def read_section_table(table):
+  folder = os.path.dirname(arcpy.Describe(table).catalogPath)
+  sections = []
+  with arcpy.da.SearchCursor(table, BATCH_FIELDS) as rows:
+    for row in rows:
+      image_file = row[1]
+      if not os.path.isabs(image_file):
+        image_file = os.path.join(folder, image_file)
+      sections.append((int(row[0]), image_file, row[2], row[3] or "",
+                       (int(row[4] or 0), int(row[5] or 0), int(row[6] or 0), int(row[7] or 0)),
+                       float(row[8]), float(row[9])))
+  return sections
+
+# Generates all the sections of the table into one multipatch feature class
+def generate_sections(input_line, table, output_section, processes=1):
+  sections = read_section_table(table)
+  baselines = read_baselines(input_line, [section[0] for section in sections])
+
+  scratch = make_scratch()
+  try:
+    tasks = []
+    for i, (line_ID, image_file, orientation, crop, margins, Z_top, Z_bottom) in enumerate(sections):
+      if line_ID not in baselines:
+        arcpy.AddWarning("Baseline " + str(line_ID) + ": not found")
+        continue
+      X, Y = baselines[line_ID]
+      tasks.append((line_ID, X, Y, image_file, orientation, crop, margins, Z_top, Z_bottom,
+                    os.path.join(scratch, str(i))))
+
+    if processes > 1 and len(tasks) > 1:
+      pool = multiprocessing.Pool(processes)
+      try:
+        results = pool.map(build_task, tasks)
+      finally:
+        pool.close()
+        pool.join()
+    else:
+      results = [build_task(task) for task in tasks]
+    models = []
+    for line_ID, model, error in results:
+      if model is None:
+        arcpy.AddWarning("Baseline " + str(line_ID) + ": " + error)
+      else:
+        models.append(model)
+
+    if not models:
+      raise SectionError("Cannot proceed. No section was built")
+    # Load all the COLLADA models at once, one feature per model
+    spatial_ref = arcpy.Describe(input_line).spatialReference
+    arcpy.Import3DFiles_3d(";".join(models), output_section, "ONE_FILE_ONE_FEATURE", spatial_ref)
+    arcpy.AddMessage(str(len(models)) + " of " + str(len(sections)) + " sections generated")
+  finally:
+    # Deletes all the temporary files
+    shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == "__main__" and arcpy.GetArgumentCount() <= 4:
+  try:
+    # Batch mode: baselines, section table, output, processes (optional)
+    input_line = arcpy.GetParameterAsText(0)
+    table = arcpy.GetParameterAsText(1)
+    output_section = arcpy.GetParameterAsText(2)
+    processes = arcpy.GetParameterAsText(3) if arcpy.GetArgumentCount() > 3 else ""
+    processes = int(processes) if processes else 1
+    # inside ArcMap sys.executable is ArcMap.exe: start workers with python
+    if processes > 1 and not os.path.basename(sys.executable).lower().startswith("python"):
+      multiprocessing.set_executable(os.path.join(sys.exec_prefix, "pythonw.exe"))
+
+    generate_sections(input_line, table, output_section, processes)
+
+    # Report a success message
+    arcpy.AddMessage("All done!")
+
+  except SectionError as e:
+    arcpy.AddError(str(e))
+  except:
+    # Report an error messages
+    arcpy.AddError("Could not complete the script")
+
+elif __name__ == "__main__":
+  try:
+    # Get the input parameters
+    input_line = arcpy.GetParameterAsText(0)
+    line_ID = arcpy.GetParameterAsText(1)
+    image_file = arcpy.GetParameterAsText(2)
+    orientation = arcpy.GetParameterAsText(3)
+    crop = arcpy.GetParameterAsText(4)
+    margin_left = int(arcpy.GetParameterAsText(5))
+    margin_right = int(arcpy.GetParameterAsText(6))
+    margin_top = int(arcpy.GetParameterAsText(7))
+    margin_bottom = int(arcpy.GetParameterAsText(8))
+    Z_top = float(arcpy.GetParameterAsText(9))
+    Z_bottom = float(arcpy.GetParameterAsText(10))
+    output_section = arcpy.GetParameterAsText(11)
+
+    # Extracts the X,Y coordinates of the baseline with the selected FID
+    X, Y = read_baselines(input_line, [line_ID]).get(int(line_ID), ([], []))
+
+    scratch = make_scratch()
+    try:
+      model = build_section(X, Y, image_file, orientation, crop,
+                            (margin_left, margin_right, margin_top, margin_bottom),
+                            Z_top, Z_bottom, scratch)
 
-  # Report a success message    
-  arcpy.AddMessage("All done!")
- 
-except:
-  # Report an error messages
-  arcpy.AddError("Could not complete the script")
-  #arcpy.AddMessage(arcpy.GetMessages())
+      # Load the COLLADA model, including the coordinate system of the baseline
+      spatial_ref = arcpy.Describe(input_line).spatialReference
+      arcpy.Import3DFiles_3d(model, output_section, "", spatial_ref)
+    finally:
+      # Deletes all the temporary files
+      shutil.rmtree(scratch, ignore_errors=True)
 
+    # Report a success message
+    arcpy.AddMessage("All done!")
 
+  except SectionError as e:
+    arcpy.AddError(str(e))
+  except:
+    # Report an error messages
+    arcpy.AddError("Could not complete the script")
+    #arcpy.AddMessage(arcpy.GetMessages())
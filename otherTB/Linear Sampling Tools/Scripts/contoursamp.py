@@ -8,12 +8,19 @@
               Total number of sample points
               Distribution of sample points across contour lines
               Interval of sample points
+ Optional Argument (command line only, not in the toolbox dialog):
+              Random seed (same seed, same sample points)
  Description: Generate sample points along contour lines.
+              Points are allocated to the contour lines with counting arrays,
+              the contours are streamed through a cursor and the points are
+              interpolated along the vertices (linesamp).
  Date:        January 2014
 ----------------------------------------------------------------------------------'''
 
 import arcpy
+import sys
 import random
+import linesamp
 
 # workspace for temporary fc
 from arcpy import env
@@ -42,88 +49,76 @@ alloc = arcpy.GetParameterAsText(3)
 # Random, Regular
 space = arcpy.GetParameterAsText(4)
 
+# Random seed, optional: a new seed is drawn (and reported) when empty
+seed = arcpy.GetParameterAsText(5) if arcpy.GetArgumentCount() > 5 else ""
+if seed == "":
+  seed = random.SystemRandom().randrange(2**31)
+  arcpy.AddMessage("Random seed: " + str(seed))
+try:
+  seed = int(seed)
+except ValueError:
+  arcpy.AddError("Random seed must be an integer: " + seed)
+  sys.exit()
+rng = random.Random(seed)
+
 #####################################################################################
 # Generate sample points
 #####################################################################################
 
-# Function to create sample points along a given contour line
-def CreatePts(space, ns, con):
-  pts = []
-  
+# Distances of ns sample points along a contour line of the given length
+def SampleDistances(space, ns, length):
   # Place sample points at random interval along a contour line
   if space == "Random":
-    for j in range(ns):
-      d = random.uniform(0, con.length)
-      pg = con.positionAlongLine(d)
-      pts.append(pg)
-      
-  if space == "Regular":
+    return sorted(rng.uniform(0, length) for j in range(ns))
+
   # Place sample points at regular interval along a contour line
-    if ns > 0:
-      sp = con.length / ns
-      d = sp/2
-    else:
-      sp = 0
-      
-    for j in range(ns):
-      pg = con.positionAlongLine(d)
-      pts.append(pg)
-      d += sp
-    
-  return pts
-
-# Calculate number of contour lines
-numcons = int(arcpy.GetCount_management(infc).getOutput(0))
-
-# Calculate total length of contour lines
-cur = arcpy.da.SearchCursor(infc, (["SHAPE@"]))
-totLength = 0
-contours = []
-for row in cur:
-  ft = row[0]
-  totLength += ft.length
-  contours.append(ft)
-del cur
-
-samp = []
-# (1) Random  
-if alloc == "Random":
-  # Assign sample points randomly to contour lines
-  asg = []
-  for i in range(numsamps):
-    asg.append(random.randrange(numcons))
-    
-  # Create sample points along each contour line  
-  for j in range(numcons):
-    ns = asg.count(j) # number of points at contour line
-    con = contours[j] # contour line geometry
-    samp.extend(CreatePts(space, ns, con))
-    
-# (2) Uniform
-elif alloc == "Uniform":
-  # Assign sample points to contour lines in an orderly manner
-  asg = []
-  for i in range(numsamps):
-    asg.append(i%numcons)
-    
-  # Create sample points along each contour line
-  for j in range(numcons):
-    ns = asg.count(j) # number of points at contour line
-    con = contours[j] # contour line geometry
-    samp.extend(CreatePts(space, ns, con))
-    
-# (3) Proportional
-else:
-  # Calculate point density (sample points per unit length)
-  ptDen = numsamps/totLength
-
-  # Create sample points along each contour line
-  for con in contours:
-    ns = int(round(ptDen * con.length)) # number of points at contour line
-    samp.extend(CreatePts(space, ns, con))
+  if ns > 0:
+    sp = length / ns
+    return [sp/2 + j*sp for j in range(ns)]
+  return []
+
+# Number of sample points for each contour line (counting arrays)
+def Allocate(alloc, numsamps, lengths):
+  numcons = len(lengths)
+  # (1) Random: each point goes to a random contour line
+  if alloc == "Random":
+    counts = [0] * numcons
+    for i in range(numsamps):
+      counts[rng.randrange(numcons)] += 1
+    return counts
+
+  # (2) Uniform: points are dealt to the contour lines in turn
+  if alloc == "Uniform":
+    q, r = divmod(numsamps, numcons)
+    return [q + (1 if j < r else 0) for j in range(numcons)]
+
+  # (3) Proportional: point density (sample points per unit length)
   # Some contour lines may not long enough to get any sample point
-    
-if any(samp):
-  arcpy.CopyFeatures_management(samp, sampfc)
-else:
+  totLength = sum(lengths)
+  ptDen = float(numsamps)/totLength if totLength > 0 else 0
+  return [int(round(ptDen * length)) for length in lengths]
+
+# Read contour lengths (no geometries) to allocate the points
+lengths = [row[0] for row in arcpy.da.SearchCursor(infc, ["SHAPE@LENGTH"])]
+counts = Allocate(alloc, numsamps, lengths) if lengths else []
+
+# Stream the contour lines and create sample points along each of them
+def SamplePoints():
+  with arcpy.da.SearchCursor(infc, ["OID@", "SHAPE@"]) as cur:
+    for j, (fid, con) in enumerate(cur):
+      if j >= len(counts) or counts[j] == 0 or con is None:
+        continue
+      path = linesamp.line_path(con)
+      if len(path[2]) < 2:
+        continue
+      for x, y, i in linesamp.interpolate(path, SampleDistances(space, counts[j], path[2][-1])):
+        yield fid, x, y
+
+sr = arcpy.Describe(infc).spatialReference
+numpts = 0
+if sum(counts):
+  numpts = linesamp.write_points(sampfc, sr, SamplePoints())
+if numpts == 0:
+  if arcpy.Exists(sampfc):
+    arcpy.Delete_management(sampfc)
   arcpy.AddError("No sample points created.")
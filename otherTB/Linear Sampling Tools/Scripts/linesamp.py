@@ -0,0 +1,177 @@
+'''----------------------------------------------------------------------------------
+ Source Name: linesamp.py
+ Description: Shared helpers of the Linear Sampling tools. A polyline is read
+              once into vertex lists with cumulative distances, and points at
+              given distances are interpolated in one sweep along the line
+              (no positionAlongLine per point); the segment of each point gives
+              the local direction of the line. Outputs are written with one
+              insert cursor.
+              densify is the fixed-spacing kernel (direction, offset and
+              remainder policy); with numpy the points of a line are computed
+              as arrays (densify_numpy), without it in the same single sweep.
+----------------------------------------------------------------------------------'''
+
+import math
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# what to do with the rest of a line shorter than the spacing:
+#   drop: nothing, the last point is before the end of the line
+#   end: one more point at the end of the line
+#   even: the spacing is adjusted so the points divide the line evenly
+REMAINDERS = ("drop", "end", "even")
+
+
+def line_path(polyline):
+    """Vertices of a polyline with cumulative distances: (xs, ys, cum).
+    Parts follow one another without a gap, so distances run along the whole
+    polyline as in positionAlongLine."""
+    xs, ys, cum = [], [], []
+    d = 0.0
+    for part in polyline:
+        first = True
+        for pnt in part:
+            if pnt is None:
+                continue
+            if xs and not first:
+                d += math.hypot(pnt.X - xs[-1], pnt.Y - ys[-1])
+            xs.append(pnt.X)
+            ys.append(pnt.Y)
+            cum.append(d)
+            first = False
+    return xs, ys, cum
+
+
+def interpolate(path, distances):
+    """Points at ascending distances along a path: yields (x, y, i), where i
+    is the index of the segment (from vertex i to i + 1) holding the point.
+    Distances are clamped to the line."""
+    xs, ys, cum = path
+    if len(cum) < 2:
+        return
+    last = len(cum) - 2
+    i = 0
+    for d in distances:
+        while i < last and cum[i + 1] <= d:
+            i += 1
+        seg = cum[i + 1] - cum[i]
+        t = min(max((d - cum[i]) / seg, 0.0), 1.0) if seg > 0 else 1.0
+        yield (xs[i] + (xs[i + 1] - xs[i]) * t,
+               ys[i] + (ys[i + 1] - ys[i]) * t, i)
+
+
+def sample_plan(length, spacing, offset=0.0, remainder="drop"):
+    """Points every spacing along a line, the first at offset from the start
+    of the walk: (first, step, count, add_end). Points run up to (excluding)
+    the end of the line."""
+    if remainder not in REMAINDERS:
+        raise ValueError("remainder must be one of " + ", ".join(REMAINDERS))
+    span = length - offset
+    if spacing <= 0 or span <= 0:
+        return offset, spacing, 0, False
+    if remainder == "even":
+        count = max(1, int(round(span / float(spacing))))
+        return offset, span / float(count), count, False
+    count = int(math.ceil(span / float(spacing)))
+    add_end = remainder == "end" and offset + (count - 1) * spacing < length
+    return offset, spacing, count, add_end
+
+
+def sample_distances(length, spacing, reverse=False, offset=0.0, remainder="drop"):
+    """Ascending distances (from the start of the line) of the sample points.
+    reverse walks from the end of the line (TF): offset and remainder apply
+    from that end."""
+    first, step, count, add_end = sample_plan(length, spacing, offset, remainder)
+    ds = [first + k * step for k in range(count)]
+    if add_end:
+        ds.append(length)
+    if reverse:
+        ds = [length - d for d in reversed(ds)]
+    return ds
+
+
+def densify(path, spacing, reverse=False, offset=0.0, remainder="drop"):
+    """Points every spacing along a path in walk order: list of (x, y)."""
+    if len(path[2]) < 2:
+        return []
+    ds = sample_distances(path[2][-1], spacing, reverse, offset, remainder)
+    pts = [(x, y) for x, y, i in interpolate(path, ds)]
+    if reverse:
+        pts.reverse()
+    return pts
+
+
+def densify_numpy(path, spacing, reverse=False, offset=0.0, remainder="drop"):
+    """densify with numpy arrays: returns (x, y) arrays in walk order."""
+    xs, ys, cum = [np.asarray(a, dtype=np.float64) for a in path]
+    if len(cum) < 2:
+        return np.empty(0), np.empty(0)
+    length = cum[-1]
+    first, step, count, add_end = sample_plan(length, spacing, offset, remainder)
+    ds = first + np.arange(count) * step
+    if add_end:
+        ds = np.append(ds, length)
+    if reverse:
+        ds = length - ds   # walk order, descending
+    i = np.clip(np.searchsorted(cum, ds, side="right") - 1, 0, len(cum) - 2)
+    seg = cum[i + 1] - cum[i]
+    t = np.where(seg > 0, (ds - cum[i]) / np.where(seg > 0, seg, 1.0), 1.0)
+    t = np.clip(t, 0.0, 1.0)
+    return xs[i] + (xs[i + 1] - xs[i]) * t, ys[i] + (ys[i + 1] - ys[i]) * t
+
+
+def densify_features(infc, spacing, reverse=False, offset=0.0, remainder="drop"):
+    """arcpy adapter: yields (fid, x, y) of the sample points of every line of
+    infc, read with one cursor."""
+    import arcpy
+    with arcpy.da.SearchCursor(infc, ["OID@", "SHAPE@"]) as cur:
+        for fid, line in cur:
+            if line is None:
+                continue
+            path = line_path(line)
+            if np is not None:
+                x, y = densify_numpy(path, spacing, reverse, offset, remainder)
+                for px, py in zip(x.tolist(), y.tolist()):
+                    yield fid, px, py
+            else:
+                for px, py in densify(path, spacing, reverse, offset, remainder):
+                    yield fid, px, py
+
+
+def segment_angle(path, i):
+    """Slope angle (radians, -pi/2 .. pi/2) of segment i of a path."""
+    xs, ys, cum = path
+    run = xs[i + 1] - xs[i]
+    if run == 0: # handle zero division
+        return math.radians(90)
+    return math.atan((ys[i + 1] - ys[i]) / float(run))
+
+
+def create_fc(fc, sr, shape_type="POINT"):
+    """Create an empty feature class with a LINE_FID field (FID of the input
+    line) for the output of a tool."""
+    import arcpy
+    if arcpy.Exists(fc):
+        arcpy.Delete_management(fc)
+    fc = arcpy.CreateFeatureclass_management(
+        os.path.dirname(fc) or arcpy.env.workspace, os.path.basename(fc),
+        shape_type, spatial_reference=sr).getOutput(0)
+    arcpy.AddField_management(fc, "LINE_FID", "LONG")
+    return fc
+
+
+def write_points(fc, sr, rows):
+    """Write (line_fid, x, y) rows to a new point feature class with one
+    insert cursor. Returns the number of points."""
+    import arcpy
+    fc = create_fc(fc, sr)
+    n = 0
+    with arcpy.da.InsertCursor(fc, ["LINE_FID", "SHAPE@XY"]) as icur:
+        for fid, x, y in rows:
+            icur.insertRow((fid, (x, y)))
+            n += 1
+    return n
@@ -7,11 +7,19 @@
               Output sample points feature class
               Spacing between sample points
               Direction to generate sample points
+ Optional Arguments (command line only, not in the toolbox dialog):
+              Offset of the first sample point (default 0)
+              Remainder at the end of a line: drop, end, even (default drop)
  Description: Generate sample points along the lines on a network.
+              Each line is densified in one sweep along its vertices
+              (linesamp.densify) and the points are written with one
+              insert cursor.
  Date:        January 2014
 ----------------------------------------------------------------------------------'''
 
 import arcpy
+import sys
+import linesamp
 
 # workspace for temporary fc
 from arcpy import env
@@ -37,47 +45,31 @@ flow = arcpy.GetParameterAsText(3)
 # FT (From-To): in digitized direction of the line
 # TF (To-From): against digitized direction of the line
 
+# Offset of the first sample point from the start (FT) or end (TF) of the line
+argc = arcpy.GetArgumentCount()
+offset = arcpy.GetParameterAsText(4) if argc > 4 else ""
+try:
+  offset = float(offset) if offset else 0.0
+except ValueError:
+  offset = -1.0
+if offset < 0:
+  arcpy.AddError("Offset must be a number >= 0.")
+  sys.exit()
+
+# Remainder at the end of the line: drop (as before), end, even
+remainder = arcpy.GetParameterAsText(5) if argc > 5 else ""
+remainder = remainder.lower() if remainder else "drop"
+# checked here: the output is created before the lines are sampled
+if remainder not in linesamp.REMAINDERS:
+  arcpy.AddError("Remainder must be one of: " + ", ".join(linesamp.REMAINDERS) + ".")
+  sys.exit()
+
 #####################################################################################
 # Generate sample points
 #####################################################################################
 
-samp = []
-
-# Create cursor to search stream features
-cur = arcpy.da.SearchCursor(infc, (["SHAPE@"]))
-
-for row in cur:
-  # Get stream geometry from cursor
-  stream = row[0] # Polyline
-  
-  if flow.upper() == "FT":
-    # Define a position on the stream where to stop generating cross points
-    dmax = stream.length
-    d = 0 # distance d starts from the start point of the line
-      
-    # Create cross points along the stream at regular interval
-    while d < dmax:
-      # Get position of a point at distance d
-      cross = stream.positionAlongLine(d) # PointGeometry
-      samp.append(cross) # add cross point into the list
-      d += sp # increase the distance by spacing
-      
-  else: # flow = TF
-    # Define a position on the stream where to stop generating cross points
-    dmin = 0
-    d = stream.length # distance d starts from the end point of the line
-      
-    # Create cross points along the stream at regular interval
-    while d > dmin:
-      # Get position of a point at distance d
-      cross = stream.positionAlongLine(d) # PointGeometry
-      samp.append(cross) # add cross point into the list
-      d -= sp # decrease the distance by spacing
-      
-del cur # delete cursor
-
-if any(samp):
-  arcpy.CopyFeatures_management(samp, sampfc)
-else:
+sr = arcpy.Describe(infc).spatialReference
+samp = linesamp.densify_features(infc, sp, flow.upper() != "FT", offset, remainder)
+if linesamp.write_points(sampfc, sr, samp) == 0:
+  arcpy.Delete_management(sampfc)
   arcpy.AddError("No sample points created.")
-  
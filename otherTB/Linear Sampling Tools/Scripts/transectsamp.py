@@ -15,11 +15,16 @@
               points along each transect line.
  Date:        January 2014
  Updated:     January 2018 (fixing zero dividion in calculating slope of line segment
+              Cross points and the local direction come from the vertices of
+              each line as it is walked (linesamp): no SplitLine and no
+              contains/touches tests. Transects and sample points are written
+              with one insert cursor each.
 ----------------------------------------------------------------------------------'''
 
 import arcpy
 import os
 import math
+import linesamp
 
 # workspace for temporary fc
 from arcpy import env
@@ -60,134 +65,76 @@ numTranPts = arcpy.GetParameter(6)
 # Generate transect lines
 #####################################################################################
 
-################################ Create cross points ################################
-# Create cursor to search stream features
-cur = arcpy.da.SearchCursor(infc, (["SHAPE@"]))
-
-crPts = [] # list of cross points along the stream
-for row in cur:
-  # Get stream geometry from cursor
-  stream = row[0] # Polyline
-  
-  if flow.upper() == "FT":
-    # Define a position on the stream where to stop generating cross points
-    dmax = stream.length
-    d = 0 # distance d starts from the start point of the line
-      
-    # Create cross points along the stream at regular interval
-    while d < dmax:
-      # Get position of a point at distance d
-      cross = stream.positionAlongLine(d) # PointGeometry
-      crPts.append(cross) # add cross point into the list
-      d += sp # increase the distance by spacing
-      
-  else: # flow = TF
-    # Define a position on the stream where to stop generating cross points
-    dmin = 0
-    d = stream.length # distance d starts from the end point of the line
-      
-    # Create cross points along the stream at regular interval
-    while d > dmin:
-      # Get position of a point at distance d
-      cross = stream.positionAlongLine(d) # PointGeometry
-      crPts.append(cross) # add cross point into the list
-      d -= sp # decrease the distance by spacing
-      
-del cur # delete cursor
+# Transect lines of a stream: list of (xOri, yOri, xDes, yDes) in flow order
+def Transects(stream):
+  path = linesamp.line_path(stream)
+  if len(path[2]) < 2 or sp <= 0:
+    return []
+  lines = []
+  wi = fwi/2 # half width of cross line
+  ds = linesamp.sample_distances(path[2][-1], sp, flow.upper() != "FT")
+  for xC, yC, i in linesamp.interpolate(path, ds):
+    # slope angle of the line segment holding the cross point
+    a = linesamp.segment_angle(path, i)
+
+    # Find dx and dy to get vector wi at angle a
+    dx = wi * math.cos(a)
+    dy = wi * math.sin(a)
+
+    # Rotate vector wi +90 deg (origin) and -90 deg (destination) around cross point
+    lines.append((xC + dy, yC - dx, xC - dy, yC + dx))
+  if flow.upper() != "FT":
+    lines.reverse()
+  return lines
 
 # Get spatial reference of input feature class
-desc = arcpy.Describe(infc) 
+desc = arcpy.Describe(infc)
 sr = desc.spatialReference
-  
-############################### Create transect lines ###############################
-crLines = [] # list of cross lines along the stream
-# Split stream at vertices to get individual line segments
-segments = arcpy.SplitLine_management(infc, arcpy.Geometry())
-
-# Loop through cross points
-for cross in crPts:
-  # Get Point class of cross point
-  pt = cross.firstPoint # Point
-  
-  # Get X,Y coord of cross point
-  xC = pt.X
-  yC = pt.Y
-  
-  # Find line segment overlapping with cross point
-  for seg in segments:
-    if seg.contains(pt) or seg.touches(pt):
-      # Get the start and end points of line segment
-      fr = seg.firstPoint
-      to = seg.lastPoint
-      
-      # Calculate the slope of line segment
-      rise = to.Y - fr.Y
-      run = to.X - fr.X
-      if run == 0: # handle zero division
-          a = math.radians(90)
-      else:  
-          # Calculate the slope angle
-          slope = rise/run
-          a = math.atan(slope) # in radian
-      
-      # Find dx and dy to get vector wi at angle a
-      wi = fwi/2 # half width of cross line
-      dx = wi * math.cos(a)
-      dy = wi * math.sin(a)
-      
-      # Rotate vector wi +90 deg around cross point
-      xOri = xC + dy
-      yOri = yC - dx
-      
-      # Rotate vector wi -90 deg around cross point
-      xDes = xC - dy
-      yDes = yC + dx
-      
-      # Determine origin and destination points of cross line
-      ori = arcpy.Point(xOri,yOri)
-      des = arcpy.Point(xDes,yDes)
-      
-      # Add origin and destination points into an array object
-      arr = arcpy.Array()
-      arr.add(ori)
-      arr.add(des)
-      
-      # Contruct a cross line from the array object
-      line = arcpy.Polyline(arr, sr)
-      
-      # Add the cross line into the list
-      crLines.append(line)
-      
-      break # no need to check the remaining line segments
 
 # Create transect lines fc
-if any(crLines) and (tranopt):
+tranfc = None
+if tranopt:
   f = os.path.splitext(filefc) # split into file and extension
   trannm = f[0] + "_transects" + f[1] # transect basename
-  tranfc = os.path.join(dirfc, trannm)
-  arcpy.CopyFeatures_management(crLines, tranfc)
-  arcpy.SetParameterAsText(7, tranfc)
+  tranfc = linesamp.create_fc(os.path.join(dirfc, trannm), sr, "POLYLINE")
 
 #####################################################################################
 # Generate sample points
 #####################################################################################
-if any(crLines):
-  # Calculate spacing between sample points along transect line
-  ds = fwi / numTranPts
-  
-  # Create sample points along each transect line
-  samp = []
-  for line in crLines:
-    d = ds/2 # starting point
-    for i in range(numTranPts):
-      pg = line.positionAlongLine(d)
-      samp.append(pg)
-      d += ds
-      
-  if any(samp):
-    arcpy.CopyFeatures_management(samp, sampfc)
-  else:
-    arcpy.AddError("No sample points created.")
-else:
+# Spacing between sample points along transect line, as fraction of the width
+ds = 1.0 / numTranPts if numTranPts > 0 else 0
+steps = [ds/2 + k*ds for k in range(numTranPts)]
+
+numLines = 0
+numPts = 0
+sampfc = linesamp.create_fc(sampfc, sr)
+tcur = arcpy.da.InsertCursor(tranfc, ["LINE_FID", "SHAPE@"]) if tranfc else None
+try:
+  with arcpy.da.InsertCursor(sampfc, ["LINE_FID", "SHAPE@XY"]) as scur:
+    with arcpy.da.SearchCursor(infc, ["OID@", "SHAPE@"]) as cur:
+      for fid, stream in cur:
+        if stream is None:
+          continue
+        for xOri, yOri, xDes, yDes in Transects(stream):
+          numLines += 1
+          if tcur is not None:
+            arr = arcpy.Array([arcpy.Point(xOri, yOri), arcpy.Point(xDes, yDes)])
+            tcur.insertRow((fid, arcpy.Polyline(arr, sr)))
+          # Create sample points along the transect line
+          for t in steps:
+            scur.insertRow((fid, (xOri + (xDes - xOri) * t, yOri + (yDes - yOri) * t)))
+            numPts += 1
+finally:
+  del tcur
+
+if tranfc and numLines:
+  arcpy.SetParameterAsText(7, tranfc)
+elif tranfc:
+  arcpy.Delete_management(tranfc)
+
+if numLines == 0:
+  arcpy.Delete_management(sampfc)
   arcpy.AddError("No transect lines created.")
-  
+elif numPts == 0:
+  arcpy.Delete_management(sampfc)
+  arcpy.AddError("No sample points created.")
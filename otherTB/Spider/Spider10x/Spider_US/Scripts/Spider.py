@@ -19,90 +19,6 @@ import os
 import sys
 import arcpy
 
-def CreateLine(firstPoint, endPoint):
-    """Create line object using first point and end point
-
-    INPUTS:
-    first point, end point
-
-    OUTPUT:
-    line object
-    """
-
-    #Create line
-    line = arcpy.Array()
-    line.add(firstPoint)
-    line.add(endPoint)
-    
-    return line
-
-def CreateLineUsingPoint(firstPoint, arcTan, lineLength):
-    import math
-    """ Return line from start point, angle and length
-
-    INPUTS:
-    first point, end point, length
-
-    OUTPUT:
-    line object
-    """
-
-    #Create line
-    ligne = arcpy.Array()
-    ligne.add(firstPoint)
-    
-    #Calculate end point
-    endPoint = arcpy.Point()
-    endPoint.X = firstPoint.X - math.sin(arcTan)* lineLength
-    endPoint.Y = firstPoint.Y - math.cos(arcTan)* lineLength
-
-    ligne.add(endPoint)
-    
-    return ligne
-
-def DistanceBetween2Points(firstPoint, endPoint):
-    import math
-    """Calculate arc tan between two points.
-
-    INPUTS:
-    first point, end point
-
-    OUTPUT:
-    arcTan
-    """
-    
-    distance = math.sqrt((firstPoint.X - endPoint.X)**2 + (firstPoint.Y - endPoint.Y)**2)
-
-    return distance
-
-def ArcTanBetween2points(firstPoint, endPoint):
-    import math
-    """Calculate arc tan between two points.
-
-    INPUTS:
-    first point, end point
-
-    OUTPUT:
-    arcTan
-    """
-    
-    arcTan = math.atan2((firstPoint.X - endPoint.X),(firstPoint.Y - endPoint.Y))
-    
-    return arcTan
-
-def RelativeDistance(Distance, Percent):
-    """Calculate relative distance using percent.
-
-    INPUTS:
-    distance
-
-    OUTPUT:
-    50 percent of the distance
-    """
-    RelativeDistance = (float((Distance)) * float(Percent))/100
-    
-    return RelativeDistance
-
 def GetFieldType(inFeatureClass, inFieldName):
     """Return field type: text or numeric
 
@@ -128,24 +44,59 @@ def GetFieldType(inFeatureClass, inFieldName):
     return FieldType
 
 
+def BuildCenterIndex(centers):
+    """Hash center points on their ID value.
+
+    INPUTS:
+    iterable of (OID, (x, y), ID value)
+
+    OUTPUT:
+    dict: ID value -> list of (OID, x, y, ID value)
+    """
+    index = {}
+    for oid, xy, key in centers:
+        if xy is None or xy[0] is None:
+            continue
+        index.setdefault(key, []).append((oid, xy[0], xy[1], key))
+    return index
+
+def SpiderLines(centerIndex, borders, percent=100):
+    """Join border points to center points on the ID value (hash join) and
+    return the spider lines. Centers are kept in memory, borders are streamed.
+
+    The relative line keeps the direction of the full line, so its end point is
+    center + (border - center) * percent / 100 (no trigonometry needed).
+
+    INPUTS:
+    center index (see BuildCenterIndex), iterable of (OID, (x, y), ID value),
+    percent of the line length
+
+    OUTPUT:
+    generator of (center OID, center ID value, border OID, (x1, y1), (x2, y2))
+    """
+    ratio = float(percent) / 100
+    for borderOID, xy, key in borders:
+        matches = centerIndex.get(key)
+        if not matches or xy is None or xy[0] is None:
+            continue
+        bx, by = xy
+        for centerOID, cx, cy, centerKey in matches:
+            if ratio != 1:
+                ex, ey = cx + (bx - cx) * ratio, cy + (by - cy) * ratio
+            else:
+                ex, ey = bx, by
+            yield centerOID, centerKey, borderOID, (cx, cy), (ex, ey)
+
 def do_analysis(inCenter,inFieldCenter,inBorder,inFieldBorder,inDimension,outFile):
-    """TODO: Add documentation about this function here"""
+    """Create spider lines: read both layers once, join them on the ID fields
+    in memory and write all lines with one insert cursor."""
     try:
-        #TODO: Add analysis here
         arcpy.AddMessage("*"*10)
         arcpy.AddMessage("Process: Spider ...")
         
         # Process: Get input spatial reference
         sr = arcpy.Describe(inCenter).spatialreference
         
-        # Process: Get field OBJECTID of 2 input layer
-        OIDCenter = arcpy.Describe(inCenter).OIDFieldName
-        OIDBorder = arcpy.Describe(inBorder).OIDFieldName
-        
-        # Process: Get field SHAPE
-        SHPCenter = arcpy.Describe(inCenter).shapeFieldName
-        SHPBorder = arcpy.Describe(inBorder).shapeFieldName
-        
         # Process: Create output feature class...
         arcpy.CreateFeatureclass_management(os.path.dirname(outFile), os.path.basename(outFile), "POLYLINE", "", "DISABLED", "DISABLED", sr, "", "0", "0", "0")
         
@@ -155,57 +106,20 @@ def do_analysis(inCenter,inFieldCenter,inBorder,inFieldBorder,inDimension,outFil
         arcpy.AddField_management(outFile, "ID_LINK", inFieldType)
         arcpy.AddField_management(outFile, "ID_BORDER", "LONG")
         
-        # Process: Insert geometry in line layer
-        iCursors = arcpy.InsertCursor(outFile, sr)
-        
-        # Process: Search center points
-        sCursorsCen = arcpy.SearchCursor(inCenter)
-        for sCursorCen in sCursorsCen:
-            
-            # Process: Get first point
-            featCenter = sCursorCen.getValue(SHPCenter)
-            pntCenter = featCenter.getPart()
-            #gp.AddMessage("Xd %s - Yd %s" % (str(pntCenter.x), str(pntCenter.y)))
-                    
-            # Process: Prepare sql query
-            delimitedfield = arcpy.AddFieldDelimiters(inBorder, inFieldBorder)
-            sCursorsSel = arcpy.SearchCursor(inBorder, delimitedfield + " = " + str(sCursorCen.getValue(inFieldCenter)))
-    
-            for sCursorSel in sCursorsSel:
-                # Process: Get end point
-                featBorder = sCursorSel.getValue(SHPBorder)
-                pntBorder = featBorder.getPart()
-                #gp.AddMessage("Xf %s - Yf %s" % (str(pntBorder.x), str(pntBorder.y)))
-                    
-                # Process: Create line
-                iCursor = iCursors.newRow()
-                
-                if int(inDimension) != 100:
-                    # Process: Get line length
-                    dist = DistanceBetween2Points(pntCenter, pntBorder)
-                    
-                    # Process: Get x percent of length
-                    distBranche = RelativeDistance(dist, int(inDimension))
-                    
-                    # Process: get arc tan of the line
-                    valeurArcTan = ArcTanBetween2points(pntCenter, pntBorder)
-                    
-                    # Process: Create relative line
-                    iLine = CreateLineUsingPoint(pntCenter, valeurArcTan, distBranche)
-                else:
-                    # Process: Create line
-                    iLine = CreateLine(pntCenter, pntBorder)
-                
-                # Process: store line
-                iCursor.setValue("Shape",iLine)
-                iCursor.setValue("ID_CENTER",sCursorCen.getValue(OIDCenter))
-                iCursor.setValue("ID_LINK",sCursorCen.getValue(inFieldCenter))
-                iCursor.setValue("ID_BORDER",sCursorSel.getValue(OIDBorder))
-                iCursors.insertRow(iCursor)
-                iLine.removeAll()
+        # Process: Read center points once and hash them on the ID field
+        with arcpy.da.SearchCursor(inCenter, ["OID@", "SHAPE@XY", inFieldCenter]) as sCursorsCen:
+            centerIndex = BuildCenterIndex(sCursorsCen)
         
-        # Clear variable
-        del iCursors, sCursorsCen, sCursorCen, sCursorsSel, sCursorSel
+        # Process: Stream border points (in the center spatial reference) and write lines
+        count = 0
+        fields = ["SHAPE@WKT", "ID_CENTER", "ID_LINK", "ID_BORDER"]
+        with arcpy.da.SearchCursor(inBorder, ["OID@", "SHAPE@XY", inFieldBorder], spatial_reference=sr) as sCursorsSel:
+            with arcpy.da.InsertCursor(outFile, fields) as iCursors:
+                for centerOID, key, borderOID, start, end in SpiderLines(centerIndex, sCursorsSel, int(inDimension)):
+                    iLine = "LINESTRING (%r %r, %r %r)" % (start[0], start[1], end[0], end[1])
+                    iCursors.insertRow((iLine, centerOID, key, borderOID))
+                    count += 1
+        arcpy.AddMessage("%d lines created" % count)
     
     except arcpy.ExecuteError:
         print arcpy.GetMessages(2)
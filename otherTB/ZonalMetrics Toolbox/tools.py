@@ -2,15 +2,18 @@
 __author__ = 'Adamczyk_Tiede_2020'
 __version__ = '2020324_11'
 import json
-from string import ascii_lowercase
 import tempfile
 import traceback
 import sys
-import random
 import re
-from itertools import islice
+from itertools import islice, count
+from collections import OrderedDict
 import os
 import datetime
+import atexit
+import threading
+import uuid
+import io
 
 import arcpy
 
@@ -19,16 +22,19 @@ import arcpy
 default_config = {
     'debug': False,
     'debugDir': 'c:/tmp/zonal_metrics_debug',
-    'scratchworkspace': "in_memory"
+    'scratchworkspace': "in_memory",
+    'debugEvery': 1,  # copy every Nth temporary layer in debug mode
+    'debugMinRows': 0,  # copy only layers with at least so many rows
+    'logBufferSize': 100,  # log records kept in memory before they are written
+    'logFile': None  # log file (JSON lines); in debug mode defaults to zonal_metrics.log in debug dir
 }
 
 cfg = None
 
 
 def _load_config():
-    c = default_config
+    c = dict(default_config)
     config_file_path = os.path.join(os.path.dirname(__file__), 'ZonalMetrics_config.json')
-    print(config_file_path)
     if os.path.exists(config_file_path):
         try:
             with open(config_file_path) as f:
@@ -130,9 +136,10 @@ def is_debug():
 
 
 def setup_debug_mode():
-    log('ZonalMetricsTool version: %s' % __version__)
+    finish_debug_mode()  # of the previous run
+    config = get_config()
+    log_file = config['logFile']
     if is_debug():
-        log_debug('Running in debug mode')
         tmp_dir = '/tmp'
         if not os.path.exists(tmp_dir):
             tmp_dir = tempfile.gettempdir()
@@ -140,49 +147,179 @@ def setup_debug_mode():
         debug_dir = debug_dir.replace('/', os.sep)
         try:
             os.makedirs(debug_dir)
-        except IOError:
+        except (IOError, OSError):
             pass
-        log_debug('Debug dir: %s' % debug_dir)
-        get_config()['debugDir'] = debug_dir
+        config['debugDir'] = debug_dir
+        log_file = log_file or os.path.join(debug_dir, 'zonal_metrics.log')
+    _set_log_writer(LogWriter(log_file, config['logBufferSize']))
+    log('ZonalMetricsTool version: %s' % __version__)
+    if is_debug():
+        log_debug('Running in debug mode')
+        log_debug('Debug dir: %s' % config['debugDir'])
     else:
         log('Debug mode disabled')
 
 
+def finish_debug_mode():
+    """
+    Makes the deferred debug copies and writes the buffered log. Called at the end of every tool run.
+    """
+    if _deferred_debug_copies is not None:
+        _deferred_debug_copies.process()
+    if _log_writer is not None:
+        _log_writer.flush()
+
+
 def log_debug(message):
     if is_debug():
-        log('[DEBUG] %s' % message)
+        log('[DEBUG] %s' % message, 'DEBUG')
 
 
-def log(message):
+def log(message, level='INFO'):
     arcpy.AddMessage(message)
-    # see http://support.esri.com/en/knowledgebase/techarticles/detail/35380
-    try:
-        print(message)
-    except IOError:
-        pass
-    if not is_debug():
-        return
+    _get_log_writer().write(level, message)
+
 
+class LogWriter(object):
+    """
+    Buffered structured log. Records (time, level, message) are kept in memory and written every
+    buffer_size records and on flush(): as JSON lines to the log file, or printed without a file.
+    """
+
+    def __init__(self, path=None, buffer_size=100):
+        self.path = path
+        self.buffer_size = max(1, int(buffer_size))
+        self._records = []
+        self._lock = threading.Lock()
+
+    def write(self, level, message):
+        record = {'time': datetime.datetime.now().isoformat(), 'level': level, 'message': message}
+        with self._lock:
+            self._records.append(record)
+            full = len(self._records) >= self.buffer_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            records, self._records = self._records, []
+            if not records:
+                return
+            if self.path:
+                try:
+                    with io.open(self.path, 'a', encoding='utf-8') as f:
+                        for record in records:
+                            f.write(u'%s\n' % json.dumps(record, ensure_ascii=False))
+                    return
+                except (IOError, OSError):
+                    traceback.print_exc()
+            # see http://support.esri.com/en/knowledgebase/techarticles/detail/35380
+            try:
+                print('\n'.join('%s' % record['message'] for record in records))
+            except IOError:
+                pass
+
+
+_log_writer = None
+
+
+def _get_log_writer():
+    if _log_writer is None:
+        _set_log_writer(LogWriter(get_config()['logFile'], get_config()['logBufferSize']))
+    return _log_writer
+
+
+def _set_log_writer(writer):
+    global _log_writer
+    if _log_writer is not None:
+        _log_writer.flush()
+    _log_writer = writer
+
+
+class TempWorkspace(object):
+    """
+    Issues names for temporary layers in a workspace without probing it with arcpy.Exists.
+    Names are made of a namespace unique to this process (pid and a random token) and a counter,
+    so they never repeat, also between parallel processes using the same workspace.
+    Every issued name is tracked and deleted (in bulk) by cleanup(), at the latest on exit.
+    It can be used in 'with' statement:
+
+    with TempWorkspace() as temp:
+        tmpLayer = temp.name('selection')
+        #do something with tmpLayer
+    #here tmpLayer will not exists anymore
+    """
+
+    def __init__(self, workspace='in_memory'):
+        self.workspace = workspace
+        self.namespace = 't%x%s' % (os.getpid(), uuid.uuid4().hex[:4])
+        self._counter = count(1)
+        self._issued = OrderedDict()
+        self._lock = threading.Lock()
+
+    def name(self, prefix='tempLayer'):
+        with self._lock:
+            name = "%(workspace)s\\%(namespace)s_%(nb)d_%(prefix)s" % {'workspace': self.workspace,
+                                                                      'namespace': self.namespace,
+                                                                      'nb': next(self._counter),
+                                                                      'prefix': prefix}
+            self._issued[name] = True
+        return name
+
+    def owns(self, name):
+        return name in self._issued
+
+    def delete(self, *names):
+        """
+        Deletes issued names with one Delete call; names which were never created are skipped.
+        """
+        with self._lock:
+            names = [n for n in names if self._issued.pop(n, None)]
+        if not names:
+            return
+        try:
+            arcpy.Delete_management(';'.join(names))
+        except Exception:
+            # some of the names were not created (or are already deleted)
+            for name in names:
+                try:
+                    arcpy.Delete_management(name)
+                except Exception:
+                    pass
+
+    def cleanup(self):
+        self.delete(*list(self._issued))
 
-_temp_layer_nb = 0
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):  # @ReservedAssignment
+        self.cleanup()
+
+
+_temp_workspaces = {}
+
+
+def get_temp_workspace(workspace='in_memory'):
+    temp_workspace = _temp_workspaces.get(workspace)
+    if temp_workspace is None:
+        temp_workspace = _temp_workspaces[workspace] = TempWorkspace(workspace)
+    return temp_workspace
+
+
+def cleanup_temp_workspaces():
+    for temp_workspace in list(_temp_workspaces.values()):
+        temp_workspace.cleanup()
+
+
+@atexit.register
+def _on_exit():
+    finish_debug_mode()
+    cleanup_temp_workspaces()
 
 
 def create_temp_layer_name(prefix='tempLayer', workspace='in_memory'):
-    global _temp_layer_nb
-    step_higher = int(_temp_layer_nb // 26)
-    step_lower = int(_temp_layer_nb - step_higher * 26)
-    step = ascii_lowercase[step_higher] + ascii_lowercase[step_lower]
-
-    for i in range(0, 100):  # @UnusedVariable
-        name = "%(workspace)s\\%(step)s_%(prefix)s_%(rnd)d" % {'workspace': workspace,
-                                                               'step': step,
-                                                               'prefix': prefix,
-                                                               'rnd': random.randint(0, 1000000)}
-        if not arcpy.Exists(name):
-            _temp_layer_nb += 1
-            _temp_layer_nb %= 676
-            return name
-    raise Exception('Could not reserve name in 100 tries')
+    return get_temp_workspace(workspace).name(prefix)
 
 
 class createTempLayer(object):
@@ -209,26 +346,93 @@ class createTempLayer(object):
         delete_if_exists(self.name)
 
 
+class DeferredDebugCopies(object):
+    """
+    Debug copies of temporary layers, deferred to the end of the tool run: process() (called by
+    finish_debug_mode) copies the collected layers to the debug dir one after another. The copies
+    cost the same as before, they are only made later; to make a debug run cheaper copy only every
+    Nth submitted layer (every) and only layers with at least min_rows rows.
+    A collected layer is not deleted before its copy (see take_over), so it stays in the scratch
+    workspace until process() runs.
+    """
+
+    def __init__(self, debug_dir, every=1, min_rows=0):
+        self.debug_dir = debug_dir
+        self.every = max(1, int(every))
+        self.min_rows = int(min_rows)
+        self._submitted = 0
+        self._pending = OrderedDict()  # layer -> delete after copy
+
+    def submit(self, fc):
+        self._submitted += 1
+        if (self._submitted - 1) % self.every or fc in self._pending:
+            return False
+        self._pending[fc] = False
+        return True
+
+    def take_over(self, fc):
+        """
+        Returns True if fc waits for its copy; process() deletes it afterwards.
+        """
+        if fc in self._pending:
+            self._pending[fc] = True
+            return True
+        return False
+
+    def process(self):
+        """
+        Copies the pending layers and deletes the ones taken over.
+        """
+        while self._pending:
+            fc, delete = self._pending.popitem(last=False)
+            try:
+                self._copy(fc)
+            except Exception as e:
+                _get_log_writer().write('ERROR', 'on_debug - Could not copy %s: %s' % (fc, e))
+            if delete:
+                try:
+                    delete_if_exists(fc)
+                except Exception as e:
+                    _get_log_writer().write('ERROR', 'on_debug - Could not delete %s: %s' % (fc, e))
+
+    def _copy(self, fc):
+        if not arcpy.Exists(fc):
+            return
+        if self.min_rows > 0 and int(arcpy.GetCount_management(fc).getOutput(0)) < self.min_rows:
+            return
+        fc_name = fc.partition(os.sep)[2]
+        description = arcpy.Describe(fc)
+        data_type = getattr(description, 'dataType', False)
+        output_name = self.debug_dir + os.sep + fc_name
+        _get_log_writer().write('DEBUG', 'Copying {} to {}'.format(fc, output_name))
+        if data_type in ['FeatureClass', 'FeatureLayer']:
+            arcpy.CopyFeatures_management(fc, output_name)
+        elif data_type == 'Table':
+            suffix = '' if '.dbf' in output_name else '.dbf'
+            arcpy.CopyRows_management(fc, output_name + suffix)
+        else:
+            _get_log_writer().write('DEBUG', 'on_debug - Unhandled dataType %s' % data_type)
+
+
+_deferred_debug_copies = None
+
+
 def on_debug(*feature_classes):
     """
+    Records temporary layers to be copied to the debug dir at the end of the run (see DeferredDebugCopies).
 
     :type feature_classes: string
     """
+    global _deferred_debug_copies
+    if not is_debug():
+        return
+    config = get_config()
+    if _deferred_debug_copies is None or _deferred_debug_copies.debug_dir != config['debugDir']:
+        if _deferred_debug_copies is not None:
+            _deferred_debug_copies.process()
+        _deferred_debug_copies = DeferredDebugCopies(config['debugDir'], config['debugEvery'], config['debugMinRows'])
     for fc in feature_classes:
-        if is_debug() and arcpy.Exists(fc):
-            fc_name = fc.partition(os.sep)[2]
-            description = arcpy.Describe(fc)
-            data_type = getattr(description, 'dataType', False)
-            debug_dir = get_config()['debugDir']
-            output_name = debug_dir + os.sep + fc_name
-            log_debug('Copying {} to {}'.format(fc, output_name))
-            if data_type in ['FeatureClass', 'FeatureLayer']:
-                arcpy.CopyFeatures_management(fc, output_name)
-            elif data_type == 'Table':
-                suffix = '' if '.dbf' in output_name else '.dbf'
-                arcpy.CopyRows_management(fc, output_name + suffix)
-            else:
-                log_debug('on_debug - Unhandled dataType %s' % data_type)
+        _deferred_debug_copies.submit(fc)
 
 
 class FieldNotFoundException(Exception):
@@ -236,7 +440,23 @@ class FieldNotFoundException(Exception):
 
 
 def delete_if_exists(*arg):
+    """
+    Deletes feature classes, tables or layers. Temporary names issued by create_temp_layer_name are
+    deleted in bulk without arcpy.Exists, others only if they exist. Lists of names are accepted too.
+    """
+    names = []
     for fc in arg:
+        if isinstance(fc, (list, tuple)):
+            names.extend(fc)
+        else:
+            names.append(fc)
+    if _deferred_debug_copies is not None:
+        # layers waiting for a debug copy are deleted after it
+        names = [fc for fc in names if not _deferred_debug_copies.take_over(fc)]
+    others = [fc for fc in names if not any(t.owns(fc) for t in _temp_workspaces.values())]
+    for temp_workspace in list(_temp_workspaces.values()):
+        temp_workspace.delete(*[fc for fc in names if temp_workspace.owns(fc)])
+    for fc in others:
         if arcpy.Exists(fc):
             arcpy.Delete_management(fc)
 
@@ -3,10 +3,57 @@
 # Autor: Sukhdorj Ganbaatar (student), s.ganbaatar@seznam.cz
 # Department of Geoinformatics, Palacky University in Olomouc
 # last update: August 2013
+#
+# The three fields are read once into numpy arrays (arcpy.da), checked and
+# converted to percentages and X, Y with array operations; the points are
+# written with one NumPyArrayToFeatureClass. Output points keep the FID of
+# the input row (ORIG_FID) and the percentages (P1, P2, P3).
 
 import arcpy as ap
 import math
+import numpy as np
 ap.env.overwriteOutput = True
+
+vyska = 86.6            # variable for height of triangle
+MAX_ROW_ERRORS = 20     # rows listed one by one, the rest is only counted
+
+
+def ternary_percentages(values):
+    """Percentages of the three parts, values: (n, 3) array -> (n, 3) array."""
+    return values * 100.0 / values.sum(axis=1)[:, np.newaxis]
+
+
+def ternary_xy(percentages):
+    """X, Y in the triangle (side 100) of (n, 3) percentages."""
+    x = percentages[:, 0] + percentages[:, 1] * 0.5
+    y = percentages[:, 1] * vyska / 100.0
+    return x, y
+
+
+def average_lines(F1avg, F2avg, F3avg):
+    """Coordinates of the auxiliary lines for the average percentages."""
+    #linie 1 -> reprezents avg value of 2nd part (F2)
+    Y1 = F2avg*math.sin(math.radians(60))
+    #linie 2 -> reprezents avg value of 1st part (F1)
+    pom1 = F1avg*math.sin(math.radians(60))
+    Y2 = pom1*math.sin(math.radians(30))
+    X2 = pom1*math.sin(math.radians(60))
+    #linie 3 -> reprezents avg value of 3rd part (F3)
+    pom2 = F3avg*math.sin(math.radians(60))
+    Y3 = pom2*math.sin(math.radians(30))
+    X3 = pom2*math.sin(math.radians(60))
+    return [[[0,Y1],[100,Y1]],
+            [[X2,0-Y2],[X2+50,0-Y2+vyska]],
+            [[100-X3,0-Y3],[100-X3-50,0-Y3+vyska]]]
+
+
+def report_rows(fids, message):
+    for fid in fids[:MAX_ROW_ERRORS]:
+        ap.AddError(u" -- Row data with FID " + str(fid) + message)
+    if len(fids) > MAX_ROW_ERRORS:
+        ap.AddError(u" -- ... " + str(len(fids) - MAX_ROW_ERRORS) + u" more rows" + message)
+
+
 try:
     # parametric input layer, 3 fields from attribute table for calculation and variables
     input = ap.GetParameterAsText(0)
@@ -15,125 +62,73 @@ try:
         F1 = ap.GetParameterAsText(1)
         F2 = ap.GetParameterAsText(2)
         F3 = ap.GetParameterAsText(3)
-        F1sum = 0
-        F2sum = 0
-        F3sum = 0
-        rowsCount = 0
 
         # check: fields shouldn't be used more than once
         if F1 == F2 or F2 == F3 or F3 == F1:
             ap.AddError(u" -- Process cannot be completed.")
             ap.AddError(u" -- You have chosen one field many times. Please repeat the operation.")
         else:
-            point = ap.Point()      # creat a point instance
-            vyska = 86.6            # variable for height of triangle
-            pointList = []          # array for hold new points
-            checkRows = 0           # variable for check purpose
-
-            # create a cursor object
-            rows = ap.SearchCursor(input)
-            # FOR loop to iterate rows
-            for row in rows:
-                # check: values of fields shouldn't be negative
-                if row.getValue(F1) < 0 or row.getValue(F2) < 0 or row.getValue(F3) < 0:
-                    ap.AddError(u" -- Row data with FID " + str(row.getValue("FID")) + u" contains negative value.")
-                    checkRows += 1
-                else:
-                    # calculate a sum of fileds and check its value
-                    sumFields = row.getValue(F1) + row.getValue(F2) + row.getValue(F3)
-                    if sumFields == 0:
-                        ap.AddError(u" -- Input values for row with FID " + str(row.getValue("FID")) + u" are negative or all are equal zero.")
-                        checkRows += 1
-                    else:
-                        # Calculate a percentage value of three variable phenomenon.
-                        # variable sumFields is sums of input value
-                        P1_per = row.getValue(F1) * 100.0 / sumFields
-                        P2_per = row.getValue(F2) * 100.0 / sumFields
-                        P3_per = row.getValue(F3) * 100.0 / sumFields
-
-                        # Auxiliary calculations for further usage
-                        F1sum += P1_per
-                        F2sum += P2_per
-                        F3sum += P3_per
-                        rowsCount += 1
-
-                        # Calculate a X, Y coordiantes and save them to the points
-                        coordX = P1_per + (P2_per * 0.5)
-                        coordY = P2_per * (vyska)/100.0
-                        point.X = coordX
-                        point.Y = coordY
-
-                        # save a point instance to array
-                        bod = ap.Multipoint(point)
-                        pointList.append(bod)
+            # read the fields once; NULL is read as -1 and reported as negative
+            table = ap.da.TableToNumPyArray(input, ["OID@", F1, F2, F3], null_value=-1)
+            fids = table["OID@"]
+            values = np.column_stack([table[F].astype(np.float64) for F in (F1, F2, F3)])
+            del table
+
+            # check: values of fields shouldn't be negative, sum shouldn't be zero
+            negative = (values < 0).any(axis=1)
+            zero = ~negative & (values.sum(axis=1) == 0)
+            report_rows(fids[negative].tolist(), u" contains negative value.")
+            report_rows(fids[zero].tolist(), u" contains only zero values.")
+            checkRows = int(negative.sum() + zero.sum())
 
             # check a checking variables
-            if checkRows == 0:
+            if checkRows == 0 and len(values):
                 ap.AddWarning(u" -- Input variables of three-structured data: Ok")
+                # Calculate a percentage value of three variable phenomenon and X, Y
+                percentages = ternary_percentages(values)
+                coordX, coordY = ternary_xy(percentages)
+
                 pointsName = ap.GetParameterAsText(4)
-                ap.CopyFeatures_management(pointList, pointsName)
+                if ap.Exists(pointsName):
+                    ap.Delete_management(pointsName)
+                points = np.empty(len(fids), dtype=[("ORIG_FID", np.int32),
+                                                    ("X", np.float64), ("Y", np.float64),
+                                                    ("P1", np.float64), ("P2", np.float64),
+                                                    ("P3", np.float64)])
+                points["ORIG_FID"] = fids
+                points["X"] = coordX
+                points["Y"] = coordY
+                points["P1"] = percentages[:, 0]
+                points["P2"] = percentages[:, 1]
+                points["P3"] = percentages[:, 2]
+                ap.da.NumPyArrayToFeatureClass(points, pointsName, ("X", "Y"))
 
                 # Create auxiliary lines
                 createLines = ap.GetParameterAsText(5)
                 if createLines != "":
-                    F1avg = F1sum/rowsCount
-                    F2avg = F2sum/rowsCount
-                    F3avg = F3sum/rowsCount
+                    F1avg, F2avg, F3avg = percentages.mean(axis=0).tolist()
                     Favg = [F2avg,F1avg,F3avg]
                     # ap.AddWarning("F1avg: " + str(F1avg) + ", F2avg: " + str(F2avg) + ", F3avg: " + str(F3avg))
 
-                    # calculate X,Y of lines
-                    #linie 1 -> reprezents avg value of 2nd part (F2)
-                    Y1 = F2avg*math.sin(math.radians(60))
-                    #linie 2 -> reprezents avg value of 1st part (F1)
-                    pom1 = F1avg*math.sin(math.radians(60))
-                    Y2 = pom1*math.sin(math.radians(30))
-                    X2 = pom1*math.sin(math.radians(60))
-                    #linie 3 -> reprezents avg value of 3rd part (F3)
-                    pom2 = F3avg*math.sin(math.radians(60))
-                    Y3 = pom2*math.sin(math.radians(30))
-                    X3 = pom2*math.sin(math.radians(60))
-
-                    coordsList = [[[0,Y1],[100,Y1]],
-                                  [[X2,0-Y2],[X2+50,0-Y2+vyska]],
-                                  [[100-X3,0-Y3],[100-X3-50,0-Y3+vyska]]]
-                    # variables to hold points and coordinates of lines
-                    #ap.AddWarning(str(coordsList))
-                    point2 = ap.Point()
-                    array2 = ap.Array()
                     featureList = []
-                    # save coordinates to points
-                    for linie in coordsList:
-                        for bod in linie:
-                            point2.X = bod[0]
-                            point2.Y = bod[1]
-                            array2.add(point2)
-                        # create parts of lines and sav them to featurelist
-                        polyline = ap.Polyline(array2)
-                        array2.removeAll()
-                        featureList.append(polyline)
+                    for linie in average_lines(F1avg, F2avg, F3avg):
+                        featureList.append(ap.Polyline(ap.Array([ap.Point(*bod) for bod in linie])))
                     # save a line, create a new field to hold a avg value for each line
                     ap.CopyFeatures_management(featureList, createLines)
                     ap.AddField_management(createLines,"TGavg","float")
                     a = 0
-                    rows2 = ap.UpdateCursor(createLines)
-                    for row2 in rows2:
-                        row2.setValue("TGavg",Favg[a])
-                        rows2.updateRow(row2)
-                        a += 1
-                        
+                    with ap.da.UpdateCursor(createLines, ["TGavg"]) as rows2:
+                        for row2 in rows2:
+                            row2[0] = Favg[a]
+                            rows2.updateRow(row2)
+                            a += 1
+
                 # create a base triangle
                 createTriangle = ap.GetParameterAsText(6)
                 if createTriangle != "":
-                    point3 = ap.Point()
-                    array3 = ap.Array()
                     posunY = 0.001
                     coordsList = [[0.0-posunY*2,0.0-posunY],[100.0+posunY*2,0.0-posunY],[50.0,vyska+0.002236]]
-                    for XY in coordsList:
-                        point3.X = XY[0]
-                        point3.Y = XY[1]
-                        array3.add(point3)
-                    polygon = ap.Polygon(array3)
+                    polygon = ap.Polygon(ap.Array([ap.Point(*XY) for XY in coordsList]))
                     ap.CopyFeatures_management(polygon, createTriangle)
 
                 ap.AddWarning("\n" + u"Summary:")
@@ -147,8 +142,8 @@ try:
                 ap.AddError(u"Impossible to finish task for layer " + str(input) + u" because of invalid input data." + "\n")
     else:
         ap.AddError(u" -- Input layer wasn't found.")
-        
+
 except Exception as e:
     ap.AddError("\n" + u" Unexpected errors:")
     ap.AddError(" - " + e.message)
-    ap.GetMessages(2)
\ No newline at end of file
+    ap.GetMessages(2)
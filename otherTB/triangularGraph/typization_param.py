@@ -3,107 +3,184 @@
 # Autor: Sukhdorj Ganbaatar (student), s.ganbaatar@seznam.cz
 # Department of Geoinformatics, Palacky University in Olomouc
 # last update: January 2014 (fix English messages)
+#
+# Zones are read once and put in a bounding-box grid; every point is tested
+# (pure python) only against the zones of its grid cell. Triangular zones are
+# tested in closed form with barycentric coordinates, other zones with ray
+# casting. A point on a zone boundary is not within the zone (as
+# Geometry.within). Classes are written with one cursor pass per layer.
 
+from __future__ import division
 import arcpy as ap
 import math
+
+
+def zone_rings(polygon):
+    """Rings (exterior and holes) of an arcpy polygon as lists of (x, y)."""
+    rings = []
+    for part in polygon:
+        ring = []
+        for pnt in part:
+            if pnt is None:         # start of an interior ring
+                if ring:
+                    rings.append(ring)
+                ring = []
+            else:
+                ring.append((pnt.X, pnt.Y))
+        if ring:
+            rings.append(ring)
+    # drop the closing vertex
+    return [r[:-1] if len(r) > 1 and r[0] == r[-1] else r for r in rings]
+
+
+def on_segment(x, y, a, b, eps=1e-9):
+    (x1, y1), (x2, y2) = a, b
+    cross = (x2 - x1) * (y - y1) - (y2 - y1) * (x - x1)
+    if abs(cross) > eps * max(1.0, abs(x2 - x1) + abs(y2 - y1)):
+        return False
+    return (min(x1, x2) - eps <= x <= max(x1, x2) + eps and
+            min(y1, y2) - eps <= y <= max(y1, y2) + eps)
+
+
+def barycentric(x, y, triangle):
+    """Barycentric coordinates of (x, y) in a triangle (3 vertices)."""
+    (x1, y1), (x2, y2), (x3, y3) = triangle
+    det = (y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3)
+    l1 = ((y2 - y3) * (x - x3) + (x3 - x2) * (y - y3)) / det
+    l2 = ((y3 - y1) * (x - x3) + (x1 - x3) * (y - y3)) / det
+    return l1, l2, 1.0 - l1 - l2
+
+
+def point_in_zone(x, y, rings, eps=1e-9):
+    """True if (x, y) is strictly inside the zone (boundary is outside)."""
+    if len(rings) == 1 and len(rings[0]) == 3:
+        # closed form for triangular zones
+        return min(barycentric(x, y, rings[0])) > eps
+    inside = False
+    for ring in rings:
+        for i in range(len(ring)):
+            a, b = ring[i - 1], ring[i]
+            if on_segment(x, y, a, b, eps):
+                return False
+            (x1, y1), (x2, y2) = a, b
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+    return inside
+
+
+class ZoneGrid(object):
+    """Bounding-box grid over the zones: cell -> indexes of candidate zones."""
+
+    def __init__(self, zones):
+        # zones: list of (rings, (xmin, ymin, xmax, ymax))
+        self.zones = zones
+        boxes = [box for _, box in zones]
+        self.xmin = min(b[0] for b in boxes)
+        self.ymin = min(b[1] for b in boxes)
+        xmax = max(b[2] for b in boxes)
+        ymax = max(b[3] for b in boxes)
+        self.n = max(1, int(math.sqrt(len(zones)) * 2))
+        self.dx = (xmax - self.xmin) / self.n or 1.0
+        self.dy = (ymax - self.ymin) / self.n or 1.0
+        self.cells = {}
+        for i, box in enumerate(boxes):
+            c0, r0 = self._cell(box[0], box[1])
+            c1, r1 = self._cell(box[2], box[3])
+            for c in range(c0, c1 + 1):
+                for r in range(r0, r1 + 1):
+                    self.cells.setdefault((c, r), []).append(i)
+
+    def _cell(self, x, y):
+        c = int((x - self.xmin) / self.dx)
+        r = int((y - self.ymin) / self.dy)
+        return min(max(c, 0), self.n - 1), min(max(r, 0), self.n - 1)
+
+    def find(self, x, y):
+        """Indexes of all zones that contain (x, y)."""
+        found = []
+        for i in self.cells.get(self._cell(x, y), ()):
+            rings, box = self.zones[i]
+            if box[0] <= x <= box[2] and box[1] <= y <= box[3] and \
+                    point_in_zone(x, y, rings):
+                found.append(i)
+        return found
+
+
+def write_classes(layer, fieldName, classes):
+    """Write classes (in row order) to layer with one update cursor."""
+    if fieldName not in [f.name for f in ap.ListFields(layer)]:
+        ap.AddField_management(layer, fieldName, "text")
+    n = 0
+    with ap.da.UpdateCursor(layer, [fieldName]) as rows:
+        for row in rows:
+            if n < len(classes):
+                row[0] = classes[n]
+                rows.updateRow(row)
+            n += 1
+    return n
+
+
 ap.AddWarning("-- Start: Data classification")
 
 # Input variables
-zoneNames =  []
-i = 0
 z = ap.GetParameterAsText(0)
 fieldName = ap.GetParameterAsText(1)
 
-# Read a field value of each row and save it to array
-rows = ap.SearchCursor(z,"","",fieldName)
-for row in rows:
-    zoneNames.append(row.getValue(fieldName))
-    i += 1
+# Read the zones once: category, rings and bounding box
+zoneNames = []
+zoneList = []
+with ap.da.SearchCursor(z, [fieldName, "SHAPE@"]) as rows:
+    for row in rows:
+        ext = row[1].extent
+        zoneNames.append(row[0])
+        zoneList.append((zone_rings(row[1]), (ext.XMin, ext.YMin, ext.XMax, ext.YMax)))
 ap.AddWarning(" -- Categories of triangulat point graph were successfully loaded.")
-##ap.AddWarning(zoneNames)
+grid = ZoneGrid(zoneList)
 
-# Copy a geometry of points and zones
+# Classify points
 p = ap.GetParameterAsText(2)
-#pointsFeature = ap.CopyFeatures_management(p,ap.Geometry())
-points = ap.CopyFeatures_management(p,ap.Geometry())
-zones = ap.CopyFeatures_management(z,ap.Geometry())
 pointZona = []      # variable for hold a categories for points
 zonesErr = 0        # check variables
 pointsErr = 0
-unknownErr = 0
 pointNo = 0
-
-# Loop to iterate points and zones and compare their position
-#for points in pointsFeature:
-for point in points:
-    j = 0
-    count = 0
-    for zona in zones:
-        # Test if point is within zone
-        if point.within(zona) == True:
-            count += 1      # Counts a amount of polygons that contains 1 point (1 point should lay on 1 polygon)
-            # Add a category of polygon layer (containing zones) to array
-            pointZona.append(zoneNames[j])
-        j += 1
-    ##ap.AddWarning(" -- count: " + str(count))
-    if count == 1:
-        print " -- Input points and polygons: OK"
-    elif count == 0:
-        ap.AddError(" -- Point with FID " +str(pointNo)+ " is out of any zone.")
-        pointsErr += 1
-    elif count > 1:
-        ap.AddError(" -- Point with FID " +str(pointNo)+ " is within 2 or more zones.")
-        zonesErr += 1
-    else:
-        ap.AddError(" -- Unknown error: point with FID " +str(pointNo))
-        unknownErr += 1
-    pointNo += 1
-
-##ap.AddWarning("zonesErr = "+str(zonesErr))
-##ap.AddWarning("pointsErr = "+str(pointsErr))
-##ap.AddWarning("unknownErr = "+str(unknownErr))
+with ap.da.SearchCursor(p, ["OID@", "SHAPE@XY"]) as rows:
+    for oid, xy in rows:
+        found = grid.find(xy[0], xy[1]) if xy[0] is not None else []
+        if len(found) == 1:
+            pointZona.append(u"%s" % zoneNames[found[0]])
+        elif not found:
+            ap.AddError(" -- Point with FID " + str(oid) + " is out of any zone.")
+            pointsErr += 1
+        else:
+            ap.AddError(" -- Point with FID " + str(oid) + " is within 2 or more zones: " +
+                        ", ".join(u"%s" % zoneNames[i] for i in found))
+            zonesErr += 1
+        pointNo += 1
 
 # Check conditions
-if unknownErr == 0:
-    if zonesErr == 0 and pointsErr == 0:
-        m = 0
-        # Create a new field in attribute table
-        new_field = ap.GetParameterAsText(3)
-        valNewField = ap.ValidateFieldName(new_field)
-        ap.AddField_management(p,valNewField,"text")
-        # Create a cursor object to edit input data for point layer
-        rows = ap.UpdateCursor(p)
-        for row in rows:
-            row.setValue(valNewField, str(pointZona[m]))
-            rows.updateRow(row)
-            m += 1
-        del row, rows
-
-        input = ap.GetParameterAsText(4)
-        n = 0
-        # Create a new field in attribute table
-        ap.AddField_management(input,valNewField,"text")
-        # Create a cursor object to edit input data for input data (original input data)
-        rows = ap.UpdateCursor(input)
-        for row in rows:
-            row.setValue(valNewField, str(pointZona[n]))
-            rows.updateRow(row)
-            n += 1
-        if n == pointNo:
-            ap.AddWarning("\nSummary:")
-            ap.AddWarning(" -- Classification was successful.")
-            ap.AddWarning(" -- "+ str(pointNo) + " rows were classified.")
-            ap.AddWarning(" -- Update was done for layer: " + str(input))
-        else:
-            ap.AddError(" -- Classification was successful but it seems that output classes were written to wrong layer.")
-            ap.AddWarning(" -- Please check your layer and classes. If it's necesary repeat proces.")
-            ap.AddWarning(" -- You have choosen this layer to write classes: " + str(input))
-    else:
+if zonesErr == 0 and pointsErr == 0:
+    # Create a new field in attribute table and write classes to the points
+    new_field = ap.GetParameterAsText(3)
+    valNewField = ap.ValidateFieldName(new_field)
+    write_classes(p, valNewField, pointZona)
+
+    # Write classes to the input data (original input data)
+    input = ap.GetParameterAsText(4)
+    n = write_classes(input, valNewField, pointZona)
+    if n == pointNo:
         ap.AddWarning("\nSummary:")
-        ap.AddError(" -- Tool couldn't finish the task because of invalid input data.")
-        ap.AddError(" -- Causes of this error are writted above.")
+        ap.AddWarning(" -- Classification was successful.")
+        ap.AddWarning(" -- "+ str(pointNo) + " rows were classified.")
+        ap.AddWarning(" -- Update was done for layer: " + str(input))
+    else:
+        ap.AddError(" -- Classification was successful but it seems that output classes were written to wrong layer.")
+        ap.AddWarning(" -- Please check your layer and classes. If it's necesary repeat proces.")
+        ap.AddWarning(" -- You have choosen this layer to write classes: " + str(input))
 else:
-    ap.AddError(" -- Unknown error")
-    ap.AddError(" -- Please try to reset tool or save your work and reset ArcGIS.")
+    ap.AddWarning("\nSummary:")
+    ap.AddWarning(" -- Points out of any zone: " + str(pointsErr))
+    ap.AddWarning(" -- Points within 2 or more zones: " + str(zonesErr))
+    ap.AddError(" -- Tool couldn't finish the task because of invalid input data.")
+    ap.AddError(" -- Causes of this error are writted above.")
 
 ap.AddWarning("-- End: Data classification")
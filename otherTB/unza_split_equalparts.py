@@ -3,8 +3,26 @@
 #Survey Community - Zambia (Arc1950)
 #Developer: ebenezer.odoi@gmail.com  +16145943273
 ##################################################
+# Split polygons into equal-area parts with parallel cut lines.
+#
+# The cut positions are searched on the polygon coordinates (pure python):
+# the area on one side of a cut line is computed by clipping every ring with
+# a half plane, and each cut is found with regula falsi (Illinois) / bisection
+# until the area error is below the tolerance. arcpy is used only to read the
+# polygons and to build each output part with one intersect.
+#
+# Parameters:
+#   0 polygon layer (every feature, or the selected ones, is split)
+#   1 number of output polygons per feature
+#   2 orientation: 'NS', 'WE' or the azimuth of the cut lines in degrees
+#     (clockwise from north, 'NS' = 0, 'WE' = 90)
+#   3 output shapefile name (written next to the input layer)
+#   4 optional area tolerance, fraction of the feature area (default 0.00001)
+#   5 optional number of processes (default 1)
 
 
+import math
+import multiprocessing
 import os
 import sys
 import arcpy
@@ -13,121 +31,239 @@ arcpy.env.overwriteOutput = True
 # import pythonaddins
 
 
+def sweep_direction(azimuth):
+    """Unit vectors of a cut line with the given azimuth (degrees clockwise
+    from north): (normal, along). Parts are ordered along the normal:
+    'NS' (0) from west to east, 'WE' (90) from north to south."""
+    a = math.radians(azimuth)
+    return (math.cos(a), -math.sin(a)), (math.sin(a), math.cos(a))
 
-#######User Selection 1
-poly_lyr = arcpy.GetParameterAsText(0)
-# poly_lyr = r"C:\Users\EB\Desktop\polygons\Export_OutputPro.shp"
-
-#######User Selection 2
-# num_out_polys = 10
-num_out_polys = int(arcpy.GetParameterAsText(1))
-#map units (eg meters) and the difference in area between the largest and the smallest polygons
-#0.005 - 0.02%; 0.01 - 0.03%; 0.05 - 0.1%; 0.1 - 0.3%;
-step_value = 1
-
-#######User Selection 3
-# orientation = 'NS' #'WE' / 'NS'
-orientation = arcpy.GetParameterAsText(2)
-
-if orientation != 'NS' or orientation != 'WE':
-    orientation == 'NS'
-
-# number of splits
-splits = [round(float(100)/float(num_out_polys), 2)] * num_out_polys
-
-#spatial reference of the output fc will be of the polygon layer
-sr = arcpy.SpatialReference(arcpy.Describe(poly_lyr).spatialReference.factoryCode)
-
-#source polygon fields
-fields = [f.name for f in arcpy.ListFields(poly_lyr) if not f.required]
-
-if int(arcpy.GetCount_management(poly_lyr).getOutput(0)) != 1:
-    arcpy.AddMessage('Need to have exactly one feature selected', 'Error')
-    sys.exit(0)
-
-#get polygon geometry and extent property
-with arcpy.da.SearchCursor(poly_lyr, fields + ["SHAPE@"]) as cur:
-    for row in cur:
-        attributes = list(row[:-1])
-        polygon = row[-1]
-        extent = polygon.extent
-
-#orient lines either North-South (up-down) or West-East (left to right)
-if orientation == 'NS':
-    x_max = extent.XMax + step_value
-    x_min = extent.XMin + step_value
-    y_max = extent.YMax
-    y_min = extent.YMin
-
-if orientation == 'WE':
-    x_max = extent.XMax
-    x_min = extent.XMin
-    y_max = extent.YMax - step_value
-    y_min = extent.YMin
-
-cut_poly = polygon
-# name of output shapefile
-outputshape_name = arcpy.GetParameterAsText(3)
-#output feature class create/clean
-# arcpy.env.scratchGDB
-mem_path = os.path.join(arcpy.Describe(poly_lyr).path, str(outputshape_name)+".shp")
-if arcpy.Exists(mem_path):
-    arcpy.Delete_management(mem_path)
-mem = arcpy.CopyFeatures_management(poly_lyr, mem_path)
-arcpy.DeleteFeatures_management(mem)
-
-lines = []
-
-with arcpy.da.InsertCursor(mem, fields + ["SHAPE@"]) as icur:
-    for i in splits[:-1]: #need to get all but the last item
-        tolerance = 0
-        while tolerance < i:
-            pnt_arr = arcpy.Array()
-            if orientation == 'NS':
-                #construct North-South oriented line
-                pnt_arr.add(arcpy.Point(x_min, y_max))
-                pnt_arr.add(arcpy.Point(x_min, y_min))
-
-            if orientation == 'WE':
-                #construct West-East oriented line
-                pnt_arr.add(arcpy.Point(x_min, y_max))
-                pnt_arr.add(arcpy.Point(x_max, y_max))
-
-            line = arcpy.Polyline(pnt_arr, sr)
-            lines.append(line)
-
-            #cut polygon and get split-parts
-            cut_list = cut_poly.cut(line)
-            if orientation == 'NS':
-                tolerance = 100 * cut_list[1].area / polygon.area
-                x_min += step_value
-
-            if orientation == 'WE':
-                tolerance = 100 * cut_list[0].area / polygon.area
-                y_max -= step_value
-
-        # part 0 is on the right side and part 1 is on the left side of the cut
-        if orientation == 'NS':
-            cut_poly = cut_list[0]
-            icur.insertRow(attributes + [cut_list[1]])
-
-        if orientation == 'WE':
-            cut_poly = cut_list[1]
-            icur.insertRow(attributes + [cut_list[0]])
-
-    #insert last cut remainder
-    if orientation == 'NS':
-        icur.insertRow(attributes + [cut_list[0]])
 
+def ring_area(ring):
+    """Signed area of a ring (shoelace)."""
+    area = 0.0
+    for i in range(len(ring)):
+        x1, y1 = ring[i - 1]
+        x2, y2 = ring[i]
+        area += x1 * y2 - x2 * y1
+    return area / 2
+
+
+def clip_ring(ring, normal, s):
+    """Part of a ring where p . normal <= s (Sutherland-Hodgman with one
+    half plane; the area is right for concave rings too)."""
+    nx, ny = normal
+    out = []
+    prev = ring[-1]
+    prev_d = prev[0] * nx + prev[1] * ny - s
+    for cur in ring:
+        cur_d = cur[0] * nx + cur[1] * ny - s
+        if cur_d <= 0:
+            if prev_d > 0:
+                t = prev_d / (prev_d - cur_d)
+                out.append((prev[0] + (cur[0] - prev[0]) * t,
+                            prev[1] + (cur[1] - prev[1]) * t))
+            out.append(cur)
+        elif prev_d <= 0:
+            t = prev_d / (prev_d - cur_d)
+            out.append((prev[0] + (cur[0] - prev[0]) * t,
+                        prev[1] + (cur[1] - prev[1]) * t))
+        prev, prev_d = cur, cur_d
+    return out
+
+
+def side_area(rings, normal, s):
+    """Area of the polygon (exterior rings and holes) where p . normal <= s."""
+    total = 0.0
+    for ring in rings:
+        part = clip_ring(ring, normal, s)
+        if len(part) > 2:
+            total += ring_area(part)
+    return abs(total)
+
+
+def find_cut(rings, normal, target, lo, hi, tolerance, max_iter=100):
+    """Position s in [lo, hi] where side_area(s) == target, within tolerance
+    (area units). Regula falsi with the Illinois modification, falling back
+    to bisection when the interpolation does not shrink the bracket."""
+    f_lo = side_area(rings, normal, lo) - target
+    f_hi = side_area(rings, normal, hi) - target
+    side = 0
+    s = (lo + hi) / 2
+    for _ in range(max_iter):
+        if f_hi != f_lo:
+            s = (lo * f_hi - hi * f_lo) / (f_hi - f_lo)
+        if not lo < s < hi:
+            s = (lo + hi) / 2
+        f = side_area(rings, normal, s) - target
+        if abs(f) <= tolerance:
+            break
+        if f < 0:
+            lo, f_lo = s, f
+            if side == -1:
+                f_hi /= 2
+            side = -1
+        else:
+            hi, f_hi = s, f
+            if side == 1:
+                f_lo /= 2
+            side = 1
+    return s
+
+
+def cut_positions(rings, azimuth, parts, tolerance=0.00001):
+    """Positions (along the sweep normal) of the parts - 1 cut lines that
+    split the polygon into equal areas, plus the two ends.
+
+    rings: list of rings, each a list of (x, y)
+    tolerance: area error allowed for each cut, fraction of the polygon area
+    return: [s_min, s_1, ..., s_max]
+    """
+    normal, _ = sweep_direction(azimuth)
+    projected = [x * normal[0] + y * normal[1] for ring in rings
+                 for x, y in ring]
+    s_min, s_max = min(projected), max(projected)
+    total = side_area(rings, normal, s_max)
+    positions = [s_min]
+    for k in range(1, parts):
+        # cumulative targets on the whole polygon: errors do not add up
+        positions.append(find_cut(rings, normal, total * k / parts,
+                                  positions[-1], s_max, total * tolerance))
+    positions.append(s_max)
+    return positions
+
+
+def _cut_task(args):
+    rings, azimuth, parts, tolerance = args
+    return cut_positions(rings, azimuth, parts, tolerance)
+
+
+def polygon_rings(polygon):
+    """Rings of an arcpy polygon as lists of (x, y); parts and holes alike."""
+    rings = []
+    for part in polygon:
+        ring = []
+        for point in part:
+            if point is None:  # start of an interior ring
+                if ring:
+                    rings.append(ring)
+                ring = []
+            else:
+                ring.append((point.X, point.Y))
+        if ring:
+            rings.append(ring)
+    return rings
+
+
+def band_polygon(azimuth, s0, s1, reach, sr):
+    """Rectangle between the cut lines s0 and s1, 2 * reach long."""
+    normal, along = sweep_direction(azimuth)
+    corners = []
+    for s, t in ((s0, -reach), (s0, reach), (s1, reach), (s1, -reach)):
+        corners.append(arcpy.Point(normal[0] * s + along[0] * t,
+                                   normal[1] * s + along[1] * t))
+    return arcpy.Polygon(arcpy.Array(corners), sr)
+
+
+def cut_line(azimuth, s, reach, sr):
+    normal, along = sweep_direction(azimuth)
+    return arcpy.Polyline(arcpy.Array([
+        arcpy.Point(normal[0] * s - along[0] * reach,
+                    normal[1] * s - along[1] * reach),
+        arcpy.Point(normal[0] * s + along[0] * reach,
+                    normal[1] * s + along[1] * reach)]), sr)
+
+
+def parse_azimuth(orientation):
     if orientation == 'WE':
-        icur.insertRow(attributes + [cut_list[1]])
+        return 90.0
+    try:
+        return float(orientation)
+    except (TypeError, ValueError):
+        return 0.0  # 'NS' and anything unknown
+
+
+def split_equal_parts(poly_lyr, num_out_polys, azimuth, out_path,
+                      tolerance=0.00001, processes=1):
+    """Split every polygon of poly_lyr into num_out_polys equal-area parts."""
+    #spatial reference of the output fc will be of the polygon layer
+    sr = arcpy.Describe(poly_lyr).spatialReference
+
+    #source polygon fields
+    fields = [f.name for f in arcpy.ListFields(poly_lyr) if not f.required]
+
+    features = []
+    with arcpy.da.SearchCursor(poly_lyr, fields + ["SHAPE@"]) as cur:
+        for row in cur:
+            if row[-1] is not None:
+                features.append((list(row[:-1]), row[-1]))
+
+    tasks = [(polygon_rings(polygon), azimuth, num_out_polys, tolerance)
+             for _, polygon in features]
+    if processes > 1 and len(tasks) > 1:
+        pool = multiprocessing.Pool(processes)
+        try:
+            all_positions = pool.map(_cut_task, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        all_positions = [_cut_task(task) for task in tasks]
+
+    #output feature class create/clean
+    if arcpy.Exists(out_path):
+        arcpy.Delete_management(out_path)
+    mem = arcpy.CopyFeatures_management(poly_lyr, out_path)
+    arcpy.DeleteFeatures_management(mem)
+
+    lines = []
+    with arcpy.da.InsertCursor(mem, fields + ["SHAPE@"]) as icur:
+        for (attributes, polygon), positions in zip(features, all_positions):
+            extent = polygon.extent
+            reach = math.hypot(extent.width, extent.height) + 1
+            for s0, s1 in zip(positions[:-1], positions[1:]):
+                part = polygon.intersect(band_polygon(azimuth, s0, s1, reach, sr), 4)
+                icur.insertRow(attributes + [part])
+            lines.extend(cut_line(azimuth, s, reach, sr) for s in positions[1:-1])
+
+    #for illustration purposes only
+    if lines:
+        arcpy.CopyFeatures_management(lines, 'in_memory/lines')
+    return out_path
+
+
+if __name__ == '__main__':
+    #######User Selection 1
+    poly_lyr = arcpy.GetParameterAsText(0)
+    # poly_lyr = r"C:\Users\EB\Desktop\polygons\Export_OutputPro.shp"
+
+    #######User Selection 2
+    # num_out_polys = 10
+    num_out_polys = int(arcpy.GetParameterAsText(1))
+
+    #######User Selection 3
+    # orientation = 'NS' #'WE' / 'NS' / azimuth in degrees
+    orientation = arcpy.GetParameterAsText(2)
+
+    # name of output shapefile
+    outputshape_name = arcpy.GetParameterAsText(3)
+    mem_path = os.path.join(arcpy.Describe(poly_lyr).path, str(outputshape_name)+".shp")
+
+    #area tolerance (fraction of the polygon area) and processes, optional
+    argc = arcpy.GetArgumentCount()
+    tolerance = arcpy.GetParameterAsText(4) if argc > 4 else ""
+    processes = arcpy.GetParameterAsText(5) if argc > 5 else ""
+    processes = int(processes) if processes else 1
+    # inside ArcMap sys.executable is ArcMap.exe: start workers with python
+    if processes > 1 and not os.path.basename(sys.executable).lower().startswith("python"):
+        multiprocessing.set_executable(os.path.join(sys.exec_prefix, "pythonw.exe"))
 
-#for illustration purposes only
-arcpy.CopyFeatures_management(lines, 'in_memory/lines')
+    split_equal_parts(poly_lyr, num_out_polys, parse_azimuth(orientation), mem_path,
+                      float(tolerance) if tolerance else 0.00001, processes)
 
-#evaluation of the areas error
-done_polys = [f[0] for f in arcpy.da.SearchCursor(mem_path, 'SHAPE@AREA')]
+    #evaluation of the areas error
+    done_polys = [f[0] for f in arcpy.da.SearchCursor(mem_path, 'SHAPE@AREA')]
 
-#the % of the smallest and the largest areas
-# arcpy.AddMessage("{} Precision error".format(round(100 - 100 * (min(done_polys) / max(done_polys)), 2)))
-arcpy.AddWarning("OutPut Path is :"+mem_path)
+    #the % of the smallest and the largest areas
+    # arcpy.AddMessage("{} Precision error".format(round(100 - 100 * (min(done_polys) / max(done_polys)), 2)))
+    arcpy.AddWarning("OutPut Path is :"+mem_path)
@@ -26,6 +26,7 @@ sys.path.append(Libs_dir)
 
 import ezarcpy2
 import hybasic2
+import hypartition
 #<<<<<<<<<<<<<<<IMPORT SETTING>>>>>>>>>>>>>>
 
 arcpy.env.overwriteOutput= True
@@ -44,28 +45,8 @@ def export_by_filed(layer, field, folder, output_featurecalss, update_cursor=Fal
     if update_cursor:
         update_BSM(layer, u"地块编码")
     
-    field_values = ezarcpy2.field_value_shower(layer, field)
-    
-    featurea_lyr = "featurea_lyr"
-    arcpy.MakeFeatureLayer_management(layer, featurea_lyr)
-    
-    for value in field_values:
-        
-        # name+" LIKE '01%' "
-        where_clause =  field + "=" + "'" + value + "'"
-        arcpy.SelectLayerByAttribute_management(featurea_lyr, "NEW_SELECTION", where_clause)
-        
-        if folder:
-            new_folder = os.path.join(output_featurecalss,value)
-            if not os.path.exists(new_folder):
-                os.makedirs(new_folder)
-            
-            out_feature_lyr = os.path.join(new_folder,value+".shp")
-            arcpy.CopyFeatures_management(featurea_lyr, out_feature_lyr)
-    
-        else:
-            out_feature_lyr = os.path.join(output_featurecalss,value+".shp")
-            arcpy.CopyFeatures_management(featurea_lyr, out_feature_lyr)
+    # 只读取一遍图层，按字段值分发写出
+    hypartition.export_by_field(layer, field, output_featurecalss, folder)
 
 
 def update_BSM(layer, field):
@@ -80,6 +61,19 @@ def update_BSM(layer, field):
     # arcpy.DeleteField_management(layer,"XJQYMC")
 
 
+def derive_BSM(field, code_field="CJQYDM"):
+    """
+    hypartition.export_hierarchy 的 derive，与 update_BSM 相同：
+    地块编码 = 村级区域代码前 9 位 + 要素在乡镇 shp 中的 FID
+    :param field: 地块编码字段
+    :param code_field: 村级区域代码字段
+    :return:
+    """
+    def derive(row, seq):
+        return {field: row[code_field][:9] + str(seq[0])}
+    return derive
+
+
 if __name__ == '__main__':
     # lyr_path = ur"E:\中江LQDK\成果数据\柏树乡\Export_Output.shp"
     # in_lyr = arcpy.mapping.Layer(lyr_path)
@@ -89,34 +83,13 @@ if __name__ == '__main__':
 
 
     
-    # 导出乡镇
+    # 导出乡镇和村（只读一遍数据，地块编码在写出时计算）
     # lyr_path = ur"D:\中江LQDK\fme处理数据.gdb\fme处理成果四"
     lyr_path = ur"E:\中江LQDK\fmec处理结果2.gdb\处理结果"
     in_lyr = arcpy.mapping.Layer(lyr_path)
     # ouput_path = ur"D:\中江LQDK\成果"
     ouput_path = ur"E:\中江LQDK\成果lcc"
 
-    export_by_filed(in_lyr, "XJQYMC", True, ouput_path)
-
-    # 导出村
-    # 先获得乡镇矢量列表
-    hybasic2._getall_items =[]
-    xjqy_shps = hybasic2.getfiles(ouput_path, "shp")
-    print xjqy_shps
-    
-    # sys.exit(1)
-    
-    for shp in xjqy_shps:
-        in_lyr = arcpy.mapping.Layer(shp)
-        # 获得乡镇shp所在的文件夹
-        shp_dir = os.path.dirname(shp)
-        # 获得名称
-        name_with_suffix = os.path.basename(shp)
-        pure_name = os.path.splitext(name_with_suffix)[0]
-        
-        # 根据乡镇名称再创建一个文件夹
-        CJQY_folder = os.path.join(shp_dir, pure_name)
-        print CJQY_folder
-        if not os.path.exists(CJQY_folder):
-            os.makedirs(CJQY_folder)
-        export_by_filed(in_lyr, "CJQYMC", False, CJQY_folder, update_cursor=True)
\ No newline at end of file
+    hypartition.export_hierarchy(
+        in_lyr, ["XJQYMC", "CJQYMC"], ouput_path,
+        derive=derive_BSM(u"地块编码"), drop_fields=["CJQYDM"])
@@ -12,9 +12,21 @@ Usage:
 """
 # -------------------------------------------
 import arcpy
+import multiprocessing
+import sys
 import os
 import time
 
+#------------ӻ
+Script_dir = os.path.dirname(__file__)
+Base_dir = os.path.dirname(Script_dir)
+Libs_dir = os.path.join(Base_dir, "libs")
+sys.path.append(Libs_dir)
+#------------
+
+import hyexport
+import hyprofile
+
 arcpy.env.overwriteOutput = True
 
 
@@ -33,29 +45,46 @@ def log_printer(msg):
     # log_file.close()
 
 
-def export(path, res):
+def export(path, res, processes=None, timeout=None, force=False):
     """
-    MXDĵΪJPEGͼƬ
+    MXDĵΪJPEGͼƬ̣ hyexport.batch_export
     :param path: mxdļĿ¼ string
     :param res: ֱ int
+    :param processes:  intĬCPU
+    :param timeout: ĵʱʱ䣨룩Ĭϲ
+    :param force: 嵥ȫµ bool
     :return:
     """
     arcpy.AddMessage("\n...")
-    for afile in os.listdir(path):
-        if afile[-3:].lower() == 'mxd':
-            mxd1 = arcpy.mapping.MapDocument(os.path.join(path, afile))
-            arcpy.mapping.ExportToJPEG(mxd1,
-                                       os.path.join(path, afile[:-3] + 'jpg'), resolution = res)
-            del mxd1
-            log_printer(afile+": OK!")
-        else:
-            # log_printer(afile+"MXDļ,\n")
-            print u"\nMXDļ,"
+    #  ArcMap ʱ sys.executable  ArcMap.exe
+    # ӽҪʹ python 
+    if not os.path.basename(sys.executable).lower().startswith("python"):
+        multiprocessing.set_executable(
+            os.path.join(sys.exec_prefix, "pythonw.exe"))
+    # mxd ͼƬûб仯ĵֱ
+    manifest = hyexport.ExportManifest(hyexport.default_manifest_path(path))
+    report = hyexport.batch_export(hyexport.list_mxd(path), res,
+                                   processes=processes, timeout=timeout,
+                                   logger=log_printer,
+                                   manifest=manifest, force=force)
+    for line in report.summary():
+        log_printer(line)
     arcpy.AddMessage("OK!\n")
+    return report
 
 if __name__ == '__main__':
     arcpy.AddMessage("\n|---------------------------------|")
     arcpy.AddMessage(" -----   GIS   ----- ")
     arcpy.AddMessage("|---------------------------------|\n")
+    # û HY_PROFILE=D:/profile.csv ʱ¼ʱ
+    profile_dump = hyprofile.hook_tools()
     
-    export(arcpy.GetParameterAsText(0), int(arcpy.GetParameterAsText(1)))
\ No newline at end of file
+    argv = [arcpy.GetParameterAsText(i)
+            for i in range(arcpy.GetArgumentCount())]
+    # ѡĵʱʱ䣨룩Ƿǿȫµ
+    processes = int(argv[2]) if len(argv) > 2 and argv[2] else None
+    timeout = float(argv[3]) if len(argv) > 3 and argv[3] else None
+    force = len(argv) > 4 and argv[4] == "true"
+    export(argv[0], int(argv[1]), processes, timeout, force)
+    if profile_dump:
+        profile_dump()
\ No newline at end of file
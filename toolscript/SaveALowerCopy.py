@@ -11,6 +11,19 @@ Usage:
 """
 # -------------------------------------------
 import arcpy, os, time
+import sys
+
+#------------ӻ
+Script_dir = os.path.dirname(__file__)
+Base_dir = os.path.dirname(Script_dir)
+Libs_dir = os.path.join(Base_dir, "libs")
+sys.path.append(Libs_dir)
+#------------
+
+import hyprofile
+
+# û HY_PROFILE=D:/profile.csv ʱ¼ʱ
+profile_dump = hyprofile.hook_tools()
 
 arcpy.AddMessage("\n|---------------------------------|")
 arcpy.AddMessage(" -----   GIS   ----- ")
@@ -46,19 +59,5 @@ for afile in os.listdir(path):
         del mxd
         
 arcpy.AddMessage("OK!\n")
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+if profile_dump:
+    profile_dump()
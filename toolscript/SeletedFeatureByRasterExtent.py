@@ -11,5 +11,24 @@ Usage:
 """
 # -------------------------------------------
 import arcpy
+import sys
+import os
 
+#------------添加环境变量
+Script_dir = os.path.dirname(__file__)
+Base_dir = os.path.dirname(Script_dir)
+Libs_dir = os.path.join(Base_dir, "libs")
+sys.path.append(Libs_dir)
+#------------
 
+import hyprofile
+
+# 设置环境变量 HY_PROFILE=D:/profile.csv 时记录各函数耗时
+profile_dump = hyprofile.hook_tools()
+
+
+# 工具代码还没有实现，写在这里（在 profile_dump 之前）
+
+
+if profile_dump:
+    profile_dump()
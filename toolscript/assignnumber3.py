@@ -14,48 +14,38 @@ Usage:
 """
 # -------------------------------------------
 import arcpy
-import random
+import sys
+import os
 
-def assign_number(input_feature, field, start_number, new_field):
-    # field_name = u"{}".format(random.randint())
+#------------ӻ
+Script_dir = os.path.dirname(__file__)
+Base_dir = os.path.dirname(Script_dir)
+Libs_dir = os.path.join(Base_dir, "libs")
+sys.path.append(Libs_dir)
+#------------
 
-    # start_number = "1"
-    value_dict = {}
-    # ½ֶ
-    arcpy.AddField_management(input_feature, new_field, "TEXT")
-    with arcpy.da.UpdateCursor(input_feature, [field,new_field]) as cursor:
-        count = 0
-        for row in cursor:
-            if row[0] is None or row[0]== " " or row[0]== "":
-                # arcpy.AddMessage("None value here!")
-                continue
-            
-            if row[0] not in value_dict:
-                start_number = start_number.replace(str(count),str(count+1))
-                value_dict[row[0]] = start_number
-                count += 1
+import hynumber
+import hyprofile
 
-    for k,v in value_dict.items():
-        arcpy.AddMessage(k)
-        arcpy.AddMessage(v)
-    
-    del cursor
-    
-    # ȴһֵ䣬õݴȥ
-    # ȻʹֵֶΡ
-    
-    with arcpy.da.UpdateCursor(input_feature, [field,new_field]) as cursor:
-        for row in cursor:
-            # if row[0] is None or row[0]== " " or row[0]== "":
-            #     continue
-            
-            if row[0] in value_dict:
-                row[1] = value_dict[row[0]]
-                
-            cursor.updateRow(row)
-            
-        
-    # arcpy.AddMessage(value_dict)
+
+def assign_number(input_feature, field, start_number, new_field,
+                  order="first", group_field="", sort_field=""):
+    """
+    ֵͬʹͬһ루 hynumber.number_features
+    :param input_feature: ͼ
+    :param field: ݵֶ
+    :param start_number: ʼ "1""001"ģ "{n}"
+    :param new_field: дֶ
+    :param order: first ״γֵ˳һαɣvalue ֵ
+        spatial λôϵ¡
+    :param group_field: ֶΣÿĺͷʼ
+    :param sort_field: order Ϊ value ʱֶΣĬΪ field
+    :return:
+    """
+    hynumber.number_features(
+        input_feature, field, new_field, start_number,
+        order=(order or "first").lower(), sort_field=sort_field or None,
+        group_field=group_field or None, logger=arcpy.AddMessage)
     arcpy.RefreshActiveView()  # ˢµͼͲִ
     arcpy.RefreshTOC()  # ˢб
     
@@ -64,9 +54,13 @@ if __name__ == '__main__':
     arcpy.AddMessage("\n|---------------------------------|")
     arcpy.AddMessage(" -----   GIS   ----- ")
     arcpy.AddMessage("|---------------------------------|\n")
+    # û HY_PROFILE=D:/profile.csv ʱ¼ʱ
+    profile_dump = hyprofile.hook_tools()
     
     arcpy.env.overwriteOutput = True
     argv = tuple(arcpy.GetParameterAsText(i)
              for i in range(arcpy.GetArgumentCount()))
 
-    assign_number(*argv)
\ No newline at end of file
+    assign_number(*argv)
+    if profile_dump:
+        profile_dump()
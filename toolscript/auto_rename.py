@@ -14,6 +14,20 @@ Usage:
 # -------------------------------------------
 import arcpy
 import random
+import sys
+import os
+
+#------------ӻ
+Script_dir = os.path.dirname(__file__)
+Base_dir = os.path.dirname(Script_dir)
+Libs_dir = os.path.join(Base_dir, "libs")
+sys.path.append(Libs_dir)
+#------------
+
+import hyprofile
+
+# û HY_PROFILE=D:/profile.csv ʱ¼ʱ
+profile_dump = hyprofile.hook_tools()
 
 
 
@@ -38,4 +52,6 @@ for lyr in infeature_lyr_list:
     layer.name = new_name
     # arcpy.mapping.RemoveLayer(df, layer)
     # arcpy.mapping.AddLayer(df, layer)
-    arcpy.RefreshTOC()
\ No newline at end of file
+    arcpy.RefreshTOC()
+if profile_dump:
+    profile_dump()
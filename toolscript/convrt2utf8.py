@@ -7,25 +7,51 @@
 # Reference:
 """
 Description:          cpg ļshp
+                     ʶԱʵı룬 UTF-8 תΪ UTF-8д cpg ļ
 Usage:               
 """
 # -------------------------------------------
 
 import arcpy
+import sys
 import os
 
+#------------ӻ
+Script_dir = os.path.dirname(__file__)
+Base_dir = os.path.dirname(Script_dir)
+Libs_dir = os.path.join(Base_dir, "libs")
+sys.path.append(Libs_dir)
+#------------
+
+import hydbf
+import hyprofile
+
 def add_cpg(layer_obj):
+    """
+    ԱתΪ UTF-8 д cpg ļ hydbf.transcode
+    ԭֻд cpgGBK  shp  utf8  cpg 󷴶
+    <dbf ռʱ޷滻ҪƳͼ>
+    :param layer_obj: ͼ
+    :return: {Dict} ת
+    """
     lyr_file = layer_obj.workspacePath
     lyr_name = layer_obj.datasetName
-    cpg_file = os.path.join(lyr_file,lyr_name+".cpg")
-    with open(cpg_file,"w") as f:
-        f.write("utf8")
+    dbf_file = os.path.join(lyr_file, lyr_name + ".dbf")
+    result = hydbf.transcode(dbf_file)
+    arcpy.AddMessage(u"{0}: {1} ({2}) -> {3}, {4} records".format(
+        lyr_name, result["source"], result["detected_by"], result["target"],
+        result["records"]))
+    if result["truncated"]:
+        arcpy.AddWarning(u"{0} values truncated".format(result["truncated"]))
+    return result
         
 
 if __name__ == '__main__':
     arcpy.AddMessage("\n|---------------------------------|")
     arcpy.AddMessage(" -----   GIS   ----- ")
     arcpy.AddMessage("|---------------------------------|\n")
+    # û HY_PROFILE=D:/profile.csv ʱ¼ʱ
+    profile_dump = hyprofile.hook_tools()
 
     infeature_lyr = arcpy.GetParameterAsText(0)
     infeature_lyr_list = infeature_lyr.split(";")
@@ -36,4 +62,6 @@ if __name__ == '__main__':
     for layer_path in infeature_lyr_list:
         # arcpy.AddMessage(layer_path)
         layer = arcpy.mapping.Layer(layer_path)
-        add_cpg(layer)
\ No newline at end of file
+        add_cpg(layer)
+    if profile_dump:
+        profile_dump()
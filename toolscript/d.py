@@ -11,6 +11,21 @@ Usage:
 """
 # -------------------------------------------
 import arcpy
+import sys
+import os
+
+#------------添加环境变量
+Script_dir = os.path.dirname(__file__)
+Base_dir = os.path.dirname(Script_dir)
+Libs_dir = os.path.join(Base_dir, "libs")
+sys.path.append(Libs_dir)
+#------------
+
+import hyprofile
+
+# 设置环境变量 HY_PROFILE=D:/profile.csv 时记录各函数耗时
+profile_dump = hyprofile.hook_tools()
+
 arcpy.env.Overw
 
 Data_Input = arcpy.GetParameterAsText(0) #Excel or table
@@ -66,7 +81,5 @@ if Excel_Output == '':
 else:
     arcpy.MakeTableView_management(FCPoint_Name, "Excel_view")
     arcpy.conversion.TableToExcel("Excel_view", Excel_Output)
-
-
-
-
+if profile_dump:
+    profile_dump()
@@ -25,55 +25,33 @@ Libs_dir = os.path.join(Base_dir, "libs")
 sys.path.append(Libs_dir)
 #------------
 
+import hypartition
+import hyprofile
+import hyvalues
+
 
 #<<<<<<<<<<<<<<<IMPORT SETTING>>>>>>>>>>>>>>
 
 def field_value_shower(layer, field):
-    """ȡͼĳֶεֵ(ûֵʱ)
+    """ȡͼĳֶεֵ(״γֵ˳)
     layer: mxd layer
     field: ֶ,ֻѡһֶ
     """
-    _list = []
-    cursor = arcpy.da.SearchCursor(layer,field)
-    for row in cursor:
-        if row[0] not in _list:
-            _list.append(row[0])
-    del cursor
-    return _list
+    return hyvalues.field_values(layer, field)[field].values
 
 
 def export_by_filed(layer, field, output_featurecalss, folder):
     """
+    ֻȡһͼ㣬ֵֶַд hypartition.export_by_field
     :param layer: {Strings} ͼ
     :param field: {Strings} ֶ
     :param output_featurecalss: {Strings} ļ
     :param folder:{Boolean} Ƿÿshpļ
-    :return:
+    :return: {OrderedDict} ֵֶ -> Ҫ
     """
-    field_values = field_value_shower(layer, field)
-    
-    featurea_lyr = "featurea_lyr"
-    arcpy.MakeFeatureLayer_management(layer, featurea_lyr)
-    
-    for value in field_values:
-        
-        # name+" LIKE '01%' "
-        # arcpy.AddMessage( value)
-        where_clause =  field + "=" + "'" + value + "'"
-        # arcpy.AddMessage( where_clause)
-        arcpy.SelectLayerByAttribute_management(featurea_lyr, "NEW_SELECTION", where_clause)
-        
-        if folder == "true":
-            new_folder = os.path.join(output_featurecalss,value)
-            if not os.path.exists(new_folder):
-                os.makedirs(new_folder)
-            
-            out_feature_lyr = os.path.join(new_folder,value+".shp")
-            arcpy.CopyFeatures_management(featurea_lyr, out_feature_lyr)
-    
-        else:
-            out_feature_lyr = os.path.join(output_featurecalss,value+".shp")
-            arcpy.CopyFeatures_management(featurea_lyr, out_feature_lyr)
+    return hypartition.export_by_field(
+        layer, field, output_featurecalss, folder == "true",
+        logger=arcpy.AddMessage)
 
 
 
@@ -82,6 +60,8 @@ if __name__ == '__main__':
     arcpy.AddMessage("\n|---------------------------------|")
     arcpy.AddMessage(" -----   GIS   ----- ")
     arcpy.AddMessage("|---------------------------------|\n")
+    # û HY_PROFILE=D:/profile.csv ʱ¼ʱ
+    profile_dump = hyprofile.hook_tools()
     
     arcpy.env.overwriteOutput = True
     argv = tuple(arcpy.GetParameterAsText(i)
@@ -90,6 +70,8 @@ if __name__ == '__main__':
         arcpy.AddMessage(i)
     
     export_by_filed(*argv)
+    if profile_dump:
+        profile_dump()
 
 
     # arcpy.env.overwriteOutput = True
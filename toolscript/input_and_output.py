@@ -11,6 +11,17 @@ Usage:
 """
 # -------------------------------------------
 import arcpy
+import sys
+import os
+
+#------------添加环境变量
+Script_dir = os.path.dirname(__file__)
+Base_dir = os.path.dirname(Script_dir)
+Libs_dir = os.path.join(Base_dir, "libs")
+sys.path.append(Libs_dir)
+#------------
+
+import hyprofile
 
 # 第一种写法
 # input_lyr = arcpy.GetParameterAsText(0)
@@ -30,7 +41,11 @@ def in_and_out(in_lyr, out_lyr):
 
 
 if __name__ == '__main__':
-    
+    # 设置环境变量 HY_PROFILE=D:/profile.csv 时记录各函数耗时
+    profile_dump = hyprofile.hook_tools()
+
     argv = tuple(arcpy.GetParameterAsText(i)
                  for i in range(arcpy.GetArgumentCount()))
-    in_and_out(*argv)
\ No newline at end of file
+    in_and_out(*argv)
+    if profile_dump:
+        profile_dump()
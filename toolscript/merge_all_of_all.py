@@ -15,6 +15,7 @@ Usage:
 #<<<<<<<<<<<<<<<IMPORT SETTING>>>>>>>>>>>>>>
 from __future__ import absolute_import
 import arcpy
+import multiprocessing
 import sys
 import os
 
@@ -25,85 +26,65 @@ Libs_dir = os.path.join(Base_dir, "libs")
 sys.path.append(Libs_dir)
 #------------
 
+import hyprofile
+import hyunion
+
 def merger_all(layer, outputclass= "dissolve_all"):
     """
-    һٺϲһͼҪ(һֶΣȫֵΪ1Ȼںϣɾ
-    ֶ)
+    һٺϲһͼҪ(ֱӶȡ𼶺ϲ޸ͼ㣬
+     hyunion.union_all)
         <رעºϳɵͼƣǷḲ>
     layer(String): shplyrļַͼ
     return: ϲͼ ĬϷͼΪ newlayer_945
     """
     arcpy.env.addOutputsToMap = True
     arcpy.env.overwriteOutput = True
-    # жǷֶ
-    all_fields = arcpy.ListFields(layer)
-    all_name = [i.name for i in all_fields]
-    # for f in all_fields:
-    # 	print f.name #Todo  neme  aliasName صĶһΪʲô
-    # print f.aliasName
-    
-    field_name = "test1f2lcc"
-    if field_name not in all_name:
-        arcpy.AddField_management(layer, field_name, "LONG")
-    cursor = arcpy.da.UpdateCursor(layer, field_name)
-    for row in cursor:
-        row[0] = "1"
-        cursor.updateRow(row)
-    del cursor
-    new_ly = outputclass
-    arcpy.Dissolve_management(layer, new_ly ,field_name)
-    arcpy.DeleteField_management(new_ly, field_name)
-    return new_ly
+    return hyunion.union_all([layer], outputclass,
+                             logger=arcpy.AddMessage)
 
 
-def merger_all_layers(layers, result_lyr):
+def merger_all_layers(layers, result_lyr, processes=1):
     """
     ͼϲȻȫںϣԿص
+    (ֱӶȡͼ㣬 Merge һ)
     :param layers: {Str} Ҫɵĵַ ; ָ
     :param result_lyr: {Layer} Ҫ
+    :param processes: {Int} 
     :return:
     """
     arcpy.env.workspace = arcpy.env.scratchGDB
     arcpy.env.overwriteOutput = True
-    # separate layers each
-    # arcpy.AddMessage(type(layers))
-    # arcpy.AddMessage(layers)
     layers_list = layers.split(";")
-    # layers_list = layers
-    # mergered_lyr = "in_memory/mergered_lyr"
-    mergered_lyr = "mergered_lyr"
-    
     # ͼƳֿոʱָĵ NAME '",
     # Ҫȥ
     layers_list = [xxx.strip("'") if " " in xxx and "'" in xxx else xxx for xxx in layers_list]
-    
-    # arcpy.AddMessage("oooooooooo")
-    # for aa_layer in layers_list:
-    #     if " " in aa_layer and "'" in aa_layer:
-    #         aa_layer = aa_layer.strip("'")
-    #         arcpy.AddMessage(aa_layer)
-    # #     arcpy.AddMessage(aa_layer)
-    # #     arcpy.AddMessage(type(aa_layer))
-    # # arcpy.AddMessage(layers_list)
-    # arcpy.AddMessage("oooooooooo")
-    # return 1
-    
-    arcpy.Merge_management(layers_list, mergered_lyr)
-    mergered_dissolved_lyr = result_lyr
-    merger_all(mergered_lyr, mergered_dissolved_lyr)
-    arcpy.Delete_management(mergered_lyr)
-    return mergered_dissolved_lyr
+    #  ArcMap ʱ sys.executable  ArcMap.exe
+    # ӽҪʹ python 
+    if processes > 1 and not os.path.basename(
+            sys.executable).lower().startswith("python"):
+        multiprocessing.set_executable(
+            os.path.join(sys.exec_prefix, "pythonw.exe"))
+    return hyunion.union_all(layers_list, result_lyr, processes,
+                             logger=arcpy.AddMessage)
 
 
 
 #<<<<<<<<<<<<<<<IMPORT SETTING>>>>>>>>>>>>>>
-arcpy.AddMessage("\n|---------------------------------|")
-arcpy.AddMessage(" -----   GIS   ----- ")
-arcpy.AddMessage("|---------------------------------|\n")
-
-layers = arcpy.GetParameterAsText(0)
-output = arcpy.GetParameterAsText(1)
+if __name__ == '__main__':
+    # ʱӽ̻µ뱾űֻ
+    arcpy.AddMessage("\n|---------------------------------|")
+    arcpy.AddMessage(" -----   GIS   ----- ")
+    arcpy.AddMessage("|---------------------------------|\n")
+    # û HY_PROFILE=D:/profile.csv ʱ¼ʱ
+    profile_dump = hyprofile.hook_tools()
 
-arcpy.env.overwriteOutput = True
-merger_all_layers(layers, output)
+    layers = arcpy.GetParameterAsText(0)
+    output = arcpy.GetParameterAsText(1)
+    # ѡĬ 1
+    processes = arcpy.GetParameterAsText(2) if arcpy.GetArgumentCount() > 2 else ""
+    processes = int(processes) if processes else 1
 
+    arcpy.env.overwriteOutput = True
+    merger_all_layers(layers, output, processes)
+    if profile_dump:
+        profile_dump()
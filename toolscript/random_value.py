@@ -13,6 +13,19 @@ Usage:
 import arcpy
 import random
 import os
+import sys
+
+#------------添加环境变量
+Script_dir = os.path.dirname(__file__)
+Base_dir = os.path.dirname(Script_dir)
+Libs_dir = os.path.join(Base_dir, "libs")
+sys.path.append(Libs_dir)
+#------------
+
+import hyprofile
+
+# 设置环境变量 HY_PROFILE=D:/profile.csv 时记录各函数耗时
+profile_dump = hyprofile.hook_tools()
 
 # Input layer file
 lyr = "xx"
@@ -26,4 +39,5 @@ expression = "expression"
 
 arcpy.CalculateField_management("vegtable.dbf", "VEG_TYP2",
                                 '!VEG_TYPE!.split(" ")[-1]', "PYTHON_9.3")
-
+if profile_dump:
+    profile_dump()